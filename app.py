@@ -1,15 +1,29 @@
 import os
+import threading
 from datetime import datetime
+
+import numpy as np
 from flask import Flask, request, jsonify, render_template, send_from_directory
 
 import config
+from modules import model_loader
 from modules.video_processor import VideoProcessor
-from modules.telemetry_parser import TelemetryParser
+from modules.frame_source import read_video_meta
+from modules.telemetry_parser import TelemetryParser, PIPELINE_COLUMNS
 from modules.trajectory_analyzer import TrajectoryAnalyzer
+from modules.lap_segmenter import LapSegmenter
+from modules.delta_time import DeltaTimeEngine
 from modules.sync_calibrator import SyncCalibrator
 from modules.line_warp import LineWarpEngine
+from modules.frame_track import FrameTrack
 from modules.performance_analyzer import PerformanceAnalyzer
 from modules.ai_feedback import AIFeedbackEngine
+from modules.event_detector import EventDetector
+from modules.job_queue import JobQueue, QueueFullError
+from modules.metrics import MetricsRegistry
+from modules.track_registry import TrackRegistry
+from modules.upload_store import UploadStore, UploadError, UploadOffsetError, parse_content_range
+from modules.session_store import SessionStore, FILTERS as SESSION_FILTERS
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
 
@@ -19,13 +33,38 @@ app.config["OUTPUT_FOLDER"] = config.OUTPUT_DIR
 os.makedirs(config.UPLOAD_DIR, exist_ok=True)
 os.makedirs(config.OUTPUT_DIR, exist_ok=True)
 
-video_processor = VideoProcessor()
 telemetry_parser = TelemetryParser()
 trajectory_analyzer = TrajectoryAnalyzer()
+lap_segmenter = LapSegmenter()
+delta_engine = DeltaTimeEngine()
 sync_calibrator = SyncCalibrator()
 line_warper = LineWarpEngine()
 perf_analyzer = PerformanceAnalyzer()
 ai_feedback = AIFeedbackEngine()
+event_detector = EventDetector()
+track_registry = TrackRegistry()
+upload_store = UploadStore()
+session_store = SessionStore()
+# 이전 프로세스에서 분석 도중 끊긴 세션은 끝날 수 없으므로 failed 로 (정리 / 삭제 가능하게)
+session_store.reset_interrupted()
+
+ANALYZE_STAGES = (
+    "telemetry", "trajectory", "ideal_line", "laps", "video_meta", "tracking", "sync", "warp", "render",
+)
+
+metrics = MetricsRegistry()
+job_queue = JobQueue(
+    max_workers=config.ANALYZE_WORKERS,
+    max_pending=config.ANALYZE_MAX_PENDING,
+    ttl=config.JOB_TTL_SEC,
+    metrics=metrics,
+)
+_worker_local = threading.local()
+
+# 검출 모델은 첫 분석 때 로딩. ACC_PRELOAD_MODEL=1 이면 여기서 미리 읽어서
+# gunicorn preload_app 일 때 워커들이 fork 후 가중치를 copy-on-write 로 공유한다.
+if config.PRELOAD_MODEL:
+    model_loader.preload()
 
 
 @app.route("/")
@@ -33,100 +72,475 @@ def index():
     return render_template("index.html")
 
 
-@app.route("/api/analyze", methods=["POST"])
-def analyze():
+def _session_files(upload_id):
+    """
+    upload_id → 세션 (인덱스 primary key 조회).
+    인덱스가 생기기 전에 UploadStore 로 올라온 업로드는 여기서 인덱스에 등록한다.
+    """
+    session = session_store.get(upload_id)
+    if session is not None or not upload_store.valid_id(upload_id):
+        return session
+
+    status = upload_store.status(upload_id)
+    if status is None:
+        return None
+    session_store.create(upload_id, {
+        kind: dict(info, path=upload_store.file_path(upload_id, kind) if info["complete"] else None)
+        for kind, info in status.items()
+    }, status="uploaded" if upload_store.complete(upload_id) else "uploading")
+    return session_store.get(upload_id)
+
+
+def _evict(protect=()):
+    """디스크 quota / 방치된 업로드 정리 (세션 인덱스 + 업로드 파일)."""
+    for upload_id in session_store.evict(protect=protect):
+        upload_store.delete(upload_id)
+
+
+def _get_video_processor():
+    """
+    model.track(persist=True) 는 tracker 상태를 모델 객체에 보관하므로
+    워커 스레드마다 VideoProcessor 를 따로 둔다.
+    """
+    vp = getattr(_worker_local, "video_processor", None)
+    if vp is None:
+        vp = VideoProcessor()
+        _worker_local.video_processor = vp
+    return vp
+
+
+def _plan_overlay(job, telemetry, trajectory, meta, car_pos, n_frames, view=None):
+    """
+    sync + warp → 프레임별 오버레이 좌표 (real, ideal) + 프레임별 delta-time (없으면 None).
+    view : 선택, {"homography": H, "world_to_map": A} (트랙/카메라별 투영)
+    """
+    # --------------------------
+    # 5) YOLO speed vs Telemetry speed 동기화
+    # --------------------------
+    job.start_stage("sync")
+    job.set_items(n_frames, "frames")
+    yolo_speed = sync_calibrator.compute_yolo_speed(car_pos)
+    tel_speed = telemetry["speed"].values
+    tel_time = telemetry["time"].values
+
+    sync = sync_calibrator.auto_sync_time(yolo_speed, meta["fps"], tel_speed, tel_time)
+
+    frame_map = sync_calibrator.generate_frame_map(
+        n_video=n_frames,
+        n_tel=len(tel_speed),
+        fps=meta["fps"],
+        tel_time=tel_time,
+        sync=sync
+    )
+    trajectory["frame_map"] = frame_map
+    trajectory["sync"] = sync
+
+    # --------------------------
+    # 6) 화면 좌표로 warp (real + ideal)
+    # --------------------------
+    job.start_stage("warp")
+    job.set_items(n_frames, "frames")
+    # fused 모드: 앞 구간만 검출된 상태, 나머지 프레임 길이만 맞춤
+    car_pos = FrameTrack.coerce(car_pos).pad(n_frames)
+    view = view or {}
+    warped_real, warped_ideal = line_warper.warp(
+        trajectory,
+        meta,
+        car_pos,
+        homography=view.get("homography"),
+        world_to_map=view.get("world_to_map"),
+    )
+
+    frame_delta = None
+    if trajectory.get("delta") is not None:
+        frame_delta = delta_engine.frame_delta(trajectory["delta"], frame_map)
+    return warped_real, warped_ideal, frame_delta
+
+
+def run_analysis(job, upload_id, video_path, tel_path, track=config.DEFAULT_TRACK, camera=None,
+                 video_hash=None, tel_hash=None, reference=None):
+    """
+    /api/analyze 작업 본체. 워커 스레드에서 실행된다.
+    video_hash / tel_hash : 업로드 중 계산한 sha256 (있으면 캐시 키 계산 시 파일을 다시 읽지 않음)
+    reference : 선택, delta-time 기준 랩 {"lap", 다른 세션이면 "upload_id", "tel_path", "tel_hash"}
+                (없으면 이 세션의 가장 빠른 완주 랩)
+    세션 인덱스에 분석 중 알게 된 메타데이터 / 출력 / 캐시 artifact 를 기록한다.
+    """
     try:
-        payload = request.json
-        upload_id = payload.get("upload_id")
-        if not upload_id:
-            return jsonify({"success": False, "error": "upload_id가 없습니다."}), 400
+        result = _run_analysis(job, upload_id, video_path, tel_path, track, camera,
+                               video_hash, tel_hash, reference or {})
+    except Exception:
+        session_store.update(upload_id, status="failed")
+        raise
 
-        # --------------------------
-        # 1) 업로드된 파일 찾기
-        # --------------------------
-        video_path, tel_path = None, None
-        for f in os.listdir(config.UPLOAD_DIR):
-            if f.startswith(upload_id):
-                p = os.path.join(config.UPLOAD_DIR, f)
-                if f.lower().endswith(".mp4"):
-                    video_path = p
-                elif f.lower().endswith(".csv"):
-                    tel_path = p
-
-        if video_path is None or tel_path is None:
-            return jsonify({
-                "success": False,
-                "error": f"업로드 ID {upload_id} 에 해당하는 mp4/csv 파일을 찾을 수 없습니다."
-            }), 400
+    output_path = os.path.join(config.OUTPUT_DIR, result["output_video"])
+    session_store.update(
+        upload_id, status="analyzed", output_path=output_path,
+        output_size=os.path.getsize(output_path) if os.path.isfile(output_path) else None,
+    )
+    _evict(protect=(upload_id,))
+    return result
 
-        # --------------------------
-        # 2) 영상 메타 + YOLO 궤적
-        # --------------------------
-        meta, yolo_traj = video_processor.process(video_path)
-        car_pos = yolo_traj.get("car_pos", [])
 
-        if len(car_pos) == 0:
-            return jsonify({
-                "success": False,
-                "error": "YOLO 트래킹 결과(car_pos)가 비어 있습니다."
-            }), 500
+def _record_artifact(upload_id, cache, namespace, key):
+    if cache is not None and key is not None:
+        session_store.add_artifact(upload_id, namespace, key, cache.path(namespace, key))
 
-        # --------------------------
-        # 3) 텔레메트리 파싱 & Trajectory 생성
-        # --------------------------
-        telemetry = telemetry_parser.parse_file(tel_path)
-        trajectory = trajectory_analyzer.create_trajectory(telemetry)
 
+def _reference_lap(reference, telemetry, laps, tel_hash, lap_length):
+    """delta-time 기준 랩 (기준 grid 는 텔레메트리 해시 + 랩 번호로 캐시)."""
+    lap = reference.get("lap")
+    if reference.get("upload_id"):
+        def load():
+            ref_tel = telemetry_parser.parse_file(reference["tel_path"], columns=PIPELINE_COLUMNS,
+                                                  file_hash=reference.get("tel_hash"))
+            return lap_segmenter.split(ref_tel, lap_length)
+
+        return delta_engine.reference(reference.get("tel_hash"), load, lap, lap_length)
+
+    return delta_engine.reference(tel_hash or telemetry.attrs.get("cache_key"), lambda: laps, lap, lap_length)
+
+
+def _run_analysis(job, upload_id, video_path, tel_path, track, camera, video_hash, tel_hash, reference):
+    video_processor = _get_video_processor()
+
+    # --------------------------
+    # 2) 텔레메트리 파싱 & Trajectory 생성
+    # --------------------------
+    job.start_stage("telemetry")
+    telemetry = telemetry_parser.parse_file(tel_path, columns=PIPELINE_COLUMNS, file_hash=tel_hash)
+    job.set_items(len(telemetry), "rows")
+    session_store.update(upload_id, tel_rows=len(telemetry))
+    _record_artifact(upload_id, telemetry_parser.cache, "telemetry", telemetry.attrs.get("cache_key"))
+
+    job.start_stage("trajectory")
+    job.set_items(len(telemetry), "rows")
+    track_cfg = track_registry.config(track)
+    laps = lap_segmenter.split(telemetry, track_cfg.get("length_m"))
+    trajectory = trajectory_analyzer.create_trajectory(telemetry, laps)
+
+    # --------------------------
+    # 3) Ideal line 매핑 (트랙별 ideal CSV, extract_ideal_line에서 생성)
+    # --------------------------
+    job.start_stage("ideal_line")
+    job.set_items(len(telemetry), "rows")
+    ideal_line = track_registry.get(track)
+    trajectory = trajectory_analyzer.attach_ideal_line(trajectory, ideal_line)
+    trajectory = trajectory_analyzer.attach_lateral_offset(trajectory, ideal_line)
+    view = {"world_to_map": ideal_line.world_to_map}
+
+    # --------------------------
+    # 랩별 분석 (모든 랩을 공유 거리 grid 에서 한 번에)
+    # --------------------------
+    job.start_stage("laps")
+    job.set_items(len(telemetry), "rows")
+    resampled = perf_analyzer.resample_laps(telemetry, laps, trajectory)
+    lap_result = perf_analyzer.analyze_laps(telemetry, laps, resampled=resampled)
+
+    # 코너 / 섹터 지표 (텔레메트리 해시로 캐시, 세션 간 집계는 /api/tracks/<track>/corners)
+    corner_table = perf_analyzer.corner_metrics(
+        laps, resampled, track_cfg, session_hash=tel_hash or telemetry.attrs.get("cache_key"),
+    )
+    _record_artifact(upload_id, perf_analyzer.cache, "corner_metrics", corner_table["key"])
+    for i, lap_row in enumerate(lap_result["laps"]):
+        lap_row["corners"] = perf_analyzer.corner_rows(corner_table, i)
+    corner_summary = perf_analyzer.aggregate_corners([corner_table])
+
+    # 주행 이벤트 (RLE) → 코너별 피드백
+    events = event_detector.detect(telemetry, laps, corner_table["corners"])
+    per_lap = events.counts(len(laps))
+    for i, lap_row in enumerate(lap_result["laps"]):
+        lap_row["events"] = {t: c[i] for t, c in per_lap.items()}
+    corner_feedback = ai_feedback.corner_feedback(events, corner_table)
+
+    # 기준 랩 대비 delta-time (랩별 + 섹터별 + 오버레이용 행별)
+    try:
+        ref = _reference_lap(reference, telemetry, laps, tel_hash, track_cfg.get("length_m"))
+    except (ValueError, KeyError, OSError) as e:
+        print("[Analyze] delta-time 생략:", e)
+        ref, reference_info = None, {"error": str(e)}
+    if ref is not None:
+        delta = delta_engine.compare(laps, ref, track_cfg.get("sectors"))
+        for lap_row, d in zip(lap_result["laps"], delta_engine.summarize(delta)):
+            lap_row.update(d)
+        trajectory["delta"] = delta_engine.row_delta(laps, ref)
+        reference_info = dict(ref.to_dict(), upload_id=reference.get("upload_id") or upload_id,
+                              sector_bounds=delta["sector_bounds"].tolist(),
+                              sector_times=[float(v) for v in delta["ref_sector_times"]])
+    performance = perf_analyzer.analyze(telemetry, trajectory)
+    feedback = ai_feedback.generate_feedback(telemetry, trajectory, performance)
+
+    job.start_stage("video_meta")
+    video_meta, n_video = read_video_meta(video_path)
+    job.set_items(n_video, "frames")
+    session_store.update(
+        upload_id, frames=n_video, fps=video_meta["fps"],
+        duration_sec=n_video / video_meta["fps"] if video_meta["fps"] else None,
+    )
+    if line_warper.mode == "homography":
+        view["homography"] = track_registry.homography(track, camera, n_frames=n_video)
+
+    output_name = f"{upload_id}_overlay.mp4"
+    output_path = os.path.join(config.OUTPUT_DIR, output_name)
+
+    if config.FUSED_PIPELINE:
         # --------------------------
-        # 4) Ideal line 매핑 (ACC ideal CSV)
+        # 4~7) 검출 + sync/warp + 렌더링을 한 번의 디코딩으로
         # --------------------------
-        trajectory = trajectory_analyzer.attach_ideal_line(
-            trajectory,
-            "ideal_line/spa_ideal.csv"  # extract_ideal_line에서 생성
+        job.start_stage("tracking")
+
+        def plan(meta, car_pos, n_frames):
+            if len(car_pos) == 0:
+                raise RuntimeError("YOLO 트래킹 결과(car_pos)가 비어 있습니다.")
+            planned = _plan_overlay(job, telemetry, trajectory, meta, car_pos, n_frames, view)
+            job.start_stage("render")
+            job.set_items(n_frames, "frames")
+            return planned
+
+        _, yolo_traj, _, _ = video_processor.process_and_render(
+            video_path,
+            output_path,
+            plan,
+            progress=job.progress_callback("render"),
+            video_hash=video_hash,
         )
 
+    else:
         # --------------------------
-        # 5) YOLO speed vs Telemetry speed 동기화
+        # 4) 영상 메타 + YOLO 궤적
         # --------------------------
-        yolo_speed = sync_calibrator.compute_yolo_speed(car_pos)
-        tel_speed = telemetry["speed"].values
-
-        offset = sync_calibrator.auto_sync_speed(yolo_speed, tel_speed)
-
-        frame_map = sync_calibrator.generate_frame_map(
-            n_video=len(yolo_speed),
-            n_tel=len(tel_speed),
-            offset=offset
+        job.start_stage("tracking")
+        job.set_items(n_video, "frames")
+        meta, yolo_traj = video_processor.process(
+            video_path, progress=job.progress_callback("tracking"), video_hash=video_hash
         )
-        trajectory["frame_map"] = frame_map
+        car_pos = yolo_traj.get("car_pos", [])
+
+        if len(car_pos) == 0:
+            raise RuntimeError("YOLO 트래킹 결과(car_pos)가 비어 있습니다.")
 
         # --------------------------
-        # 6) 화면 좌표로 warp (real + ideal)
+        # 5~6) sync + warp
         # --------------------------
-        warped_real, warped_ideal = line_warper.warp(
-            trajectory,
-            meta,
-            car_pos
+        warped_real, warped_ideal, frame_delta = _plan_overlay(
+            job, telemetry, trajectory, meta, car_pos, len(car_pos), view
         )
 
         # --------------------------
         # 7) 최종 오버레이 영상 렌더링
         # --------------------------
-        output_name = f"{upload_id}_overlay.mp4"
-        output_path = os.path.join(config.OUTPUT_DIR, output_name)
-
+        job.start_stage("render")
+        job.set_items(len(car_pos), "frames")
         video_processor.render_overlay(
             video_path,
             warped_real,
             warped_ideal,
             yolo_traj,
-            output_path
+            output_path,
+            progress=job.progress_callback("render"),
+            frame_delta=frame_delta,
         )
 
+    _record_artifact(upload_id, video_processor.cache, "track", yolo_traj.get("cache_key"))
+
+    # world_to_map 이 없는 트랙은 lateral offset 을 구하지 않는다 (null)
+    lateral = np.abs(trajectory.get("lateral_offset", np.zeros(0)))
+    return {
+        "output_video": output_name,
+        "track": track,
+        "sync": trajectory["sync"],
+        "laps": lap_result["laps"],
+        "best_lap": lap_result["best_lap"],
+        "reference": reference_info,
+        "corners": corner_summary["corners"],
+        "sectors": corner_summary["sectors"],
+        "performance": performance,
+        "feedback": feedback,
+        "corner_feedback": corner_feedback,
+        "events": events.counts(),
+        "lateral_offset": {
+            "mean_abs": float(lateral.mean()) if lateral.size else None,
+            "max_abs": float(lateral.max()) if lateral.size else None,
+        },
+    }
+
+
+def _upload_response(upload_id, code=200):
+    files = upload_store.status(upload_id)
+    return jsonify({
+        "success": True,
+        "upload_id": upload_id,
+        "chunk_size": config.UPLOAD_CHUNK_SIZE,
+        "files": files,
+        "upload_urls": {kind: f"/api/upload/{upload_id}/{kind}" for kind in files},
+        "complete": all(f["complete"] for f in files.values()),
+    }), code
+
+
+def _create_upload(files):
+    upload_id = upload_store.create(files)
+    session_store.create(upload_id, {
+        kind: dict(info, path=upload_store.file_path(upload_id, kind))
+        for kind, info in upload_store.status(upload_id).items()
+    })
+    # 새 업로드가 들어올 자리 확보
+    _evict(protect=(upload_id,))
+    return upload_id
+
+
+def _record_chunk(upload_id, kind, info):
+    """파일 하나가 다 들어오면 세션 인덱스에 경로/해시 기록."""
+    if info["complete"]:
+        session_store.set_file(upload_id, kind, upload_store.file_path(upload_id, kind),
+                               info["sha256"], info["size"])
+    else:
+        session_store.touch(upload_id)
+    return info
+
+
+@app.route("/api/upload", methods=["POST"])
+def upload():
+    """
+    업로드 생성.
+    - JSON {"files": {"video": {"name", "size"}, "telemetry": {...}}}
+        → upload_id + 종류별 PUT 주소. 본문은 PUT /api/upload/<id>/<kind> 로 청크 단위 전송.
+    - multipart (video, telemetry 필드) : 한 번에 올리는 기존 방식.
+        werkzeug 가 큰 파일은 임시 파일로 받아 두므로 거기서 업로드 디렉터리로 복사 + 해시.
+    """
+    try:
+        if request.files:
+            files = {kind: request.files[kind] for kind in ("video", "telemetry") if kind in request.files}
+            if len(files) != 2:
+                return jsonify({"success": False, "error": "video 와 telemetry 파일이 모두 필요합니다."}), 400
+            sizes = {}
+            for kind, fs in files.items():
+                fs.stream.seek(0, os.SEEK_END)
+                sizes[kind] = {"name": fs.filename, "size": fs.stream.tell()}
+                fs.stream.seek(0)
+            upload_id = _create_upload(sizes)
+            for kind, fs in files.items():
+                _record_chunk(upload_id, kind, upload_store.write_chunk(upload_id, kind, fs.stream, 0))
+            return _upload_response(upload_id, 201)
+
+        payload = request.get_json(silent=True)
+        upload_id = _create_upload(payload.get("files") if isinstance(payload, dict) else None)
+        return _upload_response(upload_id, 201)
+
+    except UploadError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+
+@app.route("/api/upload/<upload_id>", methods=["GET"])
+def upload_status(upload_id):
+    """이어 올리기용: 종류별 received 부터 다시 보내면 된다."""
+    try:
+        if upload_store.status(upload_id) is None:
+            return jsonify({"success": False, "error": f"업로드 {upload_id} 를 찾을 수 없습니다."}), 404
+        return _upload_response(upload_id)
+    except UploadError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+
+@app.route("/api/upload/<upload_id>/<kind>", methods=["PUT"])
+def upload_chunk(upload_id, kind):
+    """청크 하나 (Content-Range: bytes start-end/total). 본문은 메모리에 모으지 않고 바로 파일로."""
+    try:
+        start = parse_content_range(request.headers.get("Content-Range"))
+        info = _record_chunk(upload_id, kind, upload_store.write_chunk(
+            upload_id, kind, request.stream, start, length=request.content_length
+        ))
+        return jsonify(dict(success=True, upload_id=upload_id, kind=kind, **info))
+
+    except UploadOffsetError as e:
+        return jsonify({"success": False, "error": str(e), "received": e.received}), 409
+
+    except UploadError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+
+@app.route("/api/analyze", methods=["POST"])
+def analyze():
+    try:
+        payload = request.json
+        upload_id = payload.get("upload_id")
+        if not upload_id:
+            return jsonify({"success": False, "error": "upload_id가 없습니다."}), 400
+
+        track = payload.get("track", config.DEFAULT_TRACK)
+        if not track_registry.has(track):
+            return jsonify({
+                "success": False,
+                "error": f"지원하지 않는 트랙입니다: {track} (사용 가능: {track_registry.available()})"
+            }), 400
+
+        camera = payload.get("camera")
+        if camera is not None and camera not in track_registry.cameras(track):
+            return jsonify({
+                "success": False,
+                "error": f"지원하지 않는 카메라입니다: {camera} (사용 가능: {track_registry.cameras(track)})"
+            }), 400
+
+        # delta-time 기준 랩: 다른 세션 (reference_upload) 의 랩도 쓸 수 있다
+        reference = {"lap": payload.get("reference_lap")}
+        ref_id = payload.get("reference_upload")
+        if ref_id and ref_id != upload_id:
+            ref_session = _session_files(ref_id)
+            if ref_session is None or not ref_session["tel_path"] or not os.path.isfile(ref_session["tel_path"]):
+                return jsonify({
+                    "success": False,
+                    "error": f"기준 세션 {ref_id} 의 텔레메트리를 찾을 수 없습니다."
+                }), 400
+            reference.update(upload_id=ref_id, tel_path=ref_session["tel_path"],
+                             tel_hash=ref_session["tel_hash"])
+
+        # --------------------------
+        # 1) 업로드된 파일 찾기
+        # --------------------------
+        session = _session_files(upload_id)
+        if session is not None and session["status"] == "uploading":
+            return jsonify({
+                "success": False,
+                "error": f"업로드 {upload_id} 가 아직 완료되지 않았습니다.",
+                "status_url": f"/api/upload/{upload_id}",
+            }), 409
+
+        video_path = session and session["video_path"]
+        tel_path = session and session["tel_path"]
+        if not (video_path and tel_path and os.path.isfile(video_path) and os.path.isfile(tel_path)):
+            return jsonify({
+                "success": False,
+                "error": f"업로드 ID {upload_id} 에 해당하는 mp4/csv 파일을 찾을 수 없습니다."
+            }), 400
+
+        # 프레임별 homography (.npy) 는 영상 길이만큼 있어야 한다 → 트래킹 전에 확인
+        if line_warper.mode == "homography":
+            try:
+                track_registry.homography(track, camera, n_frames=read_video_meta(video_path)[1])
+            except (ValueError, OSError, RuntimeError) as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+
+        # 대기/실행 중에는 정리 대상에서 빠진다
+        session_store.update(upload_id, status="analyzing", track=track)
+
+        # 나머지 단계는 워커 풀에서 실행하고 job id 만 바로 돌려준다
+        try:
+            job = job_queue.submit(
+                run_analysis, upload_id, video_path, tel_path, track, camera,
+                session["video_hash"], session["tel_hash"], reference,
+                stages=ANALYZE_STAGES
+            )
+        except QueueFullError:
+            session_store.update(upload_id, status=session["status"])
+            raise
+
         return jsonify({
             "success": True,
-            "output_video": output_name
-        })
+            "job_id": job.id,
+            "status_url": f"/api/jobs/{job.id}"
+        }), 202
+
+    except QueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
 
     except Exception as e:
         # 디버그용 로그
@@ -134,5 +548,104 @@ def analyze():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/sessions", methods=["GET"])
+def sessions():
+    """
+    세션 목록 (최신순).
+    ?track=&status=&video_hash=&tel_hash=  컬럼 필터
+    ?since=&until=                         created_at 범위 (unix time)
+    ?limit=&offset=                        페이지
+    """
+    try:
+        args = request.args
+        rows, total = session_store.list(
+            since=args.get("since", type=float),
+            until=args.get("until", type=float),
+            limit=min(args.get("limit", 50, type=int), 1000),
+            offset=args.get("offset", 0, type=int),
+            **{k: args.get(k) for k in SESSION_FILTERS},
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return jsonify({
+        "success": True,
+        "sessions": rows,
+        "total": total,
+        "disk_usage_bytes": session_store.disk_usage(),
+        "disk_quota_bytes": config.DISK_QUOTA_BYTES or None,
+    })
+
+
+@app.route("/api/sessions/<upload_id>", methods=["GET", "DELETE"])
+def session_detail(upload_id):
+    session = session_store.get(upload_id)
+    if session is None:
+        return jsonify({"success": False, "error": f"세션 {upload_id} 를 찾을 수 없습니다."}), 404
+
+    if request.method == "DELETE":
+        if session["status"] == "analyzing":
+            return jsonify({"success": False, "error": f"세션 {upload_id} 는 분석 중입니다."}), 409
+        session_store.delete(upload_id)
+        upload_store.delete(upload_id)
+        return jsonify({"success": True, "upload_id": upload_id})
+
+    return jsonify({"success": True, "session": session})
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"success": True})
+
+
+@app.route("/api/tracks", methods=["GET"])
+def tracks():
+    return jsonify({"success": True, "tracks": track_registry.available()})
+
+
+@app.route("/api/tracks/<track>/corners", methods=["GET"])
+def track_corners(track):
+    """
+    트랙의 코너/섹터 지표를 분석된 세션 전체 (완주 랩) 로 집계.
+    ?since=&until=  세션 created_at 범위 (unix time)
+    ?limit=         최근 세션 수
+    세션별 지표는 분석 때 캐시해 둔 corner_metrics artifact 를 읽기만 한다.
+    """
+    args = request.args
+    try:
+        found = session_store.find_artifacts(
+            "corner_metrics", track=track,
+            since=args.get("since", type=float),
+            until=args.get("until", type=float),
+            limit=min(args.get("limit", 100, type=int), 1000),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    tables, sessions = [], []
+    for a in found:
+        table = perf_analyzer.load_corner_metrics(a["key"])
+        if table is not None:
+            tables.append(table)
+            sessions.append(a["upload_id"])
+
+    return jsonify(dict(success=True, track=track, sessions=sessions,
+                        **perf_analyzer.aggregate_corners(tables)))
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"작업 {job_id} 를 찾을 수 없습니다."}), 404
+
+    return jsonify(dict(success=True, **job.to_dict()))
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
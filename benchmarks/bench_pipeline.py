@@ -0,0 +1,225 @@
+"""
+모듈별 + 전체 파이프라인 벤치마크 (합성 세션, CPU 만 사용, 오프라인).
+
+    python -m benchmarks.bench_pipeline --duration 600 --frames 900 --out bench.json
+
+입력은 benchmarks.synthetic 으로 임시 디렉터리에 만들고, 디스크 캐시는 모두 끈 상태로 잰다.
+결과 JSON 은 커밋 사이 비교용 (git commit, 환경 정보 + 케이스별 best/mean 시간, 처리량).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import config
+from benchmarks.synthetic import StubDetector, make_ideal_line, make_telemetry_csv, make_video
+
+
+def _workdir(keep):
+    """합성 입력/출력 디렉터리. --keep 이면 남겨 두고, 아니면 끝날 때 지운다."""
+    if keep:
+        return contextlib.nullcontext(tempfile.mkdtemp(prefix="acc_bench_"))
+    return tempfile.TemporaryDirectory(prefix="acc_bench_", ignore_cleanup_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench(fn, repeat=3):
+    """fn() 을 repeat 번 실행 → (best, mean, 마지막 반환값)."""
+    times, out = [], None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t)
+    return min(times), float(np.mean(times)), out
+
+
+def _run_cases(cases, args, results):
+    for name, fn, unit in cases:
+        if args.only and name not in args.only:
+            # 뒤 케이스들은 앞 케이스 결과를 쓰므로 한 번은 실행해 둔다
+            fn()
+            continue
+        best, mean, items = bench(fn, args.repeat)
+        results[name] = {
+            "best_sec": best,
+            "mean_sec": mean,
+            "items": items,
+            "unit": unit,
+            "items_per_sec": items / best if best > 0 else None,
+        }
+        print(f"[Bench] {name:<12}{best:>10.4f} s  ({items / max(best, 1e-9):,.0f} {unit}/s)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", type=float, default=600.0, help="텔레메트리 길이 (초)")
+    ap.add_argument("--rate", type=float, default=60.0, help="텔레메트리 샘플링 (Hz)")
+    ap.add_argument("--frames", type=int, default=900, help="합성 영상 프레임 수")
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=360)
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="*", help="실행할 케이스 이름만 (예: telemetry sync)")
+    ap.add_argument("--out", help="결과 JSON 경로 (없으면 stdout)")
+    ap.add_argument("--keep", action="store_true", help="합성 입력/출력 임시 디렉터리 유지")
+    args = ap.parse_args()
+
+    # 캐시 / 병렬 렌더링은 끄고 순수 계산 비용만 잰다
+    config.TRACK_CACHE_ENABLED = False
+    config.TELEMETRY_CACHE_ENABLED = False
+    config.RENDER_WORKERS = 1
+
+    from modules.frame_source import read_video_meta
+    from modules.job_queue import JobQueue
+    from modules.line_warp import LineWarpEngine
+    from modules.sync_calibrator import SyncCalibrator
+    from modules.telemetry_parser import PIPELINE_COLUMNS, TelemetryParser
+    from modules.track_registry import TrackRegistry
+    from modules.trajectory_analyzer import TrajectoryAnalyzer
+    from modules.video_processor import VideoProcessor
+
+    with _workdir(args.keep) as tmp:
+        csv_path = os.path.join(tmp, "session.csv")
+        video_path = os.path.join(tmp, "session.mp4")
+        ideal_dir = os.path.join(tmp, "ideal_line")
+        out_video = os.path.join(tmp, "overlay.mp4")
+
+        print(f"[Bench] 합성 입력 생성: {tmp}")
+        n_rows = make_telemetry_csv(csv_path, args.duration, args.rate)
+        make_video(video_path, args.frames, args.width, args.height, args.fps)
+        make_ideal_line(os.path.join(ideal_dir, "bench_ideal.csv"))
+
+        # world_to_map 이 있어야 lateral offset 투영까지 측정된다 (합성 데이터라 identity)
+        registry = TrackRegistry(
+            tracks={"bench": {"length_m": 7004.0, "world_to_map": [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]}},
+            ideal_dir=ideal_dir,
+        )
+        ideal_line = registry.get("bench")
+        meta, n_frames = read_video_meta(video_path)
+
+        parser = TelemetryParser(cache_dir=False)
+        analyzer = TrajectoryAnalyzer()
+        sync = SyncCalibrator()
+        warper = LineWarpEngine()
+        vp = VideoProcessor(cache_dir=False, keyframe=False, roi=False, detector=StubDetector())
+
+        # 케이스 사이에 넘겨 쓰는 중간 결과
+        state = {}
+
+        def case_telemetry():
+            state["telemetry"] = parser.parse_file(csv_path, columns=PIPELINE_COLUMNS)
+            return len(state["telemetry"])
+
+        def case_trajectory():
+            traj = analyzer.create_trajectory(state["telemetry"])
+            traj = analyzer.attach_ideal_line(traj, ideal_line)
+            state["trajectory"] = analyzer.attach_lateral_offset(traj, ideal_line)
+            return len(traj["x"])
+
+        def case_tracking():
+            _, yolo_traj = vp.process(video_path)
+            state["yolo_traj"] = yolo_traj
+            return len(yolo_traj["car_pos"])
+
+        def case_sync():
+            tel = state["telemetry"]
+            car_pos = state["yolo_traj"]["car_pos"]
+            speed = sync.compute_yolo_speed(car_pos)
+            s = sync.auto_sync_time(speed, meta["fps"], tel["speed"].values, tel["time"].values)
+            state["trajectory"]["frame_map"] = sync.generate_frame_map(
+                n_video=len(car_pos), n_tel=len(tel), fps=meta["fps"],
+                tel_time=tel["time"].values, sync=s,
+            )
+            return len(car_pos)
+
+        def case_warp():
+            car_pos = state["yolo_traj"]["car_pos"]
+            state["warped"] = warper.warp(state["trajectory"], meta, car_pos,
+                                          homography=registry.homography("bench"))
+            return len(car_pos)
+
+        def case_render():
+            real, ideal = state["warped"]
+            vp.render_overlay(video_path, real, ideal, state["yolo_traj"], out_video)
+            return n_frames
+
+        def case_pipeline():
+            # /api/analyze 와 같은 경로: 작업 큐 워커 스레드에서 run_analysis
+            # app 은 import 시점에 config 경로로 DB / 업로드 / 출력 / 캐시 디렉터리를 만들므로
+            # 저장소 대신 임시 디렉터리를 가리키게 한 뒤 import 한다
+            config.SESSION_DB = os.path.join(tmp, "sessions.db")
+            config.UPLOAD_DIR = os.path.join(tmp, "uploads")
+            config.OUTPUT_DIR = os.path.join(tmp, "outputs")
+            config.CACHE_DIR = os.path.join(tmp, "cache")
+            import app
+            app.telemetry_parser = parser
+            app.track_registry = registry
+            app._get_video_processor = lambda: vp
+            job = JobQueue(max_workers=1).submit(
+                app.run_analysis, "bench", video_path, csv_path, "bench",
+                stages=app.ANALYZE_STAGES,
+            )
+            while job.finished_at is None:
+                time.sleep(0.01)
+            if job.error:
+                raise RuntimeError(job.error)
+            state["pipeline_timings"] = job.timings
+            return n_frames
+
+        cases = [
+            ("telemetry", case_telemetry, "rows"),
+            ("trajectory", case_trajectory, "rows"),
+            ("tracking", case_tracking, "frames"),
+            ("sync", case_sync, "frames"),
+            ("warp", case_warp, "frames"),
+            ("render", case_render, "frames"),
+            ("pipeline", case_pipeline, "frames"),
+        ]
+
+        results = {}
+        _run_cases(cases, args, results)
+
+    if "pipeline" in results:
+        results["pipeline"]["stages"] = state.get("pipeline_timings")
+
+    report = {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "params": {
+            "duration_sec": args.duration, "rate_hz": args.rate, "rows": n_rows,
+            "frames": n_frames, "width": args.width, "height": args.height, "fps": args.fps,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[Bench] 결과 저장: {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+TelemetryParser 정리 단계 micro-benchmark (기존 Python 루프 vs 벡터화).
+
+    python -m benchmarks.bench_telemetry_cleanup --rows 1000000
+
+unit row 제거 직후와 같은 상태(문자열 object 컬럼 + 중복 컬럼)의 DataFrame 을 만들어
+flatten / 숫자 변환 / outlap 탐색을 각각 측정한다.
+to_numeric_dirty 는 빈 칸 / '-' 가 섞인 프레임 (coerce 경로),
+csv_dirty 는 같은 셀이 섞인 CSV 를 기존 파서 vs fast path 로 읽는 시간.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_telemetry_csv
+from modules.telemetry_parser import TelemetryParser, flatten_columns, to_numeric_frame, outlap_start
+
+
+# ----------------------------------------
+# 기존 구현 (비교 기준)
+# ----------------------------------------
+def legacy_flatten(df):
+    fixed = pd.DataFrame()
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s, pd.DataFrame):
+            s = s.iloc[:, 0]
+        fixed[col] = s
+    return fixed
+
+
+def legacy_to_numeric(df):
+    df = df.copy()
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def legacy_outlap_start(dist):
+    start_idx = None
+    for i in range(1, len(dist)):
+        if dist[i] > dist[i - 1] + 0.5:
+            start_idx = i
+            break
+    return start_idx
+
+
+def make_frame(rows, n_cols=12, outlap_frac=0.3, blank_frac=0.0, seed=0):
+    """
+    문자열 값으로 된 텔레메트리 프레임 (마지막 컬럼은 중복 이름).
+    blank_frac : 채널 셀 중 이 비율을 빈 칸 / '-' 로 바꾼다
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for k in range(n_cols):
+        col = np.round(rng.normal(100, 30, rows), 3).astype(str).astype(object)
+        if blank_frac > 0:
+            holes = np.flatnonzero(rng.random(rows) < blank_frac)
+            col[holes] = np.where(rng.random(len(holes)) < 0.5, "", "-")
+        data[f"ch{k}"] = col
+
+    # 앞 outlap_frac 구간은 정지 상태, 이후 distance 증가
+    n_out = int(rows * outlap_frac)
+    dist = np.concatenate([np.zeros(n_out), np.cumsum(rng.uniform(0.6, 1.2, rows - n_out))])
+    data["distance"] = np.round(dist, 3).astype(str).astype(object)
+
+    df = pd.DataFrame(data)
+    dup = df[["ch0"]]
+    return pd.concat([df, dup], axis=1), dist
+
+
+def bench(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--blank-frac", type=float, default=0.01)
+    args = ap.parse_args()
+
+    df, dist = make_frame(args.rows)
+    flat = flatten_columns(df)
+    dirty = flatten_columns(make_frame(args.rows, blank_frac=args.blank_frac, seed=1)[0])
+
+    # 결과가 같은지 먼저 확인
+    assert legacy_flatten(df).columns.equals(flat.columns)
+    assert np.allclose(legacy_to_numeric(flat).to_numpy(dtype=float), to_numeric_frame(flat).to_numpy())
+    assert np.allclose(legacy_to_numeric(dirty).to_numpy(dtype=float), to_numeric_frame(dirty).to_numpy(),
+                       equal_nan=True)
+    assert legacy_outlap_start(dist) == outlap_start(dist)
+
+    # 1M 행 CSV 라 끝나면 지움
+    with tempfile.TemporaryDirectory(prefix="acc_bench_cleanup_") as tmp:
+        csv_path = os.path.join(tmp, "dirty.csv")
+        make_telemetry_csv(csv_path, duration_sec=args.rows / 60.0, blank_frac=args.blank_frac)
+        parser = TelemetryParser()
+        parser.cache = None     # 매번 실제로 파싱
+        slow, fast = parser.parse_file(csv_path, fast=False), parser.parse_file(csv_path, fast=True)
+        assert list(slow.columns) == list(fast.columns)
+        assert np.allclose(slow.to_numpy(dtype=float), fast.to_numpy(dtype=float), equal_nan=True, atol=1e-3)
+
+        cases = [
+            ("flatten", lambda: legacy_flatten(df), lambda: flatten_columns(df)),
+            ("to_numeric", lambda: legacy_to_numeric(flat), lambda: to_numeric_frame(flat)),
+            ("to_numeric_dirty", lambda: legacy_to_numeric(dirty), lambda: to_numeric_frame(dirty)),
+            ("outlap", lambda: legacy_outlap_start(dist), lambda: outlap_start(dist)),
+            ("csv_dirty", lambda: parser.parse_file(csv_path, fast=False),
+             lambda: parser.parse_file(csv_path, fast=True)),
+        ]
+
+        print(f"rows = {args.rows:,}")
+        print(f"{'stage':<18}{'legacy (s)':>12}{'vector (s)':>12}{'speedup':>10}")
+        for name, legacy, vector in cases:
+            t_old = bench(legacy, repeat=args.repeat)
+            t_new = bench(vector, repeat=args.repeat)
+            print(f"{name:<18}{t_old:>12.4f}{t_new:>12.4f}{t_old / max(t_new, 1e-9):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
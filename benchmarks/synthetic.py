@@ -0,0 +1,160 @@
+"""
+벤치마크용 합성 입력 (네트워크/GPU/실제 세션 파일 없이 재현 가능).
+
+- make_telemetry_csv : ACC (MoTeC CSV export) 형식 텔레메트리
+                       (앞쪽 메타데이터 preamble + "Time" 헤더 + unit row + 데이터)
+- make_video         : 차처럼 움직이는 밝은 blob 이 있는 mp4
+- make_ideal_line    : ideal_line/<track>_ideal.csv 형식 닫힌 곡선
+- StubDetector       : 밝은 blob 의 bbox 를 돌려주는 detector backend (모델 불필요)
+"""
+import os
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from modules.detectors import Detections
+
+
+# MoTeC CSV export 앞부분 (헤더 전까지는 파서가 건너뛰어야 함)
+PREAMBLE = [
+    '"Format","MoTeC CSV File"',
+    '"Venue","spa"',
+    '"Vehicle","bmw_m4_gt3"',
+    '"Driver","bench"',
+    '"Device","ACC"',
+    '"Comment",""',
+    '"Log Date","01/01/2024"',
+    '"Sample Rate","{rate}","Hz"',
+    '"Duration","{duration}","s"',
+    "",
+]
+
+# 파이프라인이 쓰는 채널 + 실제 export 에 섞여 있는 기타 채널
+CHANNELS = [
+    ("Time", "s"), ("Distance", "m"), ("SPEED", "km/h"), ("THROTTLE", "%"),
+    ("BRAKE", "%"), ("ROTY", "deg/s"), ("STEERANGLE", "deg"), ("GEAR", "no"),
+    ("RPMS", "rpm"), ("G_LAT", "G"), ("G_LON", "G"), ("LAP_BEACON", ""),
+]
+
+
+def make_telemetry_csv(path, duration_sec=600.0, rate=60.0, lap_length_m=7004.0,
+                       outlap_sec=5.0, extra_channels=0, blank_frac=0.0, seed=0):
+    """
+    duration_sec 길이, rate Hz 의 텔레메트리 CSV.
+    앞 outlap_sec 동안은 정지 상태 (distance 고정) → TelemetryParser 의 outlap 제거 경로도 탄다.
+    blank_frac : 0 보다 크면 time / distance 외 채널 셀 중 이 비율을 빈 칸 / '-' 로 바꾼다
+                 (센서가 빠진 구간이 있는 export 흉내)
+    반환: 데이터 행 수
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration_sec * rate)
+    t = np.arange(n) / rate
+
+    # 직선/코너가 반복되는 속도 프로파일 (km/h)
+    speed = 170 + 70 * np.sin(2 * np.pi * t / 23.0) + 15 * np.sin(2 * np.pi * t / 7.3)
+    speed += rng.normal(0, 1.0, n)
+    moving = t >= outlap_sec
+    speed[~moving] = 0.0
+
+    dist = np.cumsum(speed / 3.6 / rate)
+    roty = 25 * np.sin(2 * np.pi * t / 11.0) * moving
+    throttle = np.clip(60 + 60 * np.sin(2 * np.pi * t / 23.0 + 0.3), 0, 100)
+    brake = np.clip(-80 * np.sin(2 * np.pi * t / 23.0 + 0.3), 0, 100)
+    steer = 4 * roty / 25
+    gear = np.clip((speed / 45).astype(int) + 1, 1, 6)
+    rpm = 4000 + 30 * (speed % 45)
+    glat = speed / 3.6 * np.radians(roty) / 9.81
+    glon = np.gradient(speed / 3.6, 1 / rate) / 9.81
+    beacon = np.floor(dist / lap_length_m)
+
+    cols = [t, dist, speed, throttle, brake, roty, steer, gear, rpm, glat, glon, beacon]
+    names = [c for c, _ in CHANNELS]
+    units = [u for _, u in CHANNELS]
+    for k in range(extra_channels):
+        cols.append(rng.normal(0, 1, n))
+        names.append(f"EXTRA_{k}")
+        units.append("")
+
+    data = pd.DataFrame(np.column_stack(cols))
+    if blank_frac > 0:
+        data = data.map(lambda v: f"{v:.4f}")
+        holes = rng.random(data.shape) < blank_frac
+        holes[:, :2] = False
+        data = data.mask(holes, np.where(rng.random(data.shape) < 0.5, "", "-"))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for line in PREAMBLE:
+            f.write(line.format(rate=rate, duration=duration_sec) + "\n")
+        f.write(",".join(f'"{c}"' for c in names) + "\n")
+        f.write(",".join(f'"{u}"' for u in units) + "\n")
+        # 실제 export 처럼 값도 따옴표로 감싼다
+        data.to_csv(f, header=False, index=False, float_format="%.4f", quoting=1)
+    return n
+
+
+def make_video(path, n_frames=900, width=640, height=360, fps=30.0, seed=0):
+    """
+    어두운 배경 + 노이즈 위에서 차 크기의 밝은 사각형이 좌우/상하로 움직이는 mp4.
+    반환: blob 중심 (N, 2) 배열 (검출 정답)
+    """
+    rng = np.random.default_rng(seed)
+    vw = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    bg = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+
+    t = np.arange(n_frames) / fps
+    cx = width / 2 + 0.3 * width * np.sin(2 * np.pi * t / 6.0)
+    cy = height * 0.65 + 0.08 * height * np.sin(2 * np.pi * t / 2.5)
+    bw, bh = max(8, width // 10), max(6, height // 10)
+
+    for i in range(n_frames):
+        frame = bg.copy()
+        x0, y0 = int(cx[i] - bw / 2), int(cy[i] - bh / 2)
+        cv2.rectangle(frame, (x0, y0), (x0 + bw, y0 + bh), (230, 230, 230), -1)
+        vw.write(frame)
+    vw.release()
+    return np.column_stack([cx, cy])
+
+
+def make_ideal_line(path, n=5000, width=1200, height=800):
+    """ideal_line CSV (pixel_x, pixel_y, distance_raw, distance_norm) 형식의 닫힌 곡선."""
+    u = np.linspace(0, 2 * np.pi, n)
+    x = width / 2 + 0.4 * width * np.cos(u) + 0.05 * width * np.cos(3 * u)
+    y = height / 2 + 0.4 * height * np.sin(u)
+    d = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pd.DataFrame({
+        "pixel_x": x, "pixel_y": y, "distance_raw": d, "distance_norm": d / d[-1],
+    }).to_csv(path, index=False)
+
+
+class StubDetector:
+    """
+    밝은 픽셀 덩어리 하나의 bbox 를 돌려주는 detector backend.
+    모델 추론 비용을 빼고 파이프라인 나머지 (디코딩/선택 로직/sync/렌더링) 만 잰다.
+    """
+
+    name = "stub"
+    provides_ids = False
+    cache_id = ("stub",)
+
+    def __init__(self, threshold=128):
+        self.threshold = threshold
+
+    def available(self):
+        return True
+
+    def load(self):
+        return self
+
+    def reset(self):
+        pass
+
+    def predict(self, frame, imgsz=None):
+        g = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        ys, xs = np.nonzero(g > self.threshold)
+        if len(xs) == 0:
+            return Detections.empty()
+        return Detections([[xs.min(), ys.min(), xs.max(), ys.max()]], [1.0])
+
+    def track(self, frame):
+        return self.predict(frame)
@@ -2,8 +2,9 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
-OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+UPLOAD_DIR = os.environ.get("ACC_UPLOAD_DIR", os.path.join(BASE_DIR, "uploads"))
+OUTPUT_DIR = os.environ.get("ACC_OUTPUT_DIR", os.path.join(BASE_DIR, "outputs"))
+IDEAL_LINE_DIR = os.path.join(BASE_DIR, "ideal_line")
 
 # Default ACC Spa homography matrix (Eau Rouge → Raidillon)
 HOMOGRAPHY_MATRIX = [
@@ -11,3 +12,146 @@ HOMOGRAPHY_MATRIX = [
     [0.241, 5.885, -842.77],
     [0.0012, 0.0067, 1.0]
 ]
+
+# 트랙 등록 (ideal line 은 extract_ideal_line 으로 ideal_line/<track>_ideal.csv 생성)
+# 여기 없는 트랙도 ideal_line/<track>_ideal.csv 가 있으면 사용 가능
+#   length_m     : 한 바퀴 길이, 맵 픽셀 → 미터 환산용
+#   world_to_map : 선택, trajectory (x, y) → 맵 좌표 2x3 affine
+#   cameras      : 선택, 카메라 이름 → 맵 좌표 → 영상 좌표 homography
+#                  3x3 행렬 또는 프레임별 (N, 3, 3) .npy 경로 (움직이는 카메라)
+#   default_camera : cameras 중 기본값
+#   sectors      : 선택, 섹터 경계 거리 목록 (m, 랩 시작 기준). 없으면 랩을 3등분
+#   corners      : 선택, [{"name", "start", "apex", "end"} ...] (m, 랩 시작 기준, start 는 제동 구간 포함)
+#                  없으면 가장 빠른 랩의 속도 극소점으로 추정 (세션마다 달라질 수 있음)
+TRACKS = {
+    "spa": {
+        "name": "Circuit de Spa-Francorchamps",
+        "map": os.path.join(BASE_DIR, "static", "maps", "Spa-Map.png"),
+        "length_m": 7004.0,
+        "cameras": {"default": HOMOGRAPHY_MATRIX},
+        "default_camera": "default",
+    },
+}
+DEFAULT_TRACK = "spa"
+
+# 트랙 좌표 → 영상 좌표 변환 방식
+#   linear     : 예전 scale/offset 선형 매핑 (LineWarpEngine.world_to_screen), 기본값
+#   homography : 트랙/카메라별 homography 로 전체 프레임을 한 번에 투영.
+#                real 궤적은 트랙 설정의 world_to_map 으로 맵 좌표로 옮겨야 하므로
+#                world_to_map 이 없는 트랙에서는 real 만 linear 로 그린다
+WARP_MODE = os.environ.get("ACC_WARP_MODE", "linear")
+
+# 청크 업로드 (/api/upload)
+# 클라이언트가 PUT 한 번에 보내는 청크 크기 (끊겨도 이 단위로 이어 올림)
+UPLOAD_CHUNK_SIZE = int(os.environ.get("ACC_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+# 파일 하나의 최대 크기
+UPLOAD_MAX_BYTES = int(os.environ.get("ACC_UPLOAD_MAX_BYTES", 20 * 1024 ** 3))
+
+# 세션 인덱스 (SQLite): upload_id → 파일/해시/메타데이터/캐시 artifact
+SESSION_DB = os.environ.get("ACC_SESSION_DB", os.path.join(BASE_DIR, "sessions.db"))
+# 업로드 + 출력 + 캐시 artifact 디스크 상한 (GB, 0 = 제한 없음). 넘으면 오래 안 쓴 세션부터 삭제
+DISK_QUOTA_BYTES = int(float(os.environ.get("ACC_DISK_QUOTA_GB", 0)) * 1e9)
+# 이 시간(초) 동안 청크가 안 들어온 미완료 업로드는 삭제 (0 = 유지)
+UPLOAD_STALE_SEC = int(os.environ.get("ACC_UPLOAD_STALE_SEC", 24 * 3600))
+
+# 랩별 분석: 모든 랩이 공유하는 거리 grid 간격 (m)
+LAP_GRID_STEP_M = float(os.environ.get("ACC_LAP_GRID_STEP_M", 5.0))
+
+# 코너 지표 (PerformanceAnalyzer.corner_metrics)
+CORNER_DETECTION = {
+    "brake_on": 5.0,        # 이 값(%) 이상이면 제동 중
+    "throttle_on": 20.0,    # apex 이후 이 값(%) 이상이면 스로틀 pick-up
+    "min_drop_kmh": 15.0,   # 트랙 설정에 corners 가 없을 때 코너로 볼 최소 속도 감소
+    "match_m": 60.0,        # 세션 간 집계 때 apex 가 이 거리 (m) 안이면 같은 코너
+}
+
+# 주행 이벤트 검출 (EventDetector). 시간은 s, 페달은 %
+EVENT_DETECTION = {
+    "brake_on": CORNER_DETECTION["brake_on"],
+    "min_brake_sec": 0.2,        # 이보다 짧은 제동은 braking zone 으로 보지 않음
+    "trail_steer_deg": 10.0,     # steerangle 이 있을 때: 제동 중 이 각도 이상이면 trail-braking
+    "trail_yaw_deg": 5.0,        # steerangle 이 없을 때: roty (yaw rate, deg/s) 기준
+    "min_trail_sec": 0.2,
+    "coast_throttle": 5.0,       # 스로틀 / 브레이크 모두 이 값 미만이면 coasting
+    "coast_min_kmh": 80.0,       # 이보다 느린 구간 (피트, 헤어핀 apex) 은 제외
+    "min_coast_sec": 0.3,
+    "spin_ratio": 0.08,          # 뒷바퀴 / 앞바퀴 (또는 차량) 속도 - 1 이 이 값 이상이면 wheel-spin
+    "spin_throttle": 20.0,
+    "min_spin_sec": 0.1,
+    "hesitation_drop": 15.0,     # 스로틀을 여는 중 최고값 대비 이만큼 되돌리면 hesitation
+    "throttle_on": CORNER_DETECTION["throttle_on"],
+    "min_hesitation_sec": 0.1,
+}
+
+# 분석 작업 큐 (/api/analyze)
+# 동시에 실행할 분석 작업 수. YOLO/인코딩이 코어를 많이 쓰므로 기본은 코어 4개당 1개.
+ANALYZE_WORKERS = int(os.environ.get("ACC_ANALYZE_WORKERS", max(1, (os.cpu_count() or 1) // 4)))
+# 실행 + 대기 작업 상한 (초과 시 503)
+ANALYZE_MAX_PENDING = int(os.environ.get("ACC_ANALYZE_MAX_PENDING", 8))
+# 끝난 작업 결과를 메모리에 보관하는 시간(초)
+JOB_TTL_SEC = int(os.environ.get("ACC_JOB_TTL_SEC", 3600))
+
+# 검출 backend (첫 검출 때 로딩)
+#   ultralytics : PyTorch YOLO + tracker (GPU 서버)
+#   onnx        : export_detector.py 로 내보낸 ONNX 를 ONNX Runtime CPU 로 실행 (GPU 없는 서버)
+DETECTOR_BACKEND = os.environ.get("ACC_DETECTOR", "ultralytics")
+# ultralytics 모델. CPU 에서 ultralytics 를 쓸 거면 yolov8n.pt / yolov8s.pt 같은 작은 모델 권장
+MODEL_PATH = os.environ.get("ACC_MODEL_PATH", "models/yolov8x-worldv2.pt")
+# onnx 모델 (INT8 은 export_detector.py --int8 결과 *.int8.onnx)
+ONNX_MODEL_PATH = os.environ.get("ACC_ONNX_MODEL", "models/yolov8n.onnx")
+# onnx 모델에서 차로 볼 class id (쉼표 구분, 빈 값 = 전체). 기본 2 = COCO "car"
+ONNX_CLASSES = [int(c) for c in os.environ.get("ACC_ONNX_CLASSES", "2").split(",") if c.strip()] or None
+# ONNX Runtime intra-op 스레드 수 (0 = onnxruntime 기본값)
+ONNX_THREADS = int(os.environ.get("ACC_ONNX_THREADS", 0))
+# full-frame 추론 입력 크기 (정적 크기로 export 한 ONNX 는 모델 크기를 따름)
+DETECTOR_IMGSZ = int(os.environ.get("ACC_DETECTOR_IMGSZ", 640))
+# auto = cuda → mps → cpu 순서로 사용 가능한 것
+DEVICE = os.environ.get("ACC_DEVICE", "auto")
+# 1 이면 app import 시점(gunicorn preload_app 이면 fork 전)에 가중치를 미리 읽음 (cpu 전용)
+PRELOAD_MODEL = os.environ.get("ACC_PRELOAD_MODEL", "0") == "1"
+
+# 내용 해시 기반 디스크 캐시 (YOLO 트래킹 결과 등)
+CACHE_DIR = os.environ.get("ACC_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+TRACK_CACHE_ENABLED = os.environ.get("ACC_TRACK_CACHE", "1") != "0"
+TELEMETRY_CACHE_ENABLED = os.environ.get("ACC_TELEMETRY_CACHE", "1") != "0"
+
+# 디코더 스레드 → 검출/렌더링 사이 프레임 버퍼 크기 (장)
+FRAME_BUFFER_SIZE = int(os.environ.get("ACC_FRAME_BUFFER_SIZE", 32))
+# Fused 파이프라인 (검출 + 오버레이를 한 번의 디코딩으로)
+FUSED_PIPELINE = os.environ.get("ACC_FUSED_PIPELINE", "0") == "1"
+# Fused 모드에서 sync offset / drift 추정에 쓰는 영상 앞 구간 길이(초).
+# fused 모드는 이 구간의 car_pos 만으로 sync 하므로 (일반 경로는 영상 전체)
+# drift warp knot 도 이 구간 안에만 생긴다 → 구간 뒤쪽은 마지막 offset 그대로,
+# 즉 영상이 이보다 길면 drift 보정이 사실상 꺼진다 (경고 로그).
+# 장시간 stint 는 일반 경로를 쓰거나 영상 길이만큼 늘린다 (그만큼 앞 구간을 두 번 디코딩).
+FUSED_SYNC_WINDOW_SEC = float(os.environ.get("ACC_FUSED_SYNC_WINDOW_SEC", 60))
+
+# Keyframe 검출: N 프레임마다만 YOLO 를 돌리고 사이는 Kalman 예측으로 채움 (CPU 서버용)
+KEYFRAME_DETECTION_ENABLED = os.environ.get("ACC_KEYFRAME_DETECTION", "0") == "1"
+KEYFRAME_DETECTION = {
+    "min_stride": 1,      # 불안정할 때 검출 간격 (프레임)
+    "max_stride": int(os.environ.get("ACC_KEYFRAME_MAX_STRIDE", 8)),
+    "drift_px": 12.0,     # 예측-검출 차이가 이보다 크면 간격을 min_stride 로
+    "conf_min": 0.5,      # 검출 conf 가 이보다 낮으면 간격을 min_stride 로
+}
+
+# ROI 추론: 차를 잡은 뒤에는 예측 위치 주변 crop 에서만 검출 (놓치면 full-frame)
+ROI_DETECTION_ENABLED = os.environ.get("ACC_ROI_DETECTION", "0") == "1"
+ROI_DETECTION = {
+    "scale": 3.0,        # crop 한 변 = 차 bbox 긴 변 × scale
+    "min_size": 192,     # crop 최소 한 변 (px)
+    "max_imgsz": 640,    # crop 추론 입력 크기 상한
+}
+
+# 오버레이 병렬 렌더링 프로세스 수 (1 이면 단일 프로세스, 구간 병합에 ffmpeg 필요)
+RENDER_WORKERS = int(os.environ.get("ACC_RENDER_WORKERS", 1))
+# 구간 하나의 최소 프레임 수 (짧은 영상은 나누지 않음)
+RENDER_MIN_SEGMENT_FRAMES = int(os.environ.get("ACC_RENDER_MIN_SEGMENT_FRAMES", 600))
+
+# 영상 ↔ 텔레메트리 시간 동기화 (SyncCalibrator.auto_sync_time)
+SYNC_MAX_LAG_SEC = float(os.environ.get("ACC_SYNC_MAX_LAG_SEC", 0)) or None  # None = 제한 없음
+SYNC_COARSE_RATE = 2.0          # coarse 상관 샘플링 (Hz)
+SYNC_FINE_RATE = 20.0           # fine 상관 샘플링 (Hz)
+SYNC_DRIFT_WINDOW_SEC = 60.0    # drift 추정 구간 길이 (초)
+SYNC_MAX_DRIFT_SEC = 2.0        # 구간별 offset 이 전체 offset 에서 벗어날 수 있는 범위 (초)
+SYNC_MIN_WINDOW_SCORE = 0.3     # 이보다 상관이 낮은 구간은 drift 추정에서 제외
@@ -0,0 +1,193 @@
+"""
+YOLO (PyTorch) → ONNX export + 검증 도구 (GPU 없는 서버용 detector backend 준비).
+
+    python export_detector.py --model yolov8n.pt --imgsz 640 --int8 --video sample.mp4
+
+1) ultralytics 로 정적 입력 크기 ONNX export        → models/<name>.onnx
+2) --int8 이면 onnxruntime static QDQ quantization   → models/<name>.int8.onnx
+   (conv 모델이라 활성값까지 INT8 이어야 빨라진다. --video 프레임으로 calibration)
+3) --video 가 있으면 같은 프레임에서 PyTorch 기준과 ONNX (FP32 / INT8) 를
+   VideoProcessor 와 같은 "내 차" 선택 로직으로 돌려 car_pos 를 비교:
+     - 검출 일치율 : 두 backend 가 같은 프레임에서 차를 찾았는지/놓쳤는지
+     - 중심 오차   : 둘 다 찾은 프레임의 car_pos 거리 (px, 평균 / p95 / 최대)
+     - FPS        : 검출만의 처리 속도 (디코딩 제외)
+
+서버에서는 ACC_DETECTOR=onnx ACC_ONNX_MODEL=models/<name>.int8.onnx 로 사용.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+import config
+from modules.detectors import OnnxDetector, UltralyticsDetector, letterbox
+from modules.frame_source import FrameSource, read_video_meta
+from modules.frame_track import FrameTrackBuilder
+from modules.video_processor import VideoProcessor
+
+
+def export_onnx(model_path, imgsz, out_dir="models"):
+    from ultralytics import YOLO
+
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, os.path.basename(exported))
+    if os.path.abspath(exported) != os.path.abspath(out_path):
+        shutil.move(exported, out_path)
+    print(f"[Export] ONNX 저장: {out_path}")
+    return out_path
+
+
+class FrameCalibrationReader:
+    """
+    영상에서 고르게 뽑은 프레임을 detector 와 같은 letterbox 로 넣어 주는 calibration 입력.
+    (onnxruntime.quantization.CalibrationDataReader 인터페이스: get_next / rewind)
+    """
+
+    def __init__(self, onnx_path, video_path, frames, imgsz):
+        import onnxruntime as ort
+
+        inp = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0]
+        h, w = inp.shape[2], inp.shape[3]
+        size = (h, w) if isinstance(h, int) and isinstance(w, int) else (imgsz, imgsz)
+
+        _, n_video = read_video_meta(video_path)
+        stride = max(1, n_video // max(1, frames))
+        self.inputs = []
+        for idx, frame in FrameSource(video_path, config.FRAME_BUFFER_SIZE):
+            if idx % stride == 0:
+                self.inputs.append({inp.name: letterbox(frame, size)[0]})
+                if len(self.inputs) >= frames:
+                    break
+        self._it = iter(self.inputs)
+
+    def get_next(self):
+        return next(self._it, None)
+
+    def rewind(self):
+        self._it = iter(self.inputs)
+
+
+def quantize_int8(onnx_path, video_path, frames=100, imgsz=None):
+    """
+    static QDQ quantization: 가중치 (채널별) + 활성값 INT8.
+    활성값 범위는 영상 프레임 calibration (MinMax) 으로 정하고,
+    Conv / MatMul 만 양자화해서 box decode (Concat, Sigmoid 등) 는 float 로 남긴다.
+    """
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    out_path = onnx_path[: -len(".onnx")] + ".int8.onnx"
+    reader = FrameCalibrationReader(onnx_path, video_path, frames, imgsz or config.DETECTOR_IMGSZ)
+    print(f"[Export] calibration 프레임 {len(reader.inputs)} 장")
+
+    # shape inference + graph 정리 후 양자화 (onnxruntime 권장 전처리, 정적 크기라 symbolic 생략)
+    prep_path = onnx_path[: -len(".onnx")] + ".prep.onnx"
+    quant_pre_process(onnx_path, prep_path, skip_symbolic_shape=True)
+    quantize_static(
+        prep_path, out_path, reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        op_types_to_quantize=["Conv", "MatMul"],
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    os.remove(prep_path)
+    mb = lambda p: os.path.getsize(p) / 1e6
+    print(f"[Export] INT8 저장: {out_path} ({mb(onnx_path):.1f} MB → {mb(out_path):.1f} MB)")
+    return out_path
+
+
+def run_car_pos(detector, video_path, frames, conf):
+    """VideoProcessor 의 선택 로직 그대로 car_pos 를 만들고 검출 시간만 잰다."""
+    vp = VideoProcessor(conf=conf, cache_dir=False, keyframe=False, roi=False, detector=detector)
+    detector.load()
+    locate = vp._new_locator()
+
+    builder = FrameTrackBuilder(dim=2)
+    elapsed = 0.0
+    for idx, frame in FrameSource(video_path, config.FRAME_BUFFER_SIZE, end=frames):
+        t = time.perf_counter()
+        builder.append(locate(frame))
+        elapsed += time.perf_counter() - t
+    car_pos = builder.build()
+    return car_pos, len(car_pos) / max(elapsed, 1e-9)
+
+
+def compare(ref, other):
+    n = min(len(ref), len(other))
+    a, b = ref[:n], other[:n]
+    both = a.valid & b.valid
+    report = {
+        "frames": n,
+        "agreement": float((a.valid == b.valid).mean()) if n else None,
+        "ref_detected": int(a.count_valid()),
+        "detected": int(b.count_valid()),
+    }
+    if both.any():
+        d = np.hypot(*(a.values[both] - b.values[both]).astype(np.float64).T)
+        report.update(
+            drift_mean_px=float(d.mean()),
+            drift_p95_px=float(np.percentile(d, 95)),
+            drift_max_px=float(d.max()),
+        )
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="yolov8n.pt", help="export 할 ultralytics 모델 (.pt)")
+    ap.add_argument("--onnx", help="이미 export 한 ONNX (주면 export 생략)")
+    ap.add_argument("--imgsz", type=int, default=config.DETECTOR_IMGSZ)
+    ap.add_argument("--int8", action="store_true", help="INT8 static quantization 버전도 생성 (--video 필요)")
+    ap.add_argument("--video", help="calibration / 검증에 쓸 영상 (없으면 export 만)")
+    ap.add_argument("--frames", type=int, default=300, help="검증 프레임 수")
+    ap.add_argument("--calib-frames", type=int, default=100, help="INT8 calibration 프레임 수 (영상 전체에서 고르게)")
+    ap.add_argument("--classes", default=",".join(map(str, config.ONNX_CLASSES or [])),
+                    help="차로 볼 class id (쉼표 구분, 빈 값 = 전체, 기본 ACC_ONNX_CLASSES)")
+    ap.add_argument("--conf", type=float, default=0.4)
+    ap.add_argument("--device", default="cpu", help="PyTorch 기준 실행 device")
+    ap.add_argument("--json", help="검증 결과 저장 경로")
+    args = ap.parse_args()
+    if args.int8 and not args.video:
+        ap.error("--int8 은 calibration 용 --video 가 필요합니다")
+    classes = [int(c) for c in args.classes.split(",") if c.strip()]
+
+    onnx_path = args.onnx or export_onnx(args.model, args.imgsz)
+    candidates = {"onnx-fp32": onnx_path}
+    if args.int8:
+        candidates["onnx-int8"] = quantize_int8(onnx_path, args.video, args.calib_frames, args.imgsz)
+
+    if not args.video:
+        return
+
+    print(f"[Export] 검증: {args.video} ({args.frames} 프레임)")
+    ref = UltralyticsDetector(model_path=args.model, device=args.device, conf=args.conf)
+    ref_pos, ref_fps = run_car_pos(ref, args.video, args.frames, args.conf)
+    results = {"pytorch": {"model": args.model, "fps": ref_fps, "detected": ref_pos.count_valid()}}
+
+    for name, path in candidates.items():
+        det = OnnxDetector(model_path=path, conf=args.conf, imgsz=args.imgsz, classes=classes)
+        pos, fps = run_car_pos(det, args.video, args.frames, args.conf)
+        results[name] = dict(model=path, fps=fps, speedup=fps / max(ref_fps, 1e-9), **compare(ref_pos, pos))
+
+    print(f"{'backend':<12}{'fps':>8}{'agree':>8}{'drift mean':>12}{'p95':>8}{'max':>8}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['fps']:>8.1f}"
+              f"{r.get('agreement', 1.0):>8.3f}"
+              f"{r.get('drift_mean_px', 0.0):>12.2f}"
+              f"{r.get('drift_p95_px', 0.0):>8.2f}"
+              f"{r.get('drift_max_px', 0.0):>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"[Export] 검증 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
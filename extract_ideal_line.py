@@ -7,7 +7,8 @@ from scipy.interpolate import splprep, splev
 
 class IdealLineExtractor:
 
-    def extract(self, map_path="static/maps/Spa-Map.png"):
+    def extract(self, map_path="static/maps/Spa-Map.png", track="spa"):
+        """트랙 맵 이미지 → ideal_line/<track>_ideal.csv (TrackRegistry 가 읽는 형식)."""
         img = cv2.imread(map_path, cv2.IMREAD_GRAYSCALE)
         if img is None:
             raise RuntimeError("트랙 맵 이미지를 읽을 수 없습니다.")
@@ -44,6 +45,6 @@ class IdealLineExtractor:
         df["distance_norm"] = df["distance_raw"] / df["distance_raw"].max()
 
         os.makedirs("ideal_line", exist_ok=True)
-        out_path = os.path.join("ideal_line", "spa_ideal.csv")
+        out_path = os.path.join("ideal_line", f"{track}_ideal.csv")
         df.to_csv(out_path, index=False)
         print(f"[IdealLine] {out_path} 생성 완료")
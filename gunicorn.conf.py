@@ -0,0 +1,15 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get("ACC_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("ACC_GUNICORN_WORKERS", 2))
+# 분석 작업 큐가 워커 스레드에서 돌고 /api/jobs 폴링은 가벼우므로 gthread
+worker_class = "gthread"
+threads = int(os.environ.get("ACC_GUNICORN_THREADS", 4))
+# 분석은 작업 큐에서 비동기로 돌기 때문에 요청 자체는 짧다 (업로드만 길 수 있음)
+timeout = int(os.environ.get("ACC_GUNICORN_TIMEOUT", 300))
+
+# app 을 master 에서 한 번 import 한 뒤 fork.
+# ACC_PRELOAD_MODEL=1 (cpu) 이면 YOLO 가중치도 fork 전에 읽혀서 워커끼리 공유된다.
+# (작업 큐 executor 는 첫 submit 때 만들어지므로 fork 전에 스레드가 생기지 않음)
+preload_app = os.environ.get("ACC_GUNICORN_PRELOAD", "1") == "1"
@@ -1,3 +1,37 @@
+import warnings
+
+import numpy as np
+
+from modules.event_detector import EVENT_TYPES
+
+
+# 코너별 피드백 규칙 임계값 (이벤트 테이블 전체에 한 번에 적용)
+CORNER_RULES = {
+    "brake_point_std_m": 15.0,       # 랩마다 제동 시작 거리 표준편차가 이 이상이면 "일관성"
+    "best_brake_later_m": 10.0,      # 베스트 랩이 평균보다 이만큼 늦게 제동하면 "늦게 제동"
+    "trail_rate_min": 0.3,           # 제동한 랩 중 trail-braking 비율이 이보다 낮으면
+    "coast_rate": 0.5,               # lift-and-coast 가 이 비율 이상의 랩에서
+    "coast_min_sec": 0.5,            # 평균 이 시간 이상이면
+    "spin_rate": 0.3,
+    "hesitation_rate": 0.3,
+    "min_laps": 2,                   # 완주 랩이 이보다 적으면 코너 규칙 생략
+    "evidence_laps": 10,             # evidence 에 넣는 랩 번호 최대 개수
+}
+
+
+def _masked_mean(values, mask, axis=-1):
+    """mask 된 칸만의 평균 (NaN 무시, 빈 행은 NaN)."""
+    ok = mask & np.isfinite(values)
+    total = np.where(ok, values, 0.0).sum(axis=axis)
+    count = ok.sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _round(v, digits=3):
+    return None if v is None or not np.isfinite(v) else round(float(v), digits)
+
+
 class AIFeedbackEngine:
 
     def generate_feedback(self, telemetry, trajectory, perf):
@@ -36,3 +70,134 @@ class AIFeedbackEngine:
             feedback.append("주행 데이터가 충분하지 않아 상세 분석이 제한되었습니다.")
 
         return feedback
+
+    # ==========================================================
+    # 코너별 피드백 (EventDetector 이벤트 테이블 기반)
+    # ==========================================================
+    def corner_feedback(self, events, corner_table, rules=None):
+        """
+        events       : EventDetector.detect 결과
+        corner_table : PerformanceAnalyzer.corner_metrics 결과 (코너 목록, 완주 여부, 코너 시간)
+
+        이벤트를 (종류, 코너, 랩) 격자로 한 번에 모은 뒤 (np.bincount / np.fmin.at)
+        규칙을 코너 전체에 배열 연산으로 적용한다. 완주 랩만 사용.
+        반환: [{"corner", "type", "message", "evidence": {...}} ...] (코너 순서)
+        """
+        r = dict(CORNER_RULES, **(rules or {}))
+        corners = corner_table["corners"]
+        complete = np.asarray(corner_table["complete"], dtype=bool)
+        nc, nl = len(corners), len(complete)
+        if nc == 0 or complete.sum() < r["min_laps"]:
+            return []
+
+        # (종류, 코너, 랩) 별 개수 / 총 시간 / 최대 peak
+        sel = events.corner >= 0
+        t, c, l = events.type[sel], events.corner[sel], events.lap[sel]
+        key = (t * nc + c) * nl + l
+        size = len(EVENT_TYPES) * nc * nl
+        shape = (len(EVENT_TYPES), nc, nl)
+        count = np.bincount(key, minlength=size).reshape(shape)
+        duration = np.bincount(key, weights=events.duration[sel], minlength=size).reshape(shape)
+        peak = np.full(size, np.nan)
+        np.fmax.at(peak, key, events.peak[sel])
+        peak = peak.reshape(shape)
+        brake_point = np.full(nc * nl, np.nan)
+        b = t == EVENT_TYPES.index("braking")
+        np.fmin.at(brake_point, c[b] * nl + l[b], events.start_dist[sel][b])
+        brake_point = brake_point.reshape(nc, nl)
+
+        has = (count > 0) & complete[None, None, :]
+        n_complete = complete.sum()
+        rate = has.sum(axis=2) / n_complete                                   # (종류, 코너)
+
+        # 이벤트가 있었던 랩 vs 없었던 랩의 코너 시간 차이 (evidence)
+        corner_time = np.asarray(corner_table["corner"]["time"], dtype=np.float64).T    # (코너, 랩)
+        loss = _masked_mean(corner_time[None], has) - _masked_mean(corner_time[None], ~has & complete)
+
+        lap_times = np.where(complete, np.asarray(corner_table["lap_times"], dtype=np.float64), np.inf)
+        best = int(np.argmin(lap_times))
+        bp = np.where(complete[None, :], brake_point, np.nan)
+        with warnings.catch_warnings():
+            # 제동이 없는 코너는 전부 NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            bp_std = np.nanstd(bp, axis=1)
+            bp_mean = np.nanmean(bp, axis=1)
+        bp_laps = np.isfinite(bp).sum(axis=1)
+
+        def idx(name):
+            return EVENT_TYPES.index(name)
+
+        def lap_numbers(type_name, j):
+            return (np.flatnonzero(has[idx(type_name), j]) + 1)[:r["evidence_laps"]].tolist()
+
+        def evidence(type_name, j, **extra):
+            i = idx(type_name)
+            return dict(
+                rate=_round(rate[i, j]),
+                laps=lap_numbers(type_name, j),
+                corner_time_loss=_round(loss[i, j]),
+                **extra,
+            )
+
+        out = []
+        for j, corner in enumerate(corners):
+            name = corner["name"]
+
+            if bp_laps[j] >= r["min_laps"] and bp_std[j] >= r["brake_point_std_m"]:
+                out.append({
+                    "corner": name, "type": "braking_consistency",
+                    "message": f"{name}: 브레이크 포인트가 랩마다 ±{bp_std[j]:.0f} m 흔들립니다. 일정한 기준점을 잡아보세요.",
+                    "evidence": {"braking_point_mean": _round(bp_mean[j], 1),
+                                 "braking_point_std": _round(bp_std[j], 1), "laps": int(bp_laps[j])},
+                })
+
+            later = bp[j, best] - bp_mean[j]
+            if bp_laps[j] >= r["min_laps"] and np.isfinite(later) and later >= r["best_brake_later_m"]:
+                out.append({
+                    "corner": name, "type": "braking_point",
+                    "message": f"{name}: 베스트 랩({best + 1})은 평균보다 {later:.0f} m 늦게 제동합니다. 제동 시점을 늦춰보세요.",
+                    "evidence": {"best_lap": best + 1, "best_braking_point": _round(bp[j, best], 1),
+                                 "braking_point_mean": _round(bp_mean[j], 1)},
+                })
+
+            braked = has[idx("braking"), j].sum()
+            if "trail_braking" in events.types and braked >= r["min_laps"]:
+                trail = (has[idx("trail_braking"), j] & has[idx("braking"), j]).sum() / braked
+                if trail < r["trail_rate_min"]:
+                    out.append({
+                        "corner": name, "type": "trail_braking",
+                        "message": f"{name}: 제동한 랩 중 {trail:.0%} 만 코너 안까지 브레이크를 이어갑니다. "
+                                   "브레이크를 천천히 풀며 진입해 보세요.",
+                        "evidence": {"trail_rate": _round(trail), "braking_laps": int(braked)},
+                    })
+
+            i = idx("lift_coast")
+            coast_sec = duration[i, j][complete].sum() / n_complete
+            if rate[i, j] >= r["coast_rate"] and coast_sec >= r["coast_min_sec"]:
+                out.append({
+                    "corner": name, "type": "lift_coast",
+                    "message": f"{name}: 제동 전 평균 {coast_sec:.1f}s 스로틀/브레이크 없이 달립니다. "
+                               "브레이크 포인트까지 스로틀을 유지하세요.",
+                    "evidence": evidence("lift_coast", j, coast_sec=_round(coast_sec)),
+                })
+
+            i = idx("wheel_spin")
+            if rate[i, j] >= r["spin_rate"]:
+                out.append({
+                    "corner": name, "type": "wheel_spin",
+                    "message": f"{name}: 탈출 시 휠스핀 ({rate[i, j]:.0%} 랩, 최대 slip {np.nanmax(peak[i, j]):.0%}). "
+                               "스로틀을 더 점진적으로 여세요.",
+                    "evidence": evidence("wheel_spin", j, max_slip=_round(np.nanmax(peak[i, j]))),
+                })
+
+            i = idx("throttle_hesitation")
+            if rate[i, j] >= r["hesitation_rate"]:
+                drop = _masked_mean(peak[i, j][None], has[i, j][None])[0]
+                out.append({
+                    "corner": name, "type": "throttle_hesitation",
+                    "message": f"{name}: 탈출 스로틀을 열었다 {drop:.0f}% 되돌리는 랩이 {rate[i, j]:.0%} 입니다. "
+                               "한 번에 열 수 있는 지점까지 기다렸다가 여세요.",
+                    "evidence": evidence("throttle_hesitation", j, mean_drop=_round(drop, 1)),
+                })
+
+        return out
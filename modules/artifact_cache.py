@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+
+
+_HASH_CHUNK = 4 * 1024 * 1024
+
+# (path, size, mtime_ns) -> sha256 hex. 같은 파일을 한 프로세스에서 여러 번 해시하지 않도록.
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_sha256(path):
+    """파일 내용 sha256 (청크 단위 스트리밍, 크기/mtime 기준 메모이즈)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        cached = _hash_memo.get(memo_key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _hash_lock:
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def remember_sha256(path, digest):
+    """업로드 중에 이미 계산한 해시를 메모에 등록 (file_sha256 가 파일을 다시 읽지 않게)."""
+    st = os.stat(path)
+    with _hash_lock:
+        _hash_memo[(os.path.abspath(path), st.st_size, st.st_mtime_ns)] = digest
+
+
+class ArtifactCache:
+    """
+    내용 해시 기반 디스크 캐시.
+    artifact 하나 = 디렉터리 하나:
+        <root>/<namespace>/<key[:2]>/<key>/meta.json
+                                          /<name>.npy   (배열마다 하나)
+    .npy 로 저장하므로 load(mmap=True) 시 복사 없이 memory-map 으로 읽힌다.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def make_key(*parts):
+        """키 구성요소(해시, 모델 경로, 파라미터 ...)를 하나의 sha256 키로."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, namespace, key):
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    def has(self, namespace, key):
+        return os.path.isfile(os.path.join(self.path(namespace, key), "meta.json"))
+
+    def load(self, namespace, key, mmap=False):
+        """(arrays, meta) 또는 캐시 미스면 None."""
+        d = self.path(namespace, key)
+        meta_path = os.path.join(d, "meta.json")
+        if not os.path.isfile(meta_path):
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+            arrays = {}
+            for name in meta.get("_arrays", []):
+                arrays[name] = np.load(
+                    os.path.join(d, f"{name}.npy"),
+                    mmap_mode="r" if mmap else None,
+                    allow_pickle=False,
+                )
+        except (OSError, ValueError) as e:
+            print(f"[ArtifactCache] 손상된 캐시 무시: {d} ({e!r})")
+            return None
+
+        meta.pop("_arrays", None)
+        return arrays, meta
+
+    def save(self, namespace, key, arrays, meta=None):
+        """임시 디렉터리에 쓴 뒤 rename 해서 반쯤 쓰인 artifact 가 보이지 않게 한다."""
+        final = self.path(namespace, key)
+        parent = os.path.dirname(final)
+        os.makedirs(parent, exist_ok=True)
+
+        tmp = os.path.join(parent, f".tmp-{key}-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arr),
+                        allow_pickle=False)
+
+            meta = dict(meta or {})
+            meta["_arrays"] = list(arrays.keys())
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            if os.path.isdir(final) and not self.has(namespace, key):
+                shutil.rmtree(final, ignore_errors=True)
+            try:
+                os.replace(tmp, final)
+            except OSError:
+                # 다른 작업이 같은 artifact 를 먼저 저장한 경우
+                if not self.has(namespace, key):
+                    raise
+                shutil.rmtree(tmp, ignore_errors=True)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        return final
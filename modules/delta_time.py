@@ -0,0 +1,215 @@
+import threading
+
+import numpy as np
+
+import config
+from modules.artifact_cache import ArtifactCache
+from modules.frame_track import FrameTrack
+
+
+# 기준 랩 grid 형식이 바뀌면 올려서 기존 캐시를 무효화
+REFERENCE_VERSION = 1
+
+# 트랙 설정에 sectors 가 없을 때 랩을 나누는 구간 수
+DEFAULT_SECTORS = 3
+
+
+def sector_bounds(length, sectors=None):
+    """
+    섹터 경계 거리 [0, s1, s2, ..., length].
+    sectors : 트랙 설정의 섹터 시작 거리 목록 (m, 0 제외 가능). 없으면 DEFAULT_SECTORS 등분.
+    """
+    if sectors:
+        inner = [float(s) for s in sectors if 0.0 < float(s) < length]
+    else:
+        inner = list(np.linspace(0.0, length, DEFAULT_SECTORS + 1)[1:-1])
+    return np.array([0.0] + sorted(inner) + [float(length)])
+
+
+class ReferenceLap:
+    """
+    기준 랩의 거리 grid 위 누적 시간.
+
+    grid     : (M,) 거리 (m)
+    time     : (M,) 랩 시작부터 grid[i] 까지 걸린 시간 (랩이 못 간 칸은 NaN)
+    lap_time : 랩 타임
+    """
+
+    def __init__(self, grid, time, lap_time, lap=None, source=None):
+        self.grid = np.asarray(grid, dtype=np.float64)
+        self.time = np.asarray(time, dtype=np.float64)
+        self.lap_time = float(lap_time)
+        self.lap = lap
+        self.source = source
+
+        ok = np.isfinite(self.time)
+        self._xp = self.grid[ok]
+        self._fp = self.time[ok]
+
+    def time_at(self, dist):
+        """임의 거리에서의 기준 랩 시간 (기준 랩이 간 거리 밖은 NaN)."""
+        dist = np.asarray(dist, dtype=np.float64)
+        if len(self._xp) == 0:
+            return np.full(dist.shape, np.nan)
+        t = np.interp(dist, self._xp, self._fp)
+        return np.where((dist >= self._xp[0]) & (dist <= self._xp[-1]), t, np.nan)
+
+    def to_dict(self):
+        return {"lap": self.lap, "lap_time": self.lap_time, "source_hash": self.source}
+
+
+class DeltaTimeEngine:
+    """
+    기준 랩 대비 delta-time.
+
+    - 기준 랩은 랩 시간을 거리 grid (config.LAP_GRID_STEP_M) 로 보간해 한 번만 만들고
+      ArtifactCache ("reference_lap") + 메모리에 보관한다. 키 = 텔레메트리 내용 해시 + 랩 + grid.
+    - compare()   : 모든 랩을 같은 grid 로 보간한 (n_laps, M) 배열에서 누적 delta / 섹터 delta 를
+                    한 번에 계산 (랩 수만큼 반복하지 않음).
+    - row_delta() / frame_delta() : 텔레메트리 행 / 영상 프레임별 delta (오버레이 표시용).
+    """
+
+    def __init__(self, cache_dir=None, step=None, memo_size=32):
+        if cache_dir is None and config.TELEMETRY_CACHE_ENABLED:
+            cache_dir = config.CACHE_DIR
+        self.cache = ArtifactCache(cache_dir) if cache_dir else None
+        self.step = step or config.LAP_GRID_STEP_M
+        self.memo_size = memo_size
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    # --------------------------
+    # 기준 랩
+    # --------------------------
+    @staticmethod
+    def pick_lap(laps, lap=None):
+        """lap : 1부터 시작하는 랩 번호 (None 이면 가장 빠른 완주 랩). 반환: 0부터 시작하는 index."""
+        if lap is not None:
+            i = int(lap) - 1
+            if not 0 <= i < len(laps):
+                raise ValueError(f"기준 랩 {lap} 이 없습니다 (랩 수: {len(laps)})")
+            return i
+        if not laps.complete.any():
+            raise ValueError("완주한 랩이 없어 기준 랩을 정할 수 없습니다.")
+        return int(np.argmin(np.where(laps.complete, laps.lap_times, np.inf)))
+
+    def build_reference(self, laps, lap=None, source=None):
+        i = self.pick_lap(laps, lap)
+        grid = laps.grid(self.step)
+        time = laps.resample(laps.lap_time, grid)[i]
+        return ReferenceLap(grid, time, laps.lap_times[i], lap=i + 1, source=source)
+
+    def reference(self, source_hash, load, lap=None, lap_length=None):
+        """
+        source_hash : 기준 랩 텔레메트리 내용 해시 (None 이면 캐시 없이 바로 계산)
+        load        : () -> Laps. 캐시 미스일 때만 호출 (다른 세션 텔레메트리 파싱 등)
+        """
+        if source_hash is None:
+            return self.build_reference(load(), lap)
+
+        key = ArtifactCache.make_key("reference_lap", REFERENCE_VERSION, source_hash,
+                                     lap or "best", self.step, lap_length)
+        with self._lock:
+            ref = self._memo.get(key)
+        if ref is not None:
+            return ref
+
+        hit = self.cache.load("reference_lap", key) if self.cache is not None else None
+        if hit is not None:
+            arrays, meta = hit
+            ref = ReferenceLap(arrays["grid"], arrays["time"], meta["lap_time"],
+                               lap=meta["lap"], source=meta.get("source"))
+        else:
+            ref = self.build_reference(load(), lap, source=source_hash)
+            if self.cache is not None:
+                try:
+                    self.cache.save("reference_lap", key, {"grid": ref.grid, "time": ref.time},
+                                    {"lap_time": ref.lap_time, "lap": ref.lap, "source": source_hash})
+                except OSError as e:
+                    print("[DeltaTimeEngine] 기준 랩 캐시 저장 실패:", repr(e))
+
+        with self._lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[key] = ref
+        return ref
+
+    # --------------------------
+    # 비교
+    # --------------------------
+    def compare(self, laps, ref, sectors=None):
+        """
+        반환:
+          grid          (M,)
+          delta         (n_laps, M)  grid 거리마다 누적 delta (s, + = 기준보다 느림)
+          lap_delta     (n_laps,)    랩 타임 차이 (미완주 랩은 NaN)
+          sector_bounds (S+1,)
+          sector_times  (n_laps, S)  섹터 시간 (랩이 끝나지 않은 섹터는 NaN)
+          sector_deltas (n_laps, S)
+        """
+        grid = ref.grid
+        lap_t = laps.resample(laps.lap_time, grid)
+        delta = lap_t - ref.time[None, :]
+
+        bounds = sector_bounds(ref.grid[-1] if laps.length == 0 else laps.length, sectors)
+        end_t = np.where(laps.complete, laps.lap_times, np.nan)
+        at = np.column_stack([np.zeros(len(laps)), laps.resample(laps.lap_time, bounds[1:-1]), end_t])
+        sector_times = np.diff(at, axis=1)
+
+        ref_at = np.concatenate([[0.0], ref.time_at(bounds[1:-1]), [ref.lap_time]])
+        ref_sectors = np.diff(ref_at)
+
+        return {
+            "grid": grid,
+            "delta": delta,
+            "lap_delta": end_t - ref.lap_time,
+            "sector_bounds": bounds,
+            "sector_times": sector_times,
+            "ref_sector_times": ref_sectors,
+            "sector_deltas": sector_times - ref_sectors[None, :],
+        }
+
+    def row_delta(self, laps, ref):
+        """
+        텔레메트리 행별 누적 delta (s).
+        완주하지 못한 랩 (outlap 남은 부분, pit, 마지막 랩) 의 행은 기준 랩과 비교할 수 없으므로 NaN
+        → frame_delta 에서 해당 프레임은 표시하지 않는다.
+        """
+        delta = laps.lap_time - ref.time_at(laps.lap_dist)
+        delta[~laps.complete[laps.lap_index]] = np.nan
+        return delta
+
+    @staticmethod
+    def frame_delta(row_delta, frame_map):
+        """
+        프레임별 delta. frame_map : SyncCalibrator.generate_frame_map 결과 (소수점 텔레 인덱스).
+        반환: FrameTrack (N, 1) float32, 값이 없는 프레임은 invalid.
+        """
+        fm = FrameTrack.coerce(frame_map, dim=1, dtype=np.float64)
+        row_delta = np.asarray(row_delta, dtype=np.float64)
+        idx = fm.values[:, 0]
+        valid = fm.valid.copy()
+        values = np.full(len(fm), np.nan)
+        if len(row_delta) and valid.any():
+            src = np.isfinite(row_delta)
+            values[valid] = np.interp(idx[valid], np.flatnonzero(src), row_delta[src]) \
+                if src.any() else np.nan
+            # 텔레 인덱스가 가리키는 행 자체에 delta 가 없으면 표시하지 않음
+            near = np.clip(np.rint(idx[valid]).astype(np.int64), 0, len(row_delta) - 1)
+            valid[valid] = src[near]
+        return FrameTrack(values.astype(np.float32)[:, None], valid)
+
+    @staticmethod
+    def summarize(result, digits=3):
+        """랩별 JSON 필드 (랩 결과 dict 에 update 할 수 있게 랩 순서대로)."""
+        def f(v):
+            return None if not np.isfinite(v) else round(float(v), digits)
+
+        out = []
+        for i in range(len(result["lap_delta"])):
+            out.append({
+                "delta": f(result["lap_delta"][i]),
+                "sector_times": [f(v) for v in result["sector_times"][i]],
+                "sector_deltas": [f(v) for v in result["sector_deltas"][i]],
+            })
+        return out
@@ -0,0 +1,269 @@
+import importlib.util
+import os
+import threading
+
+import cv2
+import numpy as np
+
+import config
+from modules import model_loader
+
+
+class Detections:
+    """
+    프레임 한 장의 검출 결과 (backend 공통 형식).
+
+    boxes : (N, 4) float32 xyxy, 원본 프레임 좌표
+    conf  : (N,) float32
+    ids   : (N,) int64 tracker ID, tracker 가 없는 backend 면 None
+    """
+
+    __slots__ = ("boxes", "conf", "ids")
+
+    def __init__(self, boxes, conf, ids=None):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.ids = None if ids is None else np.asarray(ids, dtype=np.int64).reshape(-1)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4)), np.zeros(0))
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def shift(self, dx, dy):
+        """crop 좌표 → 원본 프레임 좌표."""
+        return Detections(self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32),
+                          self.conf, self.ids)
+
+
+# ==========================================================
+# PyTorch (ultralytics)
+# ==========================================================
+class UltralyticsDetector:
+    """
+    ultralytics YOLO + 내장 tracker (botsort/bytetrack) → tracker ID 제공.
+    가중치는 model_loader 가 프로세스당 한 벌만 읽고, 여기서는 clone 만 갖는다.
+    """
+
+    name = "ultralytics"
+    provides_ids = True
+
+    def __init__(self, model_path=None, device=None, conf=0.4, tracker="botsort.yaml"):
+        self.model_path = model_path or config.MODEL_PATH
+        self.device = device or config.DEVICE
+        self.conf = conf
+        self.tracker = tracker
+        self._base = None
+        self._track_model = None
+        self._predict_model = None
+
+    @property
+    def cache_id(self):
+        return (self.name, self.model_path, self.tracker)
+
+    def available(self):
+        return self._base is not None or model_loader.ultralytics_available()
+
+    def load(self):
+        if self._base is None:
+            self.device = model_loader.select_device(self.device)
+            self._base = model_loader.load_shared(self.model_path, self.device)
+            self._track_model = model_loader.clone(self._base)
+        return self
+
+    def reset(self):
+        """새 영상 시작: tracker 상태를 버린다 (persist=True 상태가 영상 사이로 넘어가지 않게)."""
+        if self._base is not None:
+            self._track_model = model_loader.clone(self._base)
+
+    @staticmethod
+    def _to_detections(r):
+        if r.boxes is None or len(r.boxes) == 0:
+            return Detections.empty()
+        b = r.boxes
+        conf = b.conf.cpu().numpy() if b.conf is not None else np.ones(len(b))
+        ids = b.id.cpu().numpy() if b.id is not None else None
+        return Detections(b.xyxy.cpu().numpy(), conf, ids)
+
+    def track(self, frame):
+        self.load()
+        r = self._track_model.track(
+            source=frame,
+            device=self.device,
+            verbose=False,
+            persist=True,
+            conf=self.conf,
+            tracker=self.tracker
+        )[0]
+        return self._to_detections(r)
+
+    def predict(self, frame, imgsz=None):
+        """
+        tracker 없이 검출만 (ROI crop 용).
+        track(persist=True) 에 쓰는 인스턴스에 crop 을 넣으면 tracker 상태가
+        crop 좌표로 오염되므로 predict 전용 clone 을 따로 둔다.
+        """
+        self.load()
+        if self._predict_model is None:
+            self._predict_model = model_loader.clone(self._base)
+        kw = {"imgsz": imgsz} if imgsz else {}
+        r = self._predict_model.predict(
+            source=frame,
+            device=self.device,
+            verbose=False,
+            conf=self.conf,
+            **kw
+        )[0]
+        return self._to_detections(r)
+
+
+# ==========================================================
+# ONNX Runtime (CPU)
+# ==========================================================
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _onnx_session(model_path, threads):
+    """(model_path, threads) 당 InferenceSession 하나 (run() 은 스레드 안전)."""
+    key = (os.path.abspath(model_path), threads)
+    with _sessions_lock:
+        sess = _sessions.get(key)
+        if sess is None:
+            import onnxruntime as ort
+            opts = ort.SessionOptions()
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads:
+                opts.intra_op_num_threads = threads
+            sess = ort.InferenceSession(model_path, sess_options=opts,
+                                        providers=["CPUExecutionProvider"])
+            _sessions[key] = sess
+            print(f"[Detector] ONNX 모델 로딩: {model_path}")
+        return sess
+
+
+def letterbox(img, size, color=114):
+    """
+    비율 유지 resize + 패딩 → (size_h, size_w) 입력 (ultralytics 와 같은 방식).
+    반환: (NCHW float32 0~1, scale, (pad_x, pad_y))
+    """
+    h, w = img.shape[:2]
+    th, tw = size
+    r = min(th / h, tw / w)
+    nh, nw = int(round(h * r)), int(round(w * r))
+    if (nh, nw) != (h, w):
+        img = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    px, py = (tw - nw) / 2.0, (th - nh) / 2.0
+    top, left = int(round(py - 0.1)), int(round(px - 0.1))
+    img = cv2.copyMakeBorder(img, top, th - nh - top, left, tw - nw - left,
+                             cv2.BORDER_CONSTANT, value=(color, color, color))
+    blob = cv2.dnn.blobFromImage(img, 1.0 / 255.0, swapRB=True)
+    return blob, r, (left, top)
+
+
+def decode_yolov8(output, conf, iou, scale, pad, classes=None, max_det=300):
+    """
+    YOLOv8 export 출력 (1, 4 + nc, N) [cx, cy, w, h, class scores...] → Detections.
+    class 별 NMS 는 cv2.dnn.NMSBoxesBatched.
+    """
+    pred = np.asarray(output)[0].T                      # (N, 4 + nc)
+    scores = pred[:, 4:]
+    cls = scores.argmax(axis=1)
+    best = scores[np.arange(len(scores)), cls]
+
+    keep = best >= conf
+    if classes is not None:
+        keep &= np.isin(cls, classes)
+    if not keep.any():
+        return Detections.empty()
+    pred, cls, best = pred[keep], cls[keep], best[keep]
+
+    # letterbox 좌표 → 원본 좌표
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    x0 = (cx - w / 2 - pad[0]) / scale
+    y0 = (cy - h / 2 - pad[1]) / scale
+    bw, bh = w / scale, h / scale
+
+    xywh = np.column_stack([x0, y0, bw, bh])
+    idx = cv2.dnn.NMSBoxesBatched(xywh.tolist(), best.tolist(), cls.tolist(), conf, iou)
+    idx = np.asarray(idx, dtype=np.int64).reshape(-1)[:max_det]
+    if len(idx) == 0:
+        return Detections.empty()
+
+    boxes = np.column_stack([x0, y0, x0 + bw, y0 + bh])[idx]
+    return Detections(boxes, best[idx])
+
+
+class OnnxDetector:
+    """
+    export_detector.py 로 내보낸 YOLOv8 ONNX (FP32 또는 INT8) 를 ONNX Runtime CPU 로 실행.
+    tracker 가 없으므로 ids=None → VideoProcessor 는 ID 대신 직전 위치로 차를 고정한다.
+    classes : 차로 볼 class id 목록 (None 이면 config.ONNX_CLASSES, 빈 목록 = 전체)
+    """
+
+    name = "onnx"
+    provides_ids = False
+
+    def __init__(self, model_path=None, conf=0.4, iou=0.45, imgsz=None, threads=None, classes=None):
+        self.model_path = model_path or config.ONNX_MODEL_PATH
+        self.conf = conf
+        self.iou = iou
+        self.imgsz = imgsz or config.DETECTOR_IMGSZ
+        self.threads = config.ONNX_THREADS if threads is None else threads
+        self.classes = config.ONNX_CLASSES if classes is None else (list(classes) or None)
+        self._session = None
+        self._fixed_size = None   # 정적 입력 크기 모델이면 (h, w)
+
+    @property
+    def cache_id(self):
+        return (self.name, self.model_path, self.imgsz, self.iou, tuple(self.classes or ()))
+
+    def available(self):
+        return (self._session is not None
+                or (importlib.util.find_spec("onnxruntime") is not None
+                    and os.path.isfile(self.model_path)))
+
+    def load(self):
+        if self._session is None:
+            self._session = _onnx_session(self.model_path, self.threads)
+            inp = self._session.get_inputs()[0]
+            self._input = inp.name
+            h, w = inp.shape[2], inp.shape[3]
+            if isinstance(h, int) and isinstance(w, int):
+                self._fixed_size = (h, w)
+        return self
+
+    def reset(self):
+        pass
+
+    def predict(self, frame, imgsz=None):
+        self.load()
+        if self._fixed_size is not None:
+            size = self._fixed_size
+        else:
+            s = int(imgsz or self.imgsz)
+            size = (s, s)
+        blob, scale, pad = letterbox(frame, size)
+        out = self._session.run(None, {self._input: blob})[0]
+        return decode_yolov8(out, self.conf, self.iou, scale, pad, self.classes)
+
+    def track(self, frame):
+        return self.predict(frame)
+
+
+BACKENDS = {
+    "ultralytics": UltralyticsDetector,
+    "onnx": OnnxDetector,
+}
+
+
+def create_detector(backend=None, conf=0.4, model_path=None, device=None, tracker="botsort.yaml"):
+    """config.DETECTOR_BACKEND (또는 backend) 에 맞는 detector. 모델은 첫 사용 때 로딩."""
+    backend = backend or config.DETECTOR_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 detector backend: {backend} (사용 가능: {sorted(BACKENDS)})")
+    if backend == "onnx":
+        return OnnxDetector(model_path=model_path, conf=conf)
+    return UltralyticsDetector(model_path=model_path, device=device, conf=conf, tracker=tracker)
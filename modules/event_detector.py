@@ -0,0 +1,248 @@
+import numpy as np
+
+import config
+
+
+# 이벤트 검출에 쓰는 추가 텔레메트리 컬럼 (파일에 있는 것만 읽힌다)
+#   steerangle      : 스티어링 각 (deg). 없으면 roty (yaw rate) 로 trail-braking 판단
+#   wheel_speed_*   : 바퀴별 속도. 앞/뒤 비율만 쓰므로 단위는 상관없음
+EVENT_COLUMNS = ("steerangle", "wheel_speed_lf", "wheel_speed_rf", "wheel_speed_lr", "wheel_speed_rr")
+
+# 이벤트 종류 (Events.type 은 이 튜플의 index)
+EVENT_TYPES = ("braking", "trail_braking", "lift_coast", "wheel_spin", "throttle_hesitation")
+
+
+def runs(mask, breaks=None):
+    """
+    run-length encoding: True 가 이어지는 구간들의 [start, end) 행 index.
+    breaks : 선택, True 인 행에서는 연속이어도 새 구간을 시작 (랩 경계에서 끊기)
+    """
+    mask = np.asarray(mask, dtype=bool)
+    start = mask.copy()
+    start[1:] &= ~mask[:-1]
+    end = mask.copy()
+    end[:-1] &= ~mask[1:]
+    if breaks is not None:
+        start |= mask & breaks
+        end[:-1] |= mask[:-1] & breaks[1:]
+    return np.flatnonzero(start), np.flatnonzero(end) + 1
+
+
+def _run_reduce(ufunc, values, s, e):
+    """구간마다 values[s:e] 를 ufunc 로 축약 (reduceat 한 번)."""
+    if len(s) == 0:
+        return np.zeros(0)
+    padded = np.append(values, np.nan)
+    return ufunc.reduceat(padded, np.column_stack([s, e]).ravel())[::2]
+
+
+def _column(telemetry, name):
+    return np.asarray(telemetry[name], dtype=np.float64) if name in telemetry else None
+
+
+def _combine(telemetry, names, reduce):
+    cols = [_column(telemetry, n) for n in names]
+    cols = [c for c in cols if c is not None]
+    return reduce(cols, axis=0) if cols else None
+
+
+class Events:
+    """
+    세션 전체의 주행 이벤트 테이블 (모든 종류를 한 테이블에, 컬럼별 numpy 배열).
+
+    type        : EVENT_TYPES index
+    start_row / end_row : 텔레메트리 [start, end) 행
+    lap         : 0부터 시작하는 랩 index
+    corner      : 코너 index (-1 = 코너 밖)
+    start_dist / end_dist : 랩 거리 (m)
+    duration    : s
+    peak        : 종류별 최대값 (braking: 브레이크 %, trail_braking: 조향/yaw,
+                  lift_coast: 속도 손실 km/h, wheel_spin: slip 비율, throttle_hesitation: 되돌린 스로틀 %)
+    entry_speed / exit_speed : km/h
+    types       : 검출한 이벤트 종류 (필요한 채널이 없어 건너뛴 종류는 빠짐)
+    """
+
+    FIELDS = ("type", "start_row", "end_row", "lap", "corner", "start_dist", "end_dist",
+              "duration", "peak", "entry_speed", "exit_speed")
+
+    def __init__(self, columns, corners=None, types=EVENT_TYPES):
+        for name in self.FIELDS:
+            setattr(self, name, columns[name])
+        self.corners = list(corners or [])
+        self.types = tuple(types)
+
+    def __len__(self):
+        return len(self.type)
+
+    def counts(self, n_laps=None):
+        """검출한 종류별 개수. n_laps 가 있으면 {종류: 랩별 개수 list}."""
+        if n_laps is None:
+            return {t: int((self.type == EVENT_TYPES.index(t)).sum()) for t in self.types}
+        key = self.type * n_laps + self.lap
+        c = np.bincount(key, minlength=len(EVENT_TYPES) * n_laps).reshape(len(EVENT_TYPES), n_laps)
+        return {t: c[EVENT_TYPES.index(t)].tolist() for t in self.types}
+
+    def to_list(self, lap=None, limit=None):
+        """이벤트 dict 목록 (JSON 용). lap : 선택, 0부터 시작하는 랩 index 만."""
+        idx = np.flatnonzero(self.lap == lap) if lap is not None else np.arange(len(self))
+        if limit is not None:
+            idx = idx[:limit]
+        out = []
+        for i in idx:
+            c = int(self.corner[i])
+            out.append({
+                "type": EVENT_TYPES[self.type[i]],
+                "lap": int(self.lap[i]) + 1,
+                "corner": self.corners[c]["name"] if c >= 0 else None,
+                "start_dist": round(float(self.start_dist[i]), 1),
+                "end_dist": round(float(self.end_dist[i]), 1),
+                "duration": round(float(self.duration[i]), 3),
+                "peak": None if not np.isfinite(self.peak[i]) else round(float(self.peak[i]), 3),
+                "entry_speed": None if not np.isfinite(self.entry_speed[i]) else round(float(self.entry_speed[i]), 1),
+                "exit_speed": None if not np.isfinite(self.exit_speed[i]) else round(float(self.exit_speed[i]), 1),
+            })
+        return out
+
+
+class EventDetector:
+    """
+    텔레메트리 채널 마스크 → run-length encoding → 주행 이벤트 테이블.
+
+    - braking             : 브레이크 ≥ brake_on 가 min_brake_sec 이상
+    - trail_braking       : 제동 중 조향 (steerangle, 없으면 yaw rate) 이 임계값 이상
+    - lift_coast          : 제동 직전 스로틀 / 브레이크 모두 떼고 coast_min_kmh 이상에서 달리는 구간
+    - wheel_spin          : 스로틀 중 뒷바퀴 (빠른 쪽) 가 앞바퀴보다 spin_ratio 이상 빠름 (바퀴 속도 컬럼이 있을 때)
+    - throttle_hesitation : 스로틀을 여는 구간 안에서 최고값 대비 hesitation_drop 이상 되돌렸다가
+                            다시 여는 경우 (제동 전 리프트는 구간 끝이므로 제외)
+
+    행 단위 반복 없이 마스크 / diff / reduceat 만 쓰므로 24h 세션 (수백 랩) 도 한 번에 처리한다.
+    구간은 랩 경계에서 끊고, 시작 거리로 코너를 붙인다 (lift_coast 는 이어지는 제동 지점 앞의 코너).
+    """
+
+    def __init__(self, params=None):
+        self.params = dict(config.EVENT_DETECTION, **(params or {}))
+
+    def detect(self, telemetry, laps, corners=None):
+        p = self.params
+        time = _column(telemetry, "time")
+        speed = _column(telemetry, "speed")
+        throttle = _column(telemetry, "throttle")
+        brake = _column(telemetry, "brake")
+        n = len(time)
+
+        breaks = np.zeros(n, dtype=bool)
+        breaks[laps.starts[laps.starts < n]] = True
+
+        found = []   # (type, starts, ends, peak, min_sec)
+
+        if brake is not None:
+            braking = brake >= p["brake_on"]
+            s, e = runs(braking, breaks)
+            found.append(("braking", s, e, _run_reduce(np.fmax, brake, s, e), p["min_brake_sec"]))
+
+            steer = _column(telemetry, "steerangle")
+            steer_on = p["trail_steer_deg"]
+            if steer is None:
+                steer, steer_on = _column(telemetry, "roty"), p["trail_yaw_deg"]
+            if steer is not None:
+                turning = np.abs(steer)
+                s, e = runs(braking & (turning >= steer_on), breaks)
+                found.append(("trail_braking", s, e, _run_reduce(np.fmax, turning, s, e), p["min_trail_sec"]))
+
+        if throttle is not None and speed is not None:
+            coasting = (throttle < p["coast_throttle"]) & (speed >= p["coast_min_kmh"])
+            if brake is not None:
+                coasting &= brake < p["coast_throttle"]
+            s, e = runs(coasting, breaks)
+            if brake is not None:
+                # 바로 제동으로 이어지는 구간만 (apex 부근 중립 구간 제외)
+                into_brake = brake[np.minimum(e, n - 1)] >= p["brake_on"]
+                s, e = s[into_brake], e[into_brake]
+            found.append(("lift_coast", s, e, speed[s] - speed[np.maximum(e - 1, s)], p["min_coast_sec"]))
+
+        if throttle is not None:
+            # 휠스핀은 보통 안쪽 뒷바퀴 하나 → 빠른 쪽 뒷바퀴 / 앞바퀴 평균
+            rear = _combine(telemetry, ("wheel_speed_lr", "wheel_speed_rr"), np.max)
+            front = _combine(telemetry, ("wheel_speed_lf", "wheel_speed_rf"), np.mean)
+            if rear is not None and front is not None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    slip = np.where(front > 1.0, rear / front - 1.0, np.nan)
+                s, e = runs((slip >= p["spin_ratio"]) & (throttle >= p["spin_throttle"]), breaks)
+                found.append(("wheel_spin", s, e, _run_reduce(np.fmax, slip, s, e), p["min_spin_sec"]))
+
+            # 스로틀을 여는 구간마다 누적 최고값: 구간 번호 × 큰 수를 더해 accumulate 한 번으로
+            on = throttle >= p["throttle_on"]
+            if brake is not None:
+                on &= brake < p["brake_on"]
+            s_on, e_on = runs(on, breaks)
+            run_id = np.zeros(n)
+            run_id[s_on] = 1.0
+            offset = np.cumsum(run_id) * 1000.0
+            peak = np.maximum.accumulate(np.where(on, np.nan_to_num(throttle) + offset, -np.inf)) - offset
+            drop = np.where(on, peak - throttle, 0.0)
+            s, e = runs(on & (drop >= p["hesitation_drop"]), breaks)
+            k = np.searchsorted(s_on, s, side="right") - 1
+            recovered = e < e_on[k] if len(s) else np.zeros(0, dtype=bool)
+            s, e = s[recovered], e[recovered]
+            found.append(("throttle_hesitation", s, e, _run_reduce(np.fmax, drop, s, e),
+                          p["min_hesitation_sec"]))
+
+        return self._table(found, time, speed, laps, corners)
+
+    @staticmethod
+    def _table(found, time, speed, laps, corners):
+        n = len(time)
+        types, starts, ends, peaks, durations = [np.zeros(0, dtype=np.int64)], [], [], [], []
+        for name, s, e, peak, min_sec in found:
+            # 구간 길이: 시작 행 ~ 구간 다음 행 시간 (한 행짜리 구간도 샘플 간격만큼)
+            duration = time[np.minimum(e, n - 1)] - time[s]
+            keep = duration >= min_sec
+            types.append(np.full(int(keep.sum()), EVENT_TYPES.index(name), dtype=np.int64))
+            starts.append(s[keep])
+            ends.append(e[keep])
+            peaks.append(np.asarray(peak, dtype=np.float64)[keep])
+            durations.append(duration[keep])
+
+        s = np.concatenate([np.zeros(0, dtype=np.int64)] + starts).astype(np.int64)
+        e = np.concatenate([np.zeros(0, dtype=np.int64)] + ends).astype(np.int64)
+        cols = {
+            "type": np.concatenate(types),
+            "start_row": s,
+            "end_row": e,
+            "lap": laps.lap_index[s],
+            "start_dist": laps.lap_dist[s],
+            "end_dist": laps.lap_dist[e - 1],
+            "duration": np.concatenate([np.zeros(0)] + durations),
+            "peak": np.concatenate([np.zeros(0)] + peaks),
+            "entry_speed": speed[s] if speed is not None else np.full(len(s), np.nan),
+            "exit_speed": speed[e - 1] if speed is not None else np.full(len(s), np.nan),
+        }
+
+        # 시작 거리가 들어가는 코너 (코너 시작 순 정렬 기준).
+        # lift_coast 는 코너 앞 직선 끝에서 일어나므로 이어지는 제동 지점 (구간 다음 행) 의
+        # 거리로 그 앞에 있는 첫 코너에 붙인다.
+        corners = list(corners or [])
+        corner = np.full(len(s), -1, dtype=np.int64)
+        if corners and len(s):
+            c_start = np.array([c["start"] for c in corners], dtype=np.float64)
+            c_end = np.array([c["end"] for c in corners], dtype=np.float64)
+            k = np.searchsorted(c_start, cols["start_dist"], side="right") - 1
+            inside = (k >= 0) & (cols["start_dist"] < c_end[np.maximum(k, 0)])
+            corner[inside] = k[inside]
+
+            coast = cols["type"] == EVENT_TYPES.index("lift_coast")
+            if coast.any():
+                e_c = e[coast]
+                lead = np.minimum(e_c, n - 1)
+                same_lap = laps.lap_index[lead] == laps.lap_index[e_c - 1]
+                lead_dist = np.where(same_lap, laps.lap_dist[lead], laps.lap_dist[e_c - 1])
+                ahead = np.searchsorted(c_end, lead_dist, side="right")
+                corner[coast] = np.where(ahead < len(corners), ahead, -1)
+        cols["corner"] = corner
+
+        # 랩 → 거리 순으로 정렬
+        order = np.lexsort((cols["start_dist"], cols["lap"]))
+        events = Events({k: np.asarray(v)[order] for k, v in cols.items()}, corners,
+                        types=[f[0] for f in found])
+        print(f"[EventDetector] {len(events)} 이벤트", events.counts())
+        return events
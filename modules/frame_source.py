@@ -0,0 +1,137 @@
+import queue
+import threading
+
+import cv2
+
+
+_END = object()
+
+
+def read_video_meta(video_path):
+    """영상 메타데이터 (디코딩 없이 컨테이너 정보만)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"영상을 열 수 없습니다: {video_path}")
+    meta = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+    }
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return meta, n_frames
+
+
+class FrameSource:
+    """
+    디코더 스레드 하나가 bounded 프레임 버퍼(capacity 장)를 채우고
+    소비자(검출/오버레이)는 for idx, frame in source 로 꺼내 쓴다.
+    버퍼가 차면 디코더가 기다리므로 메모리는 capacity 프레임으로 고정.
+
+    start/end 로 [start, end) 구간만 디코딩할 수 있다.
+    start 로의 이동은 컨테이너 seek 후 첫 프레임 timestamp 로 확인하고,
+    어긋나면 (VFR, 깨진 index 등) 처음부터 grab 해서 프레임 단위로 맞춘다.
+    """
+
+    def __init__(self, video_path, capacity=32, start=0, end=None):
+        self.video_path = video_path
+        self.capacity = max(1, int(capacity))
+        self.start = int(start)
+        self.end = end
+
+        self.meta, self.n_frames = read_video_meta(video_path)
+
+        self._queue = queue.Queue(maxsize=self.capacity)
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def _seek(self, cap):
+        """
+        start 프레임으로 이동 → (cap, start 프레임 또는 None).
+        seek 후 읽은 프레임의 timestamp 가 start / fps 와 반 프레임 이상 다르면
+        다시 열어서 start 개를 grab (디코딩만, 변환 없음) 한다.
+        """
+        fps = self.meta["fps"]
+        cap.set(cv2.CAP_PROP_POS_FRAMES, self.start)
+        ret, frame = cap.read()
+        if ret and fps > 0:
+            expected = self.start * 1000.0 / fps
+            if abs(cap.get(cv2.CAP_PROP_POS_MSEC) - expected) < 500.0 / fps:
+                return cap, frame
+
+        print(f"[FrameSource] seek 가 정확하지 않아 {self.start} 프레임까지 grab 합니다.")
+        cap.release()
+        cap = cv2.VideoCapture(self.video_path)
+        for _ in range(self.start):
+            if not cap.grab():
+                return cap, None
+        ret, frame = cap.read()
+        return cap, frame if ret else None
+
+    def _decode(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            pending = None
+            if self.start > 0:
+                cap, pending = self._seek(cap)
+                if pending is None:
+                    return
+            idx = self.start
+            while not self._stop.is_set():
+                if self.end is not None and idx >= self.end:
+                    break
+                if pending is not None:
+                    ret, frame, pending = True, pending, None
+                else:
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                # 소비자가 close() 하면 빠져나올 수 있도록 timeout 으로 put
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put((idx, frame), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                idx += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            cap.release()
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(_END, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def __iter__(self):
+        if self._thread is not None:
+            raise RuntimeError("FrameSource 는 한 번만 순회할 수 있습니다.")
+        self._thread = threading.Thread(target=self._decode, name="frame-decoder", daemon=True)
+        self._thread.start()
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            self.close()
+
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
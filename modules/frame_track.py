@@ -0,0 +1,154 @@
+import numpy as np
+
+
+class FrameTrack:
+    """
+    프레임별 값 시퀀스 (car_pos, frame_map, warped_real/ideal ...).
+
+    values : (N, D) 연속 배열 (float32 / float64 / int32)
+    valid  : (N,) bool, False 인 프레임은 예전 list 표현의 None 에 해당
+
+    인덱싱/순회는 예전 list 규약을 그대로 따른다:
+        track[i] -> (v0, v1, ...) 또는 None  (D == 1 이면 스칼라)
+    모듈 사이에서는 배열 그대로 넘기고, 벡터 연산은 values/valid 를 직접 쓴다.
+    """
+
+    __slots__ = ("values", "valid")
+
+    def __init__(self, values, valid=None):
+        values = np.asarray(values)
+        if values.ndim == 1:
+            values = values[:, None]
+        if valid is None:
+            if np.issubdtype(values.dtype, np.floating):
+                valid = ~np.isnan(values).any(axis=1)
+            else:
+                valid = np.ones(len(values), dtype=bool)
+        self.values = values
+        self.valid = np.asarray(valid, dtype=bool)
+
+    # --------------------------
+    # 생성
+    # --------------------------
+    @classmethod
+    def empty(cls, n, dim=2, dtype=np.float32):
+        return cls(np.zeros((n, dim), dtype=dtype), np.zeros(n, dtype=bool))
+
+    @classmethod
+    def from_list(cls, items, dim=2, dtype=np.float32):
+        """[(x, y) | None, ...] (또는 [v | None, ...]) → FrameTrack."""
+        n = len(items)
+        values = np.zeros((n, dim), dtype=dtype)
+        valid = np.zeros(n, dtype=bool)
+        for i, p in enumerate(items):
+            if p is not None:
+                values[i] = p
+                valid[i] = True
+        return cls(values, valid)
+
+    @classmethod
+    def coerce(cls, obj, dim=2, dtype=np.float32):
+        """FrameTrack 이면 그대로, list 면 변환."""
+        if isinstance(obj, cls):
+            return obj
+        return cls.from_list(list(obj), dim=dim, dtype=dtype)
+
+    @classmethod
+    def from_nan_array(cls, arr):
+        """NaN = invalid 인 float 배열 (캐시 저장 형식) → FrameTrack."""
+        arr = np.asarray(arr)
+        valid = ~np.isnan(arr).any(axis=1) if arr.ndim == 2 else ~np.isnan(arr)
+        return cls(np.nan_to_num(arr), valid)
+
+    def to_nan_array(self):
+        out = self.values.astype(np.float32 if self.values.dtype != np.float64 else np.float64)
+        out[~self.valid] = np.nan
+        return out
+
+    # --------------------------
+    # list 호환
+    # --------------------------
+    def __len__(self):
+        return len(self.valid)
+
+    def _item(self, i):
+        if not self.valid[i]:
+            return None
+        row = self.values[i]
+        if len(row) == 1:
+            return row[0].item()
+        return tuple(row.tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return FrameTrack(self.values[i], self.valid[i])
+        return self._item(i)
+
+    def __iter__(self):
+        vals = self.values.tolist()
+        for row, ok in zip(vals, self.valid.tolist()):
+            if not ok:
+                yield None
+            else:
+                yield row[0] if len(row) == 1 else tuple(row)
+
+    def to_list(self):
+        return list(self)
+
+    # --------------------------
+    # 벡터 연산 보조
+    # --------------------------
+    @property
+    def dim(self):
+        return self.values.shape[1]
+
+    def valid_values(self):
+        return self.values[self.valid]
+
+    def count_valid(self):
+        return int(self.valid.sum())
+
+    def pad(self, n):
+        """길이가 n 보다 짧으면 invalid 프레임으로 채움."""
+        if len(self) >= n:
+            return self
+        extra = n - len(self)
+        return FrameTrack(
+            np.concatenate([self.values, np.zeros((extra, self.dim), dtype=self.values.dtype)]),
+            np.concatenate([self.valid, np.zeros(extra, dtype=bool)]),
+        )
+
+
+class FrameTrackBuilder:
+    """
+    프레임 루프에서 한 프레임씩 append 하는 용도 (검출 루프 등).
+    내부 배열을 두 배씩 늘려서 Python 객체를 프레임마다 만들지 않는다.
+    """
+
+    def __init__(self, dim=2, dtype=np.float32, capacity=1024):
+        capacity = max(1, int(capacity))
+        self._values = np.zeros((capacity, dim), dtype=dtype)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._n = 0
+
+    def append(self, value):
+        if self._n == len(self._valid):
+            self._values = np.concatenate([self._values, np.zeros_like(self._values)])
+            self._valid = np.concatenate([self._valid, np.zeros_like(self._valid)])
+        if value is not None:
+            self._values[self._n] = value
+            self._valid[self._n] = True
+        self._n += 1
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._n
+        if not (0 <= i < self._n) or not self._valid[i]:
+            return None
+        return tuple(self._values[i].tolist())
+
+    def build(self):
+        return FrameTrack(self._values[:self._n].copy(), self._valid[:self._n].copy())
@@ -0,0 +1,184 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.metrics import StageTimer
+
+
+class QueueFullError(RuntimeError):
+    """대기 중인 작업이 한도를 넘었을 때."""
+
+
+class Job:
+    """
+    분석 작업 하나의 상태.
+    status : queued -> running -> done | failed
+    stages : 단계별 status / progress(0~1)
+    timings: 끝난 단계별 StageTimer 측정값 (wall / cpu / peak RSS / 처리량)
+    """
+
+    def __init__(self, job_id, stages, metrics=None):
+        self.id = job_id
+        self.status = "queued"
+        self.stages = {name: {"status": "pending", "progress": 0.0} for name in stages}
+        self.stage_order = list(stages)
+        self.current_stage = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timings = {}
+        self._timer = None
+        self._metrics = metrics
+        self._lock = threading.Lock()
+
+    def _close_timer(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self.timings[self._timer.name] = self._timer.to_dict()
+            if self._metrics is not None:
+                self._metrics.observe_stage(self._timer)
+            self._timer = None
+
+    # --------------------------
+    # 단계 진행 보고 (워커 스레드에서 호출)
+    # --------------------------
+    def start_stage(self, name):
+        with self._lock:
+            self._close_timer()
+            self._timer = StageTimer(name).start()
+            if self.current_stage and self.stages[self.current_stage]["status"] == "running":
+                self.stages[self.current_stage]["status"] = "done"
+                self.stages[self.current_stage]["progress"] = 1.0
+            self.current_stage = name
+            self.stages.setdefault(name, {"status": "pending", "progress": 0.0})
+            self.stages[name]["status"] = "running"
+            self.stages[name]["progress"] = 0.0
+
+    def set_progress(self, name, progress):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is not None:
+                stage["progress"] = float(min(max(progress, 0.0), 1.0))
+
+    def set_items(self, n, unit):
+        """현재 단계에서 처리한 프레임/행 수 (items_per_sec 계산용)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.set_items(n, unit)
+
+    def progress_callback(self, name):
+        """VideoProcessor 등에 넘길 progress(frac) 콜백."""
+        return lambda frac: self.set_progress(name, frac)
+
+    def _start(self):
+        with self._lock:
+            self.status = "running"
+            self.started_at = time.time()
+
+    def _finish(self, result=None, error=None):
+        with self._lock:
+            self._close_timer()
+            if isinstance(result, dict):
+                result.setdefault("timings", dict(self.timings))
+            if self.current_stage and self.stages[self.current_stage]["status"] == "running":
+                self.stages[self.current_stage]["status"] = "failed" if error else "done"
+                if not error:
+                    self.stages[self.current_stage]["progress"] = 1.0
+            self.result = result
+            self.error = error
+            self.status = "failed" if error else "done"
+            self.finished_at = time.time()
+            if self._metrics is not None:
+                self._metrics.observe_job(self.status)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "current_stage": self.current_stage,
+                "stages": [dict(name=n, **self.stages[n]) for n in self.stage_order],
+                "result": self.result,
+                "error": self.error,
+                "timings": dict(self.timings),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobQueue:
+    """
+    분석 파이프라인을 HTTP 요청 밖에서 돌리기 위한 bounded 워커 풀.
+    - max_workers : 동시에 실행되는 작업 수 (CPU 과점유 방지)
+    - max_pending : 실행 + 대기 작업 상한, 넘으면 QueueFullError
+    - ttl         : 끝난 작업을 메모리에 유지하는 시간(초)
+    - metrics     : 선택, MetricsRegistry (단계별 측정값을 /metrics 로 집계)
+    """
+
+    def __init__(self, max_workers=1, max_pending=8, ttl=3600, metrics=None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(self.max_workers, int(max_pending))
+        self.ttl = ttl
+        self.metrics = metrics
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # fork 이전(gunicorn preload)에 스레드가 생기지 않도록 첫 submit 때 생성
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="analyze-worker",
+            )
+        return self._executor
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            jid for jid, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl
+        ]
+        for jid in expired:
+            del self._jobs[jid]
+
+    def active_count(self):
+        return sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+
+    def submit(self, fn, *args, stages=(), **kwargs):
+        """
+        fn(job, *args, **kwargs) 를 워커 풀에 넣고 Job 을 바로 반환.
+        fn 의 반환값이 job.result 가 된다.
+        """
+        with self._lock:
+            self._prune()
+            if self.active_count() >= self.max_pending:
+                raise QueueFullError(
+                    f"대기 중인 분석 작업이 너무 많습니다 (최대 {self.max_pending}개)."
+                )
+            job = Job(uuid.uuid4().hex, stages, metrics=self.metrics)
+            self._jobs[job.id] = job
+            executor = self._get_executor()
+
+        executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job._start()
+        try:
+            result = fn(job, *args, **kwargs)
+            job._finish(result=result)
+        except Exception as e:
+            print(f"[JobQueue] job {job.id} 실패:", repr(e))
+            traceback.print_exc()
+            job._finish(error=str(e))
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
@@ -0,0 +1,189 @@
+import numpy as np
+
+import config
+
+
+# 랩 번호 / 랩 beacon 으로 쓸 수 있는 텔레메트리 컬럼 (앞에 있는 것 우선)
+LAP_COLUMNS = ("lap_beacon", "lap", "lap_number", "laps")
+
+# distance 가 이 비율 (× 랩 길이) 이상 줄어들면 랩이 바뀐 것으로 본다 (랩 거리 채널)
+WRAP_FRAC = 0.5
+# 랩 거리가 랩 길이의 이 비율 이상이면 완주한 랩
+COMPLETE_FRAC = 0.95
+
+
+def _lap_column(telemetry):
+    for name in LAP_COLUMNS:
+        if name in telemetry:
+            return name
+    return None
+
+
+def _starts_from_lap_column(values):
+    """
+    랩 카운터 (0, 0, 1, 1, 2 ...) → 값이 바뀌는 행 (3, 4, 5, 0, 1 처럼 다시 0 부터 세는 것도 포함).
+    MoTeC beacon 펄스 (값이 0 / 1 뿐: 0, 0, 1, 0, 0 ...) → 0 에서 올라가는 행.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    if np.isnan(v).any():
+        # 빈 값은 앞 값으로 채움
+        idx = np.where(np.isnan(v), 0, np.arange(len(v)))
+        v = v[np.maximum.accumulate(idx)]
+        v = np.nan_to_num(v)
+    step = np.diff(v)
+    if (step < 0).any() and np.isin(v, (0.0, 1.0)).all():
+        rising = (v[1:] > 0) & (v[:-1] <= 0)
+        return np.flatnonzero(rising) + 1
+    return np.flatnonzero(step != 0) + 1
+
+
+def _unwrap_distance(dist, length=None):
+    """
+    랩 거리 채널 (랩마다 0 으로 돌아감) → 세션 누적 거리.
+    WRAP_FRAC × 랩 길이 이상 줄어드는 곳마다 줄어든 만큼 더해서 이어 붙인다
+    (누적 거리 채널이면 그대로). 랩 카운터와 distance wrap 이 한두 샘플 어긋나도
+    랩 시작 기준 거리가 틀어지지 않게 하려는 것.
+    """
+    d = np.nan_to_num(dist)
+    if len(d) < 2:
+        return d
+    span = float(d.max() - d.min())
+    step = np.diff(d)
+    wrap = step < -WRAP_FRAC * (length or span)
+    if not wrap.any():
+        return d
+    return d + np.concatenate([[0.0], np.cumsum(np.where(wrap, -step, 0.0))])
+
+
+class Laps:
+    """
+    세션 하나를 랩 단위로 나눈 결과 (행 index 기준, 전부 numpy 배열).
+
+    starts / ends : 랩별 [start, end) 행 범위
+    lap_index     : 행별 랩 번호 (0 ~ n_laps-1)
+    lap_dist      : 행별 랩 안 진행 거리 (m, 랩 안에서 단조 증가하도록 보정)
+    lap_time      : 행별 랩 시작 후 경과 시간 (s)
+    lap_times     : 랩별 랩 타임 (다음 랩 시작까지, 마지막 랩은 마지막 행까지)
+    distances     : 랩별 주행 거리
+    complete      : 랩별 완주 여부 (outlap 남은 부분 / 마지막 미완료 랩은 False)
+    length        : 랩 길이 (트랙 설정 또는 완주 랩들의 중앙값)
+    """
+
+    def __init__(self, starts, n_rows, time, dist, length=None):
+        starts = np.asarray(starts, dtype=np.int64)
+        self.starts = starts
+        self.ends = np.append(starts[1:], n_rows).astype(np.int64)
+        self.n_rows = n_rows
+
+        counts = self.ends - self.starts
+        self.lap_index = np.repeat(np.arange(len(starts)), counts)
+
+        time = np.asarray(time, dtype=np.float64)
+        dist = np.asarray(dist, dtype=np.float64)
+
+        # 랩 안 거리: 랩 시작 지점 기준 (wrap 을 풀어 낸 누적 거리에서),
+        # 노이즈로 뒤로 가는 값은 직전 최대값으로
+        unwrapped = _unwrap_distance(dist, length)
+        lap_dist = unwrapped - unwrapped[starts][self.lap_index]
+        # 랩별로 끊어서 누적 최대: 랩 번호 × 큰 수를 더해 한 번의 accumulate 로 처리
+        offset = self.lap_index * (np.nanmax(np.abs(lap_dist)) * 2 + 1.0) if n_rows else 0.0
+        self.lap_dist = np.maximum.accumulate(np.nan_to_num(lap_dist) + offset) - offset
+        self.lap_time = time - time[starts][self.lap_index]
+
+        t_end = np.append(time[starts[1:]], time[-1]) if n_rows else np.zeros(0)
+        self.lap_times = t_end - time[starts]
+        self.distances = (np.maximum.reduceat(self.lap_dist, starts) if n_rows
+                          else np.zeros(0))
+
+        if not length:
+            # 랩 길이를 모르면 충분히 긴 랩들의 중앙값
+            long_laps = self.distances[self.distances >= 0.5 * self.distances.max()] \
+                if len(self.distances) else []
+            length = float(np.median(long_laps)) if len(long_laps) else 0.0
+        self.length = float(length)
+        self.complete = self.distances >= COMPLETE_FRAC * self.length if self.length else \
+            np.zeros(len(starts), dtype=bool)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def grid(self, step=None):
+        """모든 랩이 공유하는 거리 grid (0 ~ 랩 길이, step m 간격)."""
+        step = step or config.LAP_GRID_STEP_M
+        return np.arange(0.0, max(self.length, step), step)
+
+    def resample(self, values, grid):
+        """
+        행별 값 → (n_laps, len(grid)) 배열, 랩마다 lap_dist 기준 선형 보간.
+        랩들을 (랩 번호 × 큰 수 + 랩 거리) 하나의 단조 축으로 이어 붙여 np.interp 한 번으로 처리.
+        랩이 그 거리까지 못 간 칸은 NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        grid = np.asarray(grid, dtype=np.float64)
+        n_laps = len(self)
+        if n_laps == 0 or self.n_rows == 0:
+            return np.full((n_laps, len(grid)), np.nan)
+
+        span = max(self.lap_dist.max(), grid[-1]) * 2 + 1.0
+        xp = self.lap_index * span + self.lap_dist
+        x = np.arange(n_laps)[:, None] * span + grid[None, :]
+        out = np.interp(x.ravel(), xp, values).reshape(n_laps, len(grid))
+
+        # 랩의 첫/마지막 거리 밖은 이웃 랩 값이 섞이므로 버린다
+        first = self.lap_dist[self.starts]
+        out[(grid[None, :] < first[:, None]) | (grid[None, :] > self.distances[:, None])] = np.nan
+        return out
+
+    def to_list(self):
+        """랩별 요약 (JSON 용)."""
+        return [
+            {
+                "lap": int(i + 1),
+                "start_row": int(self.starts[i]),
+                "end_row": int(self.ends[i]),
+                "lap_time": float(self.lap_times[i]),
+                "distance": float(self.distances[i]),
+                "complete": bool(self.complete[i]),
+            }
+            for i in range(len(self))
+        ]
+
+
+class LapSegmenter:
+    """
+    텔레메트리를 랩으로 나눈다 (행 단위 반복 없이 diff / flatnonzero).
+
+    1) 랩 컬럼 (LAP_COLUMNS) 이 있으면 랩 카운터 변화 또는 beacon 펄스
+    2) 없으면 distance 가 크게 줄어드는 지점 (랩 거리 채널의 wrap-around)
+    3) distance 가 세션 누적값이면 랩 길이 배수를 넘는 지점
+       (시작/결승선 위치를 모르므로 세션 시작 지점 기준 근사)
+    """
+
+    def split(self, telemetry, lap_length=None):
+        time = np.asarray(telemetry["time"], dtype=np.float64)
+        dist = np.asarray(telemetry["distance"], dtype=np.float64)
+        n = len(time)
+
+        starts = None
+        column = _lap_column(telemetry)
+        if column is not None:
+            starts = _starts_from_lap_column(telemetry[column])
+            method = column
+
+        if starts is None or len(starts) == 0:
+            d = np.nan_to_num(dist)
+            span = (np.nanmax(dist) - np.nanmin(dist)) if n else 0.0
+            threshold = WRAP_FRAC * (lap_length or span)
+            starts = np.flatnonzero(np.diff(d) < -threshold) + 1
+            method = "distance_wrap"
+
+            if len(starts) == 0 and lap_length and span > lap_length:
+                k = np.floor((d - d[0]) / lap_length)
+                starts = np.flatnonzero(np.diff(k) > 0) + 1
+                method = "distance_cumulative"
+
+        starts = np.concatenate([[0], starts]).astype(np.int64) if n else np.zeros(0, dtype=np.int64)
+        starts = np.unique(starts)
+        laps = Laps(starts, n, time, dist, length=lap_length)
+        print(f"[LapSegmenter] {len(laps)} 랩 ({int(laps.complete.sum())} 완주), 기준: {method}")
+        return laps
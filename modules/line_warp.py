@@ -1,10 +1,18 @@
 import numpy as np
 
+import config
+from modules.frame_track import FrameTrack
+
 
 class LineWarpEngine:
 
-    def __init__(self):
-        # 화면 좌표로 보내기 위한 임의 스케일/오프셋 (튜닝 포인트)
+    def __init__(self, mode=None):
+        # "homography" | "linear" (config.WARP_MODE)
+        self.mode = mode or config.WARP_MODE
+        if self.mode not in ("homography", "linear"):
+            raise ValueError(f"알 수 없는 warp mode: {self.mode}")
+
+        # linear 모드: 화면 좌표로 보내기 위한 임의 스케일/오프셋 (튜닝 포인트)
         self.scale_x = 0.035
         self.scale_y = 22.0
 
@@ -23,39 +31,118 @@ class LineWarpEngine:
         v = max(0, min(H - 1, v))
         return u, v
 
-    def warp(self, trajectory, meta, yolo_pos):
+    def world_to_screen_array(self, x, y, meta):
+        """world_to_screen 의 배열 버전 (int 변환은 0 방향 절사, 화면 안으로 clip)."""
+        W = meta["width"]
+        H = meta["height"]
+
+        u = np.trunc(W * self.offset_x + np.asarray(y) * self.scale_y)
+        v = np.trunc(H * self.offset_y - np.asarray(x) * self.scale_x)
+        return np.clip(u, 0, W - 1).astype(np.int32), np.clip(v, 0, H - 1).astype(np.int32)
+
+    def project(self, points, H, meta):
+        """
+        homography 로 점들을 한 번에 영상 좌표로 투영.
+
+        points : (..., 2) 맵 좌표. H 가 프레임별 (N, 3, 3) 이면 points 는 (N, ..., 2)
+        H      : (3, 3) 또는 (N, 3, 3)
+        반환: (uv int32 (..., 2), ok bool (...)) — 카메라 뒤(w <= 0)는 ok=False,
+              화면 밖 좌표는 화면 가장자리로 clip (linear 모드와 동일).
+        """
+        pts = np.asarray(points, dtype=np.float64)
+        H = np.asarray(H, dtype=np.float64)
+        homog = np.concatenate([pts, np.ones(pts.shape[:-1] + (1,))], axis=-1)
+
+        if H.ndim == 2:
+            out = homog @ H.T
+        else:
+            if len(H) < len(pts):
+                raise ValueError(
+                    f"프레임별 homography 가 부족합니다: H {len(H)}개 < 프레임 {len(pts)}개 "
+                    f"(points 는 (프레임 수, ..., 2), H 는 (프레임 수 이상, 3, 3))"
+                )
+            H = H[:len(pts)]
+            out = np.einsum("nij,n...j->n...i", H, homog)
+
+        w = out[..., 2]
+        ok = w > 1e-9
+        uv = out[..., :2] / np.where(ok, w, 1.0)[..., None]
+
+        W = meta["width"]
+        H_px = meta["height"]
+        uv = np.trunc(np.nan_to_num(uv))
+        u = np.clip(uv[..., 0], 0, W - 1)
+        v = np.clip(uv[..., 1], 0, H_px - 1)
+        return np.stack([u, v], axis=-1).astype(np.int32), ok
+
+    def warp(self, trajectory, meta, yolo_pos, homography=None, world_to_map=None):
         """
         frame_map : [frame_idx -> telemetry_idx or None]
-        각 프레임마다 real / ideal 좌표를 화면 픽셀로 변환.
+        telemetry_idx 는 소수일 수 있음 (시간 기반 sync) → 이웃 두 샘플 사이를 선형 보간.
+        전체 프레임을 배열 연산 한 번으로 화면 픽셀로 변환.
+
+        homography 모드 : real / ideal 점을 모두 맵 좌표로 모아 project() 한 번으로 투영.
+                          real 궤적은 world_to_map (2x3 affine) 으로 맵 좌표로 옮기고,
+                          world_to_map 이 없으면 real 만 linear 모드처럼 매핑한다.
+                          homography 가 (N, 3, 3) 이면 프레임마다 다른 H 를 쓴다.
+        linear 모드     : real 은 world_to_screen 선형 매핑, ideal 은 좌표 그대로.
+
+        반환: (warped_real, warped_ideal) FrameTrack (N, 2) int32
         """
-        xs = trajectory["x"]
-        ys = trajectory["y"]
-        ideal_x = trajectory["ideal_x"]
-        ideal_y = trajectory["ideal_y"]
-        fm = trajectory["frame_map"]
+        xs = np.asarray(trajectory["x"], dtype=float)
+        ys = np.asarray(trajectory["y"], dtype=float)
+        ideal_x = np.asarray(trajectory["ideal_x"], dtype=float)
+        ideal_y = np.asarray(trajectory["ideal_y"], dtype=float)
+        fm = FrameTrack.coerce(trajectory["frame_map"], dim=1, dtype=np.float64)
+        n_tel = len(xs)
 
         n_frames = min(len(fm), len(yolo_pos))  # 영상 프레임 수 기준
-        warped_real = []
-        warped_ideal = []
-
-        for i in range(n_frames):
-            tel_idx = fm[i]
-            if tel_idx is None:
-                warped_real.append(None)
-                warped_ideal.append(None)
-                continue
-
-            # 텔레 인덱스로 real world 좌표 선택
-            xr = xs[tel_idx]
-            yr = ys[tel_idx]
-            ui, vi = self.world_to_screen(xr, yr, meta)
-            warped_real.append((ui, vi))
-
-            # ideal line도 동일한 텔레 인덱스 기준으로 매핑
-            xi = ideal_x[tel_idx]
-            yi = ideal_y[tel_idx]
-            # ideal_x, ideal_y가 이미 화면 좌표면 그대로 사용,
-            # world 좌표면 위와 같이 world_to_screen을 한 번 더 태워도 됨.
-            warped_ideal.append((int(xi), int(yi)))
-
-        return warped_real, warped_ideal
+        valid = fm.valid[:n_frames].copy()
+        if n_tel == 0:
+            valid[:] = False
+        tel_idx = np.where(valid, fm.values[:n_frames, 0], 0.0)
+
+        # 텔레 인덱스로 real world 좌표 선택 (이웃 두 샘플 보간)
+        i0 = np.minimum(tel_idx.astype(np.int64), max(n_tel - 1, 0))
+        i1 = np.minimum(i0 + 1, max(n_tel - 1, 0))
+        w = tel_idx - i0
+
+        def lerp(a):
+            if n_tel == 0:
+                return np.zeros(n_frames)
+            return a[i0] + (a[i1] - a[i0]) * w
+
+        if self.mode == "homography" and world_to_map is None:
+            # real 궤적을 맵 좌표로 옮길 방법이 없음 → real 만 linear, ideal 은 homography
+            print("[LineWarp] world_to_map 없음 → real 궤적은 linear 매핑")
+            H = config.HOMOGRAPHY_MATRIX if homography is None else homography
+            real = np.zeros((n_frames, 2), dtype=np.int32)
+            real[:, 0], real[:, 1] = self.world_to_screen_array(lerp(xs), lerp(ys), meta)
+            ideal, ok = self.project(np.column_stack([lerp(ideal_x), lerp(ideal_y)]), H, meta)
+            real_ok = valid
+            ideal_ok = valid & ok
+        elif self.mode == "homography":
+            H = config.HOMOGRAPHY_MATRIX if homography is None else homography
+            A = np.asarray(world_to_map, dtype=np.float64)
+            real = np.column_stack([lerp(xs), lerp(ys)]) @ A[:, :2].T + A[:, 2]
+
+            # (N, 2 [real, ideal], 2 [x, y]) 를 한 번에 투영
+            pts = np.stack([real, np.column_stack([lerp(ideal_x), lerp(ideal_y)])], axis=1)
+            uv, ok = self.project(pts, H, meta)
+            real_ok = valid & ok[:, 0]
+            ideal_ok = valid & ok[:, 1]
+            real, ideal = uv[:, 0].copy(), uv[:, 1].copy()
+        else:
+            real = np.zeros((n_frames, 2), dtype=np.int32)
+            real[:, 0], real[:, 1] = self.world_to_screen_array(lerp(xs), lerp(ys), meta)
+
+            # ideal line 은 이미 화면(맵) 좌표로 보고 그대로 사용
+            ideal = np.zeros((n_frames, 2), dtype=np.int32)
+            ideal[:, 0] = np.trunc(np.nan_to_num(lerp(ideal_x)))
+            ideal[:, 1] = np.trunc(np.nan_to_num(lerp(ideal_y)))
+            real_ok = valid
+            ideal_ok = valid.copy()
+
+        real[~real_ok] = 0
+        ideal[~ideal_ok] = 0
+        return FrameTrack(real, real_ok), FrameTrack(ideal, ideal_ok)
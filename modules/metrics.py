@@ -0,0 +1,162 @@
+import bisect
+import resource
+import sys
+import threading
+import time
+
+
+# ru_maxrss 단위: Linux 는 KB, macOS 는 byte
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# 단계 시간 histogram bucket (초). 짧은 sync/warp 부터 긴 tracking/render 까지.
+TIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+# 처리량 histogram bucket (프레임 또는 행 / 초)
+RATE_BUCKETS = (1, 5, 10, 30, 60, 120, 250, 500, 1000, 1e4, 1e5, 1e6, 1e7)
+
+
+def peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class StageTimer:
+    """
+    파이프라인 단계 하나의 측정.
+
+    wall_sec     : 경과 시간
+    cpu_sec      : 이 단계를 실행한 스레드의 CPU 시간 (디코더 스레드/렌더 프로세스 제외)
+    peak_rss_mb  : 단계 종료 시점의 프로세스 최대 RSS (high-water mark)
+    items, unit  : 처리한 프레임/행 수 → items_per_sec
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.items = None
+        self.unit = None
+        self.wall_sec = None
+        self.cpu_sec = None
+        self.peak_rss_mb = None
+        self._t0 = None
+        self._c0 = None
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._c0 = time.thread_time()
+        return self
+
+    def set_items(self, n, unit):
+        self.items = int(n)
+        self.unit = unit
+
+    def stop(self):
+        if self.wall_sec is None and self._t0 is not None:
+            self.wall_sec = time.perf_counter() - self._t0
+            self.cpu_sec = time.thread_time() - self._c0
+            self.peak_rss_mb = peak_rss_bytes() / 1e6
+        return self
+
+    @property
+    def items_per_sec(self):
+        if not self.items or not self.wall_sec:
+            return None
+        return self.items / self.wall_sec
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def to_dict(self):
+        return {
+            "wall_sec": self.wall_sec,
+            "cpu_sec": self.cpu_sec,
+            "peak_rss_mb": self.peak_rss_mb,
+            "items": self.items,
+            "unit": self.unit,
+            "items_per_sec": self.items_per_sec,
+        }
+
+
+class Histogram:
+    """Prometheus histogram (누적 bucket + sum + count), label 값별로 따로 집계."""
+
+    def __init__(self, name, help_text, buckets, label):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._series = {}   # label 값 → [bucket counts..., +Inf], sum
+
+    def observe(self, label_value, value):
+        counts, total = self._series.get(label_value, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._series[label_value] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for lv in sorted(self._series):
+            counts, total = self._series[lv]
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                lines.append(f'{self.name}_bucket{{{self.label}="{lv}",le="{le:g}"}} {acc}')
+            acc += counts[-1]
+            lines.append(f'{self.name}_bucket{{{self.label}="{lv}",le="+Inf"}} {acc}')
+            lines.append(f'{self.name}_sum{{{self.label}="{lv}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{lv}"}} {acc}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    끝난 단계들을 histogram 으로 누적하고 /metrics 용 Prometheus text format 으로 출력.
+    prometheus_client 없이 필요한 만큼만 구현. gunicorn 워커마다 따로 집계된다.
+    """
+
+    def __init__(self, prefix="acc"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.wall = Histogram(f"{prefix}_stage_wall_seconds", "Wall time per analysis stage",
+                              TIME_BUCKETS, "stage")
+        self.cpu = Histogram(f"{prefix}_stage_cpu_seconds", "CPU time of the worker thread per analysis stage",
+                             TIME_BUCKETS, "stage")
+        self.rate = Histogram(f"{prefix}_stage_items_per_second", "Frames or rows processed per second per stage",
+                              RATE_BUCKETS, "stage")
+        self._stage_rss = {}
+        self._jobs = {}
+
+    def observe_stage(self, timer):
+        if timer.wall_sec is None:
+            return
+        with self._lock:
+            self.wall.observe(timer.name, timer.wall_sec)
+            self.cpu.observe(timer.name, timer.cpu_sec)
+            if timer.items_per_sec is not None:
+                self.rate.observe(timer.name, timer.items_per_sec)
+            rss = timer.peak_rss_mb * 1e6
+            self._stage_rss[timer.name] = max(self._stage_rss.get(timer.name, 0.0), rss)
+
+    def observe_job(self, status):
+        with self._lock:
+            self._jobs[status] = self._jobs.get(status, 0) + 1
+
+    def render(self):
+        p = self.prefix
+        with self._lock:
+            lines = self.wall.render() + self.cpu.render() + self.rate.render()
+
+            lines += [f"# HELP {p}_stage_peak_rss_bytes Highest process peak RSS seen at the end of a stage",
+                      f"# TYPE {p}_stage_peak_rss_bytes gauge"]
+            for stage in sorted(self._stage_rss):
+                lines.append(f'{p}_stage_peak_rss_bytes{{stage="{stage}"}} {self._stage_rss[stage]:.0f}')
+
+            lines += [f"# HELP {p}_jobs_total Finished analysis jobs",
+                      f"# TYPE {p}_jobs_total counter"]
+            for status in sorted(self._jobs):
+                lines.append(f'{p}_jobs_total{{status="{status}"}} {self._jobs[status]}')
+
+        lines += [f"# HELP {p}_process_peak_rss_bytes Process peak RSS",
+                  f"# TYPE {p}_process_peak_rss_bytes gauge",
+                  f"{p}_process_peak_rss_bytes {peak_rss_bytes()}"]
+        return "\n".join(lines) + "\n"
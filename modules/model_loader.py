@@ -0,0 +1,120 @@
+import copy
+import importlib.util
+import threading
+
+import numpy as np
+
+import config
+
+
+# ultralytics / torch 는 첫 모델 로딩 때만 import (서버 기동 시간에 포함되지 않도록)
+_YOLO = None
+_lock = threading.Lock()
+_shared = {}          # (model_path, device) → 한 번만 로딩한 기준 YOLO 인스턴스
+_device = None        # select_device("auto") 결과
+
+
+def ultralytics_available():
+    """ultralytics 를 import 하지 않고 설치 여부만 확인."""
+    return _YOLO is not None or importlib.util.find_spec("ultralytics") is not None
+
+
+def _yolo_class():
+    global _YOLO
+    if _YOLO is None:
+        from ultralytics import YOLO
+        _YOLO = YOLO
+    return _YOLO
+
+
+def select_device(preferred=None):
+    """
+    preferred : "auto" | "cuda" | "cuda:N" | "mps" | "cpu" (None 이면 config.DEVICE)
+
+    auto 는 cuda → mps → cpu 순서로 쓸 수 있는 것을 고른다.
+    cuda/mps 를 지정했는데 쓸 수 없으면 경고 후 cpu.
+    torch 는 이 함수가 처음 불릴 때 import 된다.
+    """
+    global _device
+    preferred = preferred or config.DEVICE
+    if preferred == "cpu":
+        return "cpu"
+    if preferred == "auto" and _device is not None:
+        return _device
+
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+
+    cuda_ok = torch.cuda.is_available()
+    mps = getattr(torch.backends, "mps", None)
+    mps_ok = mps is not None and mps.is_available()
+
+    if preferred == "auto":
+        _device = "cuda:0" if cuda_ok else ("mps" if mps_ok else "cpu")
+        print(f"[ModelLoader] device 자동 선택: {_device}")
+        return _device
+    if preferred.startswith("cuda") and not cuda_ok:
+        print(f"[ModelLoader] {preferred} 를 쓸 수 없음 → cpu")
+        return "cpu"
+    if preferred == "mps" and not mps_ok:
+        print("[ModelLoader] mps 를 쓸 수 없음 → cpu")
+        return "cpu"
+    return preferred
+
+
+def _warmup(model, device):
+    """작은 빈 프레임으로 한 번 추론 → layer fuse / device 이동을 로딩 시점에 끝냄."""
+    model.predict(source=np.zeros((64, 64, 3), dtype=np.uint8), device=device,
+                  verbose=False, imgsz=64)
+    model.predictor = None
+
+
+def load_shared(model_path, device):
+    """
+    (model_path, device) 당 한 번만 가중치를 읽어서 보관.
+    반환된 인스턴스는 직접 추론에 쓰지 말고 clone() 해서 쓴다.
+    """
+    key = (model_path, device)
+    with _lock:
+        base = _shared.get(key)
+        if base is None:
+            base = _yolo_class()(model_path)
+            _warmup(base, device)
+            _shared[key] = base
+            print(f"[ModelLoader] YOLO 모델 로딩: {model_path} ({device})")
+        return base
+
+
+def clone(base):
+    """
+    가중치(nn.Module)는 공유하고 predictor/tracker/callback 상태만 따로 갖는 YOLO.
+    track(persist=True) 의 tracker 상태가 인스턴스마다 분리되므로 스레드별로 하나씩 쓴다.
+    """
+    m = copy.copy(base)
+    m.predictor = None
+    m.overrides = dict(base.overrides)
+    m.callbacks = {k: list(v) for k, v in base.callbacks.items()}
+    return m
+
+
+def preload(model_path=None, device=None):
+    """
+    gunicorn preload_app 용: fork 전에 가중치를 읽어 두면 워커들이
+    copy-on-write 로 같은 메모리 페이지를 공유한다.
+    CUDA/MPS 는 fork 전에 초기화하면 자식에서 쓸 수 없으므로 cpu 일 때만 미리 읽는다.
+    """
+    if config.DETECTOR_BACKEND != "ultralytics":
+        # ONNX Runtime 세션은 내부 스레드 풀 때문에 fork 후 재사용하지 않는다
+        print(f"[ModelLoader] backend={config.DETECTOR_BACKEND} → preload 생략")
+        return None
+    model_path = model_path or config.MODEL_PATH
+    device = select_device(device)
+    if device != "cpu":
+        print(f"[ModelLoader] device={device} → fork 전 preload 생략 (워커에서 로딩)")
+        return None
+    if not ultralytics_available():
+        print("[ModelLoader] ultralytics 가 없어 preload 생략")
+        return None
+    return load_shared(model_path, device)
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class KalmanTracker:
+    """
+    화면 좌표 (cx, cy) 용 등속도 Kalman filter.
+    state = [x, y, vx, vy], 한 step = 한 프레임.
+    """
+
+    def __init__(self, process_noise=1.0, measurement_noise=4.0):
+        self.F = np.array([
+            [1, 0, 1, 0],
+            [0, 1, 0, 1],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ], dtype=float)
+        self.Hm = np.array([
+            [1, 0, 0, 0],
+            [0, 1, 0, 0],
+        ], dtype=float)
+        self.Q = np.eye(4) * process_noise
+        self.R = np.eye(2) * measurement_noise
+
+        self.x = None
+        self.P = None
+
+    @property
+    def initialized(self):
+        return self.x is not None
+
+    def reset(self):
+        self.x = None
+        self.P = None
+
+    def predict(self):
+        """한 프레임 앞으로 진행하고 예측 위치 (cx, cy) 반환."""
+        if self.x is None:
+            return None
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return float(self.x[0]), float(self.x[1])
+
+    def update(self, cx, cy):
+        z = np.array([cx, cy], dtype=float)
+        if self.x is None:
+            self.x = np.array([cx, cy, 0.0, 0.0])
+            self.P = np.diag([self.R[0, 0], self.R[1, 1], 100.0, 100.0])
+            return
+
+        y = z - self.Hm @ self.x
+        S = self.Hm @ self.P @ self.Hm.T + self.R
+        K = self.P @ self.Hm.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(4) - K @ self.Hm) @ self.P
+
+
+class KeyframeTracker:
+    """
+    N 프레임마다만 검출기를 돌리고, 사이 프레임은 Kalman 예측으로 채운다.
+
+    detect_fn(frame) -> ((cx, cy), conf) 또는 None
+
+    stride 는 min_stride ~ max_stride 사이에서 적응적으로 바뀐다.
+    - 검출 conf 가 conf_min 미만이거나 예측과 검출의 차이(drift)가 drift_px 를
+      넘으면 min_stride 로 줄이고
+    - 안정적이면 두 배씩 늘린다.
+    검출 실패 시 트래커를 리셋하고 다음 프레임에서 바로 다시 검출한다.
+    """
+
+    def __init__(self, detect_fn, min_stride=1, max_stride=8, drift_px=12.0, conf_min=0.5):
+        self.detect_fn = detect_fn
+        self.min_stride = max(1, int(min_stride))
+        self.max_stride = max(self.min_stride, int(max_stride))
+        self.drift_px = drift_px
+        self.conf_min = conf_min
+
+        self.kf = KalmanTracker()
+        self.stride = self.min_stride
+        self.since_detect = 0
+        self.n_detect = 0
+
+    def step(self, frame):
+        """프레임 한 장 → (cx, cy) 또는 None (car_pos 규약 그대로)."""
+        pred = self.kf.predict()
+
+        if pred is not None and self.since_detect + 1 < self.stride:
+            self.since_detect += 1
+            return pred
+
+        self.since_detect = 0
+        self.n_detect += 1
+        det = self.detect_fn(frame)
+
+        if det is None:
+            self.kf.reset()
+            self.stride = self.min_stride
+            return None
+
+        (cx, cy), conf = det
+        drift = 0.0 if pred is None else float(np.hypot(cx - pred[0], cy - pred[1]))
+        self.kf.update(cx, cy)
+
+        if conf < self.conf_min or drift > self.drift_px:
+            self.stride = self.min_stride
+        else:
+            self.stride = min(self.stride * 2, self.max_stride)
+
+        return (cx, cy)
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+from modules.frame_track import FrameTrack
+
+
+IDEAL_COLOR = (0, 255, 0)     # 녹색
+REAL_COLOR = (255, 0, 0)      # 파란색
+CAR_COLOR = (0, 0, 255)       # 빨강
+FASTER_COLOR = (0, 220, 0)    # delta 음수 (기준 랩보다 빠름)
+SLOWER_COLOR = (0, 0, 255)    # delta 양수
+
+
+class OverlayCompositor:
+    """
+    프레임마다 그릴 선들을 영상 크기의 overlay layer 하나에 누적해 두고
+    각 프레임에는 mask 로 layer 를 덮어쓰기만 한다.
+
+    - ideal line : 생성 시 한 번만 rasterize
+    - real trail : 새로 들어온 점과 직전 점 사이 segment 하나만 추가로 그림
+    - 합성 범위는 지금까지 그린 영역의 bounding box 로 제한
+
+    프레임당 비용이 trail 길이와 무관하게 일정하다.
+    """
+
+    def __init__(self, width, height, warped_ideal=None, thickness=2):
+        self.width = width
+        self.height = height
+        self.thickness = thickness
+
+        self.layer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        self._bbox = None          # (x0, y0, x1, y1), 그린 영역
+        self.last_real = None      # trail 의 마지막 점
+
+        # ideal line은 전체 궤적을 하나의 polyline으로 항상 보여줌
+        if warped_ideal is not None:
+            ideal_points = FrameTrack.coerce(warped_ideal, dtype=np.int32).valid_values()
+            if len(ideal_points) >= 2:
+                self._polyline(ideal_points.astype(np.int32), IDEAL_COLOR)
+
+    def _grow_bbox(self, pts):
+        pad = self.thickness + 1
+        x0 = max(0, int(pts[:, 0].min()) - pad)
+        y0 = max(0, int(pts[:, 1].min()) - pad)
+        x1 = min(self.width, int(pts[:, 0].max()) + pad + 1)
+        y1 = min(self.height, int(pts[:, 1].max()) + pad + 1)
+        if self._bbox is None:
+            self._bbox = (x0, y0, x1, y1)
+        else:
+            bx0, by0, bx1, by1 = self._bbox
+            self._bbox = (min(bx0, x0), min(by0, y0), max(bx1, x1), max(by1, y1))
+
+    def _polyline(self, pts, color):
+        poly = pts.reshape(-1, 1, 2)
+        cv2.polylines(self.layer, [poly], False, color, self.thickness)
+        cv2.polylines(self.mask, [poly], False, 255, self.thickness)
+        self._grow_bbox(pts.reshape(-1, 2))
+
+    def add_real_points(self, points):
+        """real trail 에 점(들)을 이어 붙인다. 새 segment 만 그린다."""
+        pts = FrameTrack.coerce(points, dtype=np.int32).valid_values().astype(np.int32)
+        if len(pts) == 0:
+            return
+        if self.last_real is not None:
+            pts = np.vstack([self.last_real, pts])
+        self.last_real = pts[-1]
+        if len(pts) >= 2:
+            self._polyline(pts, REAL_COLOR)
+
+    def add_real_point(self, point):
+        if point is None:
+            return
+        pt = np.array([point], dtype=np.int32)
+        if self.last_real is not None:
+            self._polyline(np.vstack([self.last_real, pt]), REAL_COLOR)
+        self.last_real = pt[0]
+
+    def apply(self, frame):
+        """layer 를 frame 위에 mask 로 합성 (in-place)."""
+        if self._bbox is None:
+            return frame
+        x0, y0, x1, y1 = self._bbox
+        # frame[y0:y1, x0:x1] 는 view 이므로 copyTo 가 frame 에 바로 쓴다
+        cv2.copyTo(self.layer[y0:y1, x0:x1], self.mask[y0:y1, x0:x1], frame[y0:y1, x0:x1])
+        return frame
+
+
+def draw_car_marker(frame, pos):
+    """YOLO car marker (빨강 점)."""
+    if pos is not None:
+        cv2.circle(frame, (int(pos[0]), int(pos[1])), 6, CAR_COLOR, -1)
+
+
+def draw_delta(frame, delta):
+    """기준 랩 대비 delta-time (초) 을 왼쪽 위에 표시."""
+    if delta is None:
+        return
+    text = f"DELTA {delta:+.3f}"
+    color = FASTER_COLOR if delta <= 0 else SLOWER_COLOR
+    (w, h), base = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+    cv2.rectangle(frame, (10, 10), (10 + w + 16, 10 + h + base + 12), (0, 0, 0), -1)
+    cv2.putText(frame, text, (18, 16 + h), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2, cv2.LINE_AA)
@@ -1,7 +1,108 @@
+import warnings
+
 import numpy as np
 
+import config
+from modules.artifact_cache import ArtifactCache
+from modules.delta_time import sector_bounds
+
+
+# 랩별 분석에서 거리 grid 로 보간하는 채널
+LAP_CHANNELS = ("speed", "throttle", "brake")
+
+# 코너/섹터 지표 형식이 바뀌면 올려서 기존 캐시를 무효화
+CORNER_METRICS_VERSION = 1
+
+CORNER_METRICS = (
+    "entry_speed", "apex_speed", "exit_speed", "min_speed",
+    "braking_point", "brake_duration", "throttle_pickup", "time",
+)
+SECTOR_METRICS = ("time", "avg_speed", "min_speed", "max_speed", "full_throttle", "brake_usage")
+
+
+def _nan_reduce(fn, a):
+    """빈 랩 (전부 NaN) 경고 없이 axis=1 축약."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return fn(a, axis=1)
+
+
+def _json_float(v):
+    return None if v is None or not np.isfinite(v) else float(v)
+
+
+# ==========================================================
+# 구간 축약 (랩 × grid 배열 → 랩 × 구간)
+# ==========================================================
+def _segment_reduce(ufunc, a, s_idx, e_idx, fill):
+    """
+    a[:, s:e] 를 구간마다 ufunc 로 축약 → (n_laps, n_segments).
+    [s0, e0, s1, e1, ...] 를 reduceat 한 번에 넘기고 짝수 번째만 취한다
+    (e 가 끝 칸일 수 있으므로 fill 한 칸을 덧붙임).
+    """
+    padded = np.concatenate([a, np.full((a.shape[0], 1), fill)], axis=1)
+    idx = np.column_stack([s_idx, e_idx]).ravel()
+    return ufunc.reduceat(padded, idx, axis=1)[:, ::2]
+
+
+def _segment_first(mask, grid, s_idx, e_idx):
+    """구간 안에서 mask 가 처음 True 인 grid 거리 (없으면 NaN)."""
+    pos = np.where(mask, grid[None, :], np.nan)
+    return _segment_reduce(np.fmin, pos, s_idx, e_idx, np.nan)
+
+
+def _segment_mean(a, s_idx, e_idx):
+    ok = np.isfinite(a)
+    total = _segment_reduce(np.add, np.where(ok, a, 0.0), s_idx, e_idx, 0.0)
+    count = _segment_reduce(np.add, ok.astype(np.float64), s_idx, e_idx, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def detect_corners(grid, speed, min_drop=None, smooth_m=30.0):
+    """
+    트랙 설정에 corners 가 없을 때: 랩 하나의 속도 grid 에서 코너 구간 추정.
+    속도 극소점 = apex, 바로 앞/뒤 극대점 = 구간 시작 (제동 시작 부근) / 끝.
+    앞 극대점 대비 min_drop (km/h) 이상 떨어지지 않는 극소점은 코너로 보지 않는다.
+    반환: [{"name": "T1", "start", "apex", "end"} ...] (m)
+    """
+    min_drop = config.CORNER_DETECTION["min_drop_kmh"] if min_drop is None else min_drop
+    ok = np.isfinite(speed)
+    if ok.sum() < 3:
+        return []
+    v = np.interp(grid, grid[ok], speed[ok])
+    step = grid[1] - grid[0] if len(grid) > 1 else 1.0
+    k = max(1, int(round(smooth_m / step)))
+    v = np.convolve(np.pad(v, k, mode="edge"), np.ones(2 * k + 1) / (2 * k + 1), mode="valid")
+
+    # 기울기 부호 변화로 극소/극대 (평평한 구간은 앞 부호를 이어받음)
+    sign = np.sign(np.diff(v))
+    nz = np.flatnonzero(sign)
+    if len(nz) == 0:
+        return []
+    sign = sign[nz[np.clip(np.searchsorted(nz, np.arange(len(sign)), side="right") - 1, 0, None)]]
+    turn = np.flatnonzero(np.diff(sign)) + 1
+    minima = turn[sign[turn - 1] < 0]
+    maxima = np.concatenate([[0], turn[sign[turn - 1] > 0], [len(v) - 1]])
+    if len(minima) == 0:
+        return []
+
+    pos = np.searchsorted(maxima, minima)
+    start, end = maxima[pos - 1], maxima[np.minimum(pos, len(maxima) - 1)]
+    keep = (v[start] - v[minima]) >= min_drop
+    return [
+        {"name": f"T{i + 1}", "start": float(grid[s]), "apex": float(grid[a]), "end": float(grid[e])}
+        for i, (s, a, e) in enumerate(zip(start[keep], minima[keep], end[keep]))
+    ]
+
+
 class PerformanceAnalyzer:
 
+    def __init__(self, cache_dir=None):
+        if cache_dir is None and config.TELEMETRY_CACHE_ENABLED:
+            cache_dir = config.CACHE_DIR
+        self.cache = ArtifactCache(cache_dir) if cache_dir else None
+
     def analyze(self, telemetry, trajectory):
         result = {}
 
@@ -55,3 +156,296 @@ class PerformanceAnalyzer:
             result["error"] = f"Performance 분석 실패: {e}"
 
         return result
+
+    def resample_laps(self, telemetry, laps, trajectory=None, step=None):
+        """
+        모든 랩을 공유 거리 grid 로 한 번에 보간.
+        반환: (grid, {채널: (n_laps, len(grid)) 배열}), 채널에는 랩 경과 시간 "lap_time" 포함
+        """
+        grid = laps.grid(step)
+        channels = {"lap_time": laps.resample(laps.lap_time, grid)}
+        for name in LAP_CHANNELS:
+            if name in telemetry:
+                channels[name] = laps.resample(telemetry[name], grid)
+        if trajectory is not None and "lateral_offset" in trajectory:
+            channels["lateral_offset"] = laps.resample(trajectory["lateral_offset"], grid)
+        return grid, channels
+
+    def analyze_laps(self, telemetry, laps, trajectory=None, step=None, resampled=None):
+        """
+        랩별 성능 (랩 수와 상관없이 (n_laps, n_points) 배열 연산 한 번).
+        resampled : 선택, resample_laps 결과 (corner_metrics 와 같이 쓸 때 보간을 한 번만)
+        반환: {"laps": [랩별 dict], "best_lap": 완주 랩 중 가장 빠른 랩 번호, "grid_step": m}
+        """
+        grid, ch = resampled or self.resample_laps(telemetry, laps, trajectory, step)
+        n = len(laps)
+        col = {
+            "lap_time": laps.lap_times,
+            "distance": laps.distances,
+            # 평균 속도는 시간 기준 (거리 / 랩 타임)
+            "avg_speed": np.where(laps.lap_times > 0,
+                                  laps.distances / np.maximum(laps.lap_times, 1e-9) * 3.6, np.nan),
+        }
+
+        # =======================
+        # 속도
+        # =======================
+        if "speed" in ch:
+            col["max_speed"] = _nan_reduce(np.nanmax, ch["speed"])
+            col["min_speed"] = _nan_reduce(np.nanmin, ch["speed"])
+
+        # =======================
+        # 스로틀 (거리 비율)
+        # =======================
+        if "throttle" in ch:
+            t = ch["throttle"]
+            col["avg_throttle"] = _nan_reduce(np.nanmean, t)
+            col["full_throttle"] = _nan_reduce(np.nanmean, np.where(np.isnan(t), np.nan, t >= 98))
+
+        # =======================
+        # 브레이크 (거리 비율)
+        # =======================
+        if "brake" in ch:
+            b = ch["brake"]
+            col["brake_usage"] = _nan_reduce(np.nanmean, np.where(np.isnan(b), np.nan, b > 0))
+            col["max_brake"] = _nan_reduce(np.nanmax, b)
+
+        # =======================
+        # Ideal line 대비 lateral offset
+        # =======================
+        # (world_to_map 이 없어 offset 을 못 구한 경우 null)
+        if "lateral_offset" in ch:
+            col["mean_abs_lateral"] = _nan_reduce(np.nanmean, np.abs(ch["lateral_offset"]))
+        else:
+            col["mean_abs_lateral"] = np.full(n, np.nan)
+
+        out = laps.to_list()
+        for name, values in col.items():
+            for i in range(n):
+                out[i][name] = _json_float(values[i])
+
+        best = None
+        if laps.complete.any():
+            times = np.where(laps.complete, laps.lap_times, np.inf)
+            best = int(np.argmin(times)) + 1
+
+        return {"laps": out, "best_lap": best, "grid_step": float(grid[1] - grid[0]) if len(grid) > 1 else None}
+
+    # ==========================================================
+    # 코너 / 섹터 지표
+    # ==========================================================
+    def corner_metrics(self, laps, resampled, track_cfg=None, session_hash=None):
+        """
+        트랙 정의 (track_cfg["corners"], ["sectors"]) 의 코너/섹터마다 랩별 지표.
+        코너 : {"name", "start", "apex", "end"} (m, 랩 시작 기준). 없으면 가장 빠른 랩 속도로 추정.
+
+        모든 랩 × 모든 구간을 reduceat 로 한 번에 축약하고,
+        session_hash (텔레메트리 내용 해시) 가 있으면 ArtifactCache ("corner_metrics") 에 저장한다.
+        반환: {"key", "corners", "sectors", "complete", "lap_times",
+               "corner": {지표: (n_laps, n_corners)}, "sector": {지표: (n_laps, n_sectors)}}
+        """
+        track_cfg = track_cfg or {}
+        grid, ch = resampled
+        key = None
+        if session_hash is not None and self.cache is not None:
+            key = ArtifactCache.make_key(
+                "corner_metrics", CORNER_METRICS_VERSION, session_hash, float(grid[1] - grid[0]),
+                track_cfg.get("corners"), track_cfg.get("sectors"), track_cfg.get("length_m"),
+                config.CORNER_DETECTION,
+            )
+            hit = self.load_corner_metrics(key)
+            if hit is not None:
+                return hit
+
+        corners = track_cfg.get("corners")
+        if not corners and "speed" in ch and laps.complete.any():
+            best = int(np.argmin(np.where(laps.complete, laps.lap_times, np.inf)))
+            corners = detect_corners(grid, ch["speed"][best])
+        corners = sorted(corners or [], key=lambda c: c["start"])
+
+        bounds = sector_bounds(laps.length or float(grid[-1]), track_cfg.get("sectors"))
+        out = {
+            "key": key,
+            "corners": [dict(c) for c in corners],
+            "sectors": [{"name": f"S{i + 1}", "start": float(bounds[i]), "end": float(bounds[i + 1])}
+                        for i in range(len(bounds) - 1)],
+            "complete": laps.complete.copy(),
+            "lap_times": laps.lap_times.copy(),
+            "corner": self._corner_table(laps, grid, ch, corners),
+            "sector": self._sector_table(laps, grid, ch, bounds),
+        }
+
+        if key is not None:
+            arrays = {"complete": out["complete"], "lap_times": out["lap_times"]}
+            arrays.update({f"corner.{m}": v for m, v in out["corner"].items()})
+            arrays.update({f"sector.{m}": v for m, v in out["sector"].items()})
+            try:
+                self.cache.save("corner_metrics", key, arrays,
+                                {"corners": out["corners"], "sectors": out["sectors"]})
+            except OSError as e:
+                print("[PerformanceAnalyzer] 코너 지표 캐시 저장 실패:", repr(e))
+        return out
+
+    def load_corner_metrics(self, key):
+        """캐시된 corner_metrics 결과 (없으면 None)."""
+        hit = self.cache.load("corner_metrics", key, mmap=True) if self.cache is not None else None
+        if hit is None:
+            return None
+        arrays, meta = hit
+        return {
+            "key": key,
+            "corners": meta["corners"],
+            "sectors": meta["sectors"],
+            "complete": arrays["complete"],
+            "lap_times": arrays["lap_times"],
+            "corner": {m: arrays[f"corner.{m}"] for m in CORNER_METRICS if f"corner.{m}" in arrays},
+            "sector": {m: arrays[f"sector.{m}"] for m in SECTOR_METRICS if f"sector.{m}" in arrays},
+        }
+
+    def _corner_table(self, laps, grid, ch, corners):
+        n = len(laps)
+        if not corners:
+            return {m: np.zeros((n, 0)) for m in CORNER_METRICS}
+
+        M = len(grid)
+        s_idx = np.clip(np.searchsorted(grid, [c["start"] for c in corners]), 0, M - 1)
+        a_idx = np.clip(np.searchsorted(grid, [c["apex"] for c in corners]), 0, M - 1)
+        e_idx = np.clip(np.searchsorted(grid, [c["end"] for c in corners], side="right"), s_idx + 1, M)
+
+        lap_t = ch["lap_time"]
+        nan = np.full((n, len(corners)), np.nan)
+        table = {"time": lap_t[:, e_idx - 1] - lap_t[:, s_idx]}
+
+        speed = ch.get("speed")
+        if speed is not None:
+            table["entry_speed"] = speed[:, s_idx]
+            table["apex_speed"] = speed[:, a_idx]
+            table["exit_speed"] = speed[:, e_idx - 1]
+            table["min_speed"] = _segment_reduce(np.fmin, speed, s_idx, e_idx, np.nan)
+
+        brake = ch.get("brake")
+        if brake is not None:
+            on = brake >= config.CORNER_DETECTION["brake_on"]
+            table["braking_point"] = _segment_first(on, grid, s_idx, e_idx)
+            dt = np.diff(lap_t, axis=1, append=np.nan)
+            table["brake_duration"] = _segment_reduce(
+                np.add, np.where(on & np.isfinite(dt), dt, 0.0), s_idx, e_idx, 0.0)
+
+        throttle = ch.get("throttle")
+        if throttle is not None:
+            # apex 이후 처음으로 스로틀을 다시 여는 지점
+            table["throttle_pickup"] = _segment_first(
+                throttle >= config.CORNER_DETECTION["throttle_on"], grid, a_idx, e_idx)
+
+        return {m: table.get(m, nan) for m in CORNER_METRICS}
+
+    def _sector_table(self, laps, grid, ch, bounds):
+        n = len(laps)
+        s_idx = np.searchsorted(grid, bounds[:-1])
+        e_idx = np.maximum(np.searchsorted(grid, bounds[1:]), s_idx + 1)
+        nan = np.full((n, len(s_idx)), np.nan)
+
+        # 섹터 시간은 경계 거리에서 바로 보간 (마지막 섹터 끝 = 랩 타임, 미완주면 NaN)
+        end_t = np.where(laps.complete, laps.lap_times, np.nan)
+        at = np.column_stack([np.zeros(n), laps.resample(laps.lap_time, bounds[1:-1]), end_t])
+        time = np.diff(at, axis=1)
+        table = {"time": time}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            table["avg_speed"] = np.diff(bounds)[None, :] / time * 3.6
+
+        speed = ch.get("speed")
+        if speed is not None:
+            table["min_speed"] = _segment_reduce(np.fmin, speed, s_idx, e_idx, np.nan)
+            table["max_speed"] = _segment_reduce(np.fmax, speed, s_idx, e_idx, np.nan)
+        if "throttle" in ch:
+            t = ch["throttle"]
+            table["full_throttle"] = _segment_mean(np.where(np.isnan(t), np.nan, t >= 98), s_idx, e_idx)
+        if "brake" in ch:
+            b = ch["brake"]
+            table["brake_usage"] = _segment_mean(np.where(np.isnan(b), np.nan, b > 0), s_idx, e_idx)
+
+        return {m: table.get(m, nan) for m in SECTOR_METRICS}
+
+    # --------------------------
+    # 랩 / 세션 집계
+    # --------------------------
+    @staticmethod
+    def aggregate_corners(tables, complete_only=True, match_m=None):
+        """
+        여러 세션 (또는 한 세션) 의 corner_metrics 결과를 코너/섹터별로 모아
+        랩 전체에 대한 mean / min / max / std + 랩 수.
+
+        코너는 이름이 아니라 apex 거리로 맞춘다: 자동 검출 코너 (T1..Tn) 는 세션마다
+        개수 / 번호가 달라질 수 있으므로, apex 가 match_m (기본 CORNER_DETECTION["match_m"])
+        안에 있는 코너끼리 같은 코너로 본다 (한 세션의 코너는 한 묶음에 하나만).
+        묶음의 구간 (start / apex / end) 은 세션들의 중앙값, 이름이 세션마다 다르면 apex 순 T1..Tk.
+        """
+        match_m = config.CORNER_DETECTION["match_m"] if match_m is None else match_m
+
+        def rows_of(t):
+            return np.asarray(t["complete"], dtype=bool) if complete_only \
+                else np.ones(len(t["lap_times"]), dtype=bool)
+
+        def summarize(seg, chunks_by_metric):
+            row = dict(seg)
+            laps_n = 0
+            for m, chunks in chunks_by_metric.items():
+                v = np.concatenate(chunks) if chunks else np.zeros(0)
+                v = v[np.isfinite(v)]
+                laps_n = max(laps_n, len(v))
+                row[m] = {
+                    "mean": _json_float(v.mean()) if len(v) else None,
+                    "min": _json_float(v.min()) if len(v) else None,
+                    "max": _json_float(v.max()) if len(v) else None,
+                    "std": _json_float(v.std()) if len(v) else None,
+                }
+            row["laps"] = laps_n
+            return row
+
+        # 섹터: 트랙 설정 / 랩 길이로 정해지므로 이름 (S1..) 으로
+        sectors = {}
+        for t in tables:
+            rows = rows_of(t)
+            for j, seg in enumerate(t["sectors"]):
+                per = sectors.setdefault(seg["name"], {"segment": seg, "metrics": {}})
+                for m, arr in t["sector"].items():
+                    per["metrics"].setdefault(m, []).append(np.asarray(arr)[rows, j])
+
+        # 코너: apex 순으로 훑으면서 match_m 안 + 아직 없는 세션이면 같은 묶음
+        found = sorted(((float(c["apex"]), ti, j) for ti, t in enumerate(tables)
+                        for j, c in enumerate(t["corners"])))
+        groups = []
+        for apex, ti, j in found:
+            g = groups[-1] if groups else None
+            if g is None or apex - g["apex"] > match_m or ti in g["tables"]:
+                g = {"apex": apex, "tables": set(), "members": []}
+                groups.append(g)
+            g["tables"].add(ti)
+            g["members"].append((ti, j))
+
+        # 묶음 안에서 이름이 갈리거나 같은 이름이 여러 묶음에 있으면 apex 순으로 새로 붙인다
+        names = [{tables[ti]["corners"][j]["name"] for ti, j in g["members"]} for g in groups]
+        rename = any(len(n) > 1 for n in names) or len({n for ns in names for n in ns}) < len(groups)
+        corners = []
+        for k, g in enumerate(groups):
+            members = [tables[ti]["corners"][j] for ti, j in g["members"]]
+            seg = {key: float(np.median([c[key] for c in members])) for key in ("start", "apex", "end")}
+            seg = dict({"name": f"T{k + 1}" if rename else members[0]["name"]}, **seg)
+            seg["sessions"] = len(g["tables"])
+            chunks = {}
+            for ti, j in g["members"]:
+                rows = rows_of(tables[ti])
+                for m, arr in tables[ti]["corner"].items():
+                    chunks.setdefault(m, []).append(np.asarray(arr)[rows, j])
+            corners.append(summarize(seg, chunks))
+
+        return {"corners": corners,
+                "sectors": [summarize(per["segment"], per["metrics"]) for per in sectors.values()]}
+
+    @staticmethod
+    def corner_rows(table, lap_index):
+        """랩 하나의 코너 지표 (JSON 용)."""
+        return [
+            dict(name=c["name"], **{m: _json_float(v[lap_index, j]) for m, v in table["corner"].items()})
+            for j, c in enumerate(table["corners"])
+        ]
@@ -0,0 +1,365 @@
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import config
+
+
+# 스키마가 바뀌면 올림 (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    upload_id     TEXT PRIMARY KEY,
+    status        TEXT NOT NULL,          -- uploading | uploaded | analyzing | analyzed | failed
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    last_used_at  REAL NOT NULL,
+    track         TEXT,
+    video_name    TEXT,
+    video_path    TEXT,
+    video_size    INTEGER,
+    video_hash    TEXT,
+    tel_name      TEXT,
+    tel_path      TEXT,
+    tel_size      INTEGER,
+    tel_hash      TEXT,
+    duration_sec  REAL,
+    frames        INTEGER,
+    fps           REAL,
+    tel_rows      INTEGER,
+    output_path   TEXT,
+    output_size   INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_track ON sessions (track, created_at);
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created_at);
+CREATE INDEX IF NOT EXISTS sessions_used ON sessions (last_used_at);
+CREATE INDEX IF NOT EXISTS sessions_video_hash ON sessions (video_hash);
+CREATE INDEX IF NOT EXISTS sessions_tel_hash ON sessions (tel_hash);
+
+-- 세션에서 만들어진 캐시 artifact (ArtifactCache namespace/key).
+-- 같은 파일을 다시 올린 세션끼리는 같은 artifact 를 공유한다.
+CREATE TABLE IF NOT EXISTS artifacts (
+    upload_id  TEXT NOT NULL REFERENCES sessions (upload_id) ON DELETE CASCADE,
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    path       TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (upload_id, namespace, key)
+);
+CREATE INDEX IF NOT EXISTS artifacts_key ON artifacts (namespace, key);
+"""
+
+# 세션 목록 필터로 쓸 수 있는 컬럼
+FILTERS = ("status", "track", "video_hash", "tel_hash")
+
+# 분석 중인 세션은 정리 대상에서 제외
+_BUSY = ("uploading", "analyzing")
+
+_FILE_FIELDS = {
+    "video": ("video_name", "video_path", "video_size", "video_hash"),
+    "telemetry": ("tel_name", "tel_path", "tel_size", "tel_hash"),
+}
+
+
+def _dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+
+def _remove(path):
+    if not path:
+        return
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class SessionStore:
+    """
+    업로드 세션 메타데이터 인덱스 (SQLite, 파일 하나).
+
+    - upload_id → 파일 경로 / sha256 / 크기 : primary key 조회 (uploads 디렉터리 스캔 없음)
+    - 분석 때 채우는 값 : track, 영상 길이/프레임 수/fps, 텔레메트리 행 수, 출력 영상,
+                          세션에서 만들어진 캐시 artifact (트래킹/텔레메트리 ...)
+    - list()  : track / status / 해시 / 기간 필터 + 페이지
+    - evict() : 오래 방치된 미완료 업로드 삭제 + 디스크 quota 를 넘으면
+                오래 안 쓴 세션부터 업로드/출력/(다른 세션이 안 쓰는) artifact 삭제
+
+    연결은 스레드마다 하나 (WAL 모드라 gunicorn 워커 프로세스끼리도 같이 쓸 수 있음).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.SESSION_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._init_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    # --------------------------
+    # 기록
+    # --------------------------
+    def create(self, upload_id, files, status="uploading"):
+        """
+        files : {kind: {"name", "size", 선택 "path", "sha256"}} (kind = video | telemetry)
+        이미 있으면 파일 정보만 갱신.
+        """
+        now = time.time()
+        values = {"upload_id": upload_id, "status": status,
+                  "created_at": now, "updated_at": now, "last_used_at": now}
+        for kind, info in files.items():
+            name_f, path_f, size_f, hash_f = _FILE_FIELDS[kind]
+            values[name_f] = info.get("name")
+            values[path_f] = info.get("path")
+            values[size_f] = info.get("size")
+            values[hash_f] = info.get("sha256")
+
+        cols = ", ".join(values)
+        marks = ", ".join("?" * len(values))
+        update = ", ".join(f"{c}=excluded.{c}" for c in values if c not in ("upload_id", "created_at"))
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"INSERT INTO sessions ({cols}) VALUES ({marks}) "
+                f"ON CONFLICT (upload_id) DO UPDATE SET {update}",
+                list(values.values()),
+            )
+
+    def set_file(self, upload_id, kind, path, sha256, size=None):
+        """업로드가 끝난 파일 기록. 두 파일이 다 들어오면 status = uploaded."""
+        _, path_f, size_f, hash_f = _FILE_FIELDS[kind]
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"UPDATE sessions SET {path_f}=?, {hash_f}=?, {size_f}=COALESCE(?, {size_f}), "
+                "updated_at=? WHERE upload_id=?",
+                (path, sha256, size, time.time(), upload_id),
+            )
+            conn.execute(
+                "UPDATE sessions SET status='uploaded' WHERE upload_id=? AND status='uploading' "
+                "AND video_hash IS NOT NULL AND tel_hash IS NOT NULL",
+                (upload_id,),
+            )
+
+    def update(self, upload_id, **fields):
+        """분석 중 알게 된 값 (track, duration_sec, frames, fps, tel_rows, output_path, status ...)."""
+        if not fields:
+            return
+        now = time.time()
+        fields = dict(fields, updated_at=now, last_used_at=now)
+        sets = ", ".join(f"{k}=?" for k in fields)
+        conn = self._conn()
+        with conn:
+            conn.execute(f"UPDATE sessions SET {sets} WHERE upload_id=?",
+                         list(fields.values()) + [upload_id])
+
+    def touch(self, upload_id):
+        """청크가 들어올 때마다 updated_at 갱신 (진행 중인 업로드가 stale 로 정리되지 않게)."""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE sessions SET updated_at=?, last_used_at=? WHERE upload_id=?",
+                         (now, now, upload_id))
+
+    def reset_interrupted(self):
+        """
+        서버 시작 시 호출: 이전 프로세스가 분석 도중 죽어서 'analyzing' 으로 남은 세션을 'failed' 로.
+        (작업 큐는 프로세스 메모리에 있으므로 재시작 후에는 끝날 수 없는 상태)
+        반환: 바꾼 세션 수
+        """
+        conn = self._conn()
+        with conn:
+            n = conn.execute("UPDATE sessions SET status='failed', updated_at=? WHERE status='analyzing'",
+                             (time.time(),)).rowcount
+        if n:
+            print(f"[SessionStore] 중단된 분석 {n}개 → failed")
+        return n
+
+    def add_artifact(self, upload_id, namespace, key, path):
+        """세션에서 만들어진 캐시 artifact 등록 (디스크에 없으면 무시)."""
+        if key is None or not os.path.exists(path):
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (upload_id, namespace, key, path, size, created_at) "
+                "SELECT ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM sessions WHERE upload_id=?)",
+                (upload_id, namespace, key, path, _dir_size(path), time.time(), upload_id),
+            )
+
+    # --------------------------
+    # 조회
+    # --------------------------
+    def get(self, upload_id):
+        row = self._conn().execute(
+            "SELECT * FROM sessions WHERE upload_id=?", (upload_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session["artifacts"] = [
+            dict(r) for r in self._conn().execute(
+                "SELECT namespace, key, path, size FROM artifacts WHERE upload_id=?", (upload_id,)
+            )
+        ]
+        return session
+
+    def list(self, since=None, until=None, limit=50, offset=0, **filters):
+        """
+        filters : FILTERS 중 컬럼=값 (예: track="spa", status="analyzed")
+        since / until : created_at 범위 (unix time)
+        반환: (세션 목록 최신순, 전체 개수)
+        """
+        where, args = [], []
+        for k, v in filters.items():
+            if k not in FILTERS:
+                raise ValueError(f"지원하지 않는 필터: {k} (사용 가능: {list(FILTERS)})")
+            if v is not None:
+                where.append(f"{k}=?")
+                args.append(v)
+        if since is not None:
+            where.append("created_at>=?")
+            args.append(float(since))
+        if until is not None:
+            where.append("created_at<?")
+            args.append(float(until))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM sessions {clause}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM sessions {clause} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            args + [int(limit), int(offset)],
+        ).fetchall()
+        return [dict(r) for r in rows], total
+
+    def find_artifacts(self, namespace, track=None, since=None, until=None, limit=100):
+        """
+        분석 완료된 세션들의 namespace artifact (세션 간 집계용, 최신 세션 순).
+        반환: [{"upload_id", "key", "path", "created_at"} ...]
+        """
+        where, args = ["a.namespace=?", "s.status='analyzed'"], [namespace]
+        if track is not None:
+            where.append("s.track=?")
+            args.append(track)
+        if since is not None:
+            where.append("s.created_at>=?")
+            args.append(float(since))
+        if until is not None:
+            where.append("s.created_at<?")
+            args.append(float(until))
+        rows = self._conn().execute(
+            "SELECT a.upload_id, a.key, a.path, s.created_at FROM artifacts a "
+            f"JOIN sessions s ON s.upload_id=a.upload_id WHERE {' AND '.join(where)} "
+            "ORDER BY s.created_at DESC LIMIT ?",
+            args + [int(limit)],
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def disk_usage(self):
+        """인덱스에 기록된 업로드 + 출력 + artifact 바이트 (공유 artifact 는 한 번만)."""
+        conn = self._conn()
+        files = conn.execute(
+            "SELECT COALESCE(SUM(COALESCE(video_size, 0) + COALESCE(tel_size, 0) "
+            "+ COALESCE(output_size, 0)), 0) FROM sessions"
+        ).fetchone()[0]
+        artifacts = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM artifacts "
+            "GROUP BY namespace, key)"
+        ).fetchone()[0]
+        return int(files + artifacts)
+
+    # --------------------------
+    # 정리
+    # --------------------------
+    def delete(self, upload_id, remove_files=True):
+        """세션 삭제. 다른 세션이 같이 쓰는 artifact 는 남긴다."""
+        session = self.get(upload_id)
+        if session is None:
+            return False
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE upload_id=?", (upload_id,))
+        if remove_files:
+            for p in (session["video_path"], session["tel_path"], session["output_path"]):
+                _remove(p)
+            for a in session["artifacts"]:
+                shared = conn.execute(
+                    "SELECT 1 FROM artifacts WHERE namespace=? AND key=? LIMIT 1",
+                    (a["namespace"], a["key"]),
+                ).fetchone()
+                if shared is None:
+                    _remove(a["path"])
+        return True
+
+    def evict(self, quota_bytes=None, stale_sec=None, protect=()):
+        """
+        1) stale_sec 보다 오래된 미완료 업로드 삭제
+        2) quota_bytes 를 넘으면 last_used_at 이 오래된 세션부터 삭제
+        protect : 지우면 안 되는 upload_id (지금 분석 중인 세션 등)
+        반환: 삭제한 upload_id 목록
+        """
+        quota_bytes = config.DISK_QUOTA_BYTES if quota_bytes is None else quota_bytes
+        stale_sec = config.UPLOAD_STALE_SEC if stale_sec is None else stale_sec
+        conn = self._conn()
+        evicted = []
+
+        if stale_sec:
+            rows = conn.execute(
+                "SELECT upload_id FROM sessions WHERE status='uploading' AND updated_at<?",
+                (time.time() - stale_sec,),
+            ).fetchall()
+            for (upload_id,) in rows:
+                if upload_id not in protect and self.delete(upload_id):
+                    evicted.append(upload_id)
+
+        if quota_bytes:
+            usage = self.disk_usage()
+            if usage > quota_bytes:
+                rows = conn.execute(
+                    "SELECT upload_id FROM sessions WHERE status NOT IN (?, ?) "
+                    "ORDER BY last_used_at ASC",
+                    _BUSY,
+                ).fetchall()
+                for (upload_id,) in rows:
+                    if usage <= quota_bytes:
+                        break
+                    if upload_id in protect or not self.delete(upload_id):
+                        continue
+                    evicted.append(upload_id)
+                    usage = self.disk_usage()
+
+        if evicted:
+            print(f"[SessionStore] 세션 {len(evicted)}개 정리 (사용량 {self.disk_usage() / 1e9:.2f} GB)")
+        return evicted
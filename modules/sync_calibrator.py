@@ -1,24 +1,56 @@
 import numpy as np
-import scipy.signal as signal
+
+import config
+from modules.frame_track import FrameTrack
+
+
+def fft_correlate(a, v):
+    """
+    scipy.signal.correlate(a, v, mode="full", method="fft") 와 같은 결과.
+    scipy.signal 은 import 만 ~1초 걸려서 (서버 기동 시간) scipy.fft 로 직접 계산.
+    scipy.fft 도 ~0.2초라 처음 쓸 때 import.
+    """
+    from scipy import fft
+
+    a = np.asarray(a, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    n = len(a) + len(v) - 1
+    nfft = fft.next_fast_len(n, real=True)
+    out = fft.irfft(fft.rfft(a, nfft) * fft.rfft(v[::-1], nfft), nfft)
+    return out[:n]
+
+
+def monotonic_time(tel_time):
+    """
+    텔레 time 컬럼을 단조 증가 시간축으로 정리.
+    빈 칸(NaN)은 앞 값으로 채우고 (np.maximum 은 NaN 을 끝까지 끌고 가므로 fmax),
+    맨 앞의 빈 칸은 첫 유효 값으로 채운다. 유효 값이 하나도 없으면 NaN 그대로.
+    """
+    t = np.fmax.accumulate(np.asarray(tel_time, dtype=np.float64))
+    finite = np.isfinite(t)
+    if finite.any() and not finite[0]:
+        first = int(np.argmax(finite))
+        t[:first] = t[first]
+    return t
 
 
 class SyncCalibrator:
 
     def compute_yolo_speed(self, car_pos):
-        """프레임별 bbox 중심 이동량으로 대략적인 속도 시퀀스 생성."""
-        speed = []
-        prev = None
-
-        for p in car_pos:
-            if prev is None or p is None:
-                speed.append(0.0)
-                prev = p
-                continue
-            px = np.linalg.norm(np.array(p) - np.array(prev))
-            speed.append(float(px))
-            prev = p
+        """
+        프레임별 bbox 중심 이동량으로 대략적인 속도 시퀀스 생성.
+        이전/현재 프레임 중 하나라도 검출이 없으면 0.
+        """
+        track = FrameTrack.coerce(car_pos)
+        speed = np.zeros(len(track), dtype=float)
+        if len(track) < 2:
+            return speed
 
-        return np.array(speed, dtype=float)
+        pos = track.values.astype(np.float64)
+        both = track.valid[1:] & track.valid[:-1]
+        step = np.linalg.norm(np.diff(pos, axis=0), axis=1)
+        speed[1:] = np.where(both, step, 0.0)
+        return speed
 
     def normalize(self, x):
         x = np.array(x, dtype=float)
@@ -27,7 +59,7 @@ class SyncCalibrator:
         return (x - x.mean()) / (x.std() + 1e-6)
 
     def auto_sync_speed(self, yolo_speed, tel_speed):
-        """YOLO 속도 시퀀스와 텔레 속도의 cross-correlation으로 offset 찾기."""
+        """YOLO 속도 시퀀스와 텔레 속도의 cross-correlation으로 offset 찾기 (샘플 단위)."""
         if len(yolo_speed) == 0 or len(tel_speed) == 0:
             print("[SYNC] 빈 속도 시퀀스 → offset=0 사용")
             return 0
@@ -35,21 +67,182 @@ class SyncCalibrator:
         y = self.normalize(yolo_speed)
         t = self.normalize(tel_speed)
 
-        corr = signal.correlate(t, y, mode="full")
+        corr = fft_correlate(t, y)
         shift = int(np.argmax(corr) - (len(y) - 1))
 
         print(f"[SYNC] offset = {shift}")
         return shift
 
-    def generate_frame_map(self, n_video, n_tel, offset):
+    # ==========================================================
+    # 시간 기반 sync (영상 fps + 텔레메트리 time 컬럼)
+    # ==========================================================
+    def _resample(self, values, times, rate, t0=None, t1=None):
+        """(times, values) 를 rate Hz 등간격 격자로 선형 보간. 반환: (신호, 시작 시각)."""
+        t0 = times[0] if t0 is None else t0
+        t1 = times[-1] if t1 is None else t1
+        n = max(int(np.floor((t1 - t0) * rate)) + 1, 1)
+        grid = t0 + np.arange(n) / rate
+        return np.interp(grid, times, values), t0
+
+    def _best_lag(self, v, v_t0, s, s_t0, rate, tau_lo, tau_hi, min_overlap=0.5):
         """
-        frame i  -> telemetry index (또는 None)
+        v(t) 와 s(t + tau) 가 가장 잘 맞는 tau (초) 를 [tau_lo, tau_hi] 안에서 찾는다.
+        v, s 는 rate Hz 등간격 신호이고 각각 v_t0, s_t0 에서 시작.
+        FFT 상관 후 겹치는 샘플 수로 나눠 Pearson 과 비슷한 점수로 만들고,
+        최대점 주변은 포물선 보간으로 sub-sample 정밀도까지 올린다.
+        반환: (tau, score) 또는 (None, 0.0)
         """
-        frame_map = []
-        for i in range(n_video):
-            idx = i + offset
-            if 0 <= idx < n_tel:
-                frame_map.append(idx)
-            else:
-                frame_map.append(None)
-        return frame_map
+        # 필요한 텔레 구간만 잘라서 상관 계산
+        j0 = max(0, int(np.floor((v_t0 + tau_lo - s_t0) * rate)) - 1)
+        j1 = min(len(s), int(np.ceil((v_t0 + tau_hi - s_t0) * rate)) + len(v) + 1)
+        if j1 - j0 < 2 or len(v) < 2:
+            return None, 0.0
+        seg = self.normalize(s[j0:j1])
+        vn = self.normalize(v)
+        seg_t0 = s_t0 + j0 / rate
+
+        corr = fft_correlate(seg, vn)
+        lags = np.arange(len(corr)) - (len(vn) - 1)
+        overlap = np.minimum(len(seg), lags + len(vn)) - np.maximum(0, lags)
+        tau = seg_t0 - v_t0 + lags / rate
+
+        ok = (tau >= tau_lo) & (tau <= tau_hi) & (overlap >= max(2, min_overlap * len(vn)))
+        if not ok.any():
+            return None, 0.0
+
+        score = np.where(ok, corr / np.maximum(overlap, 1), -np.inf)
+        k = int(np.argmax(score))
+
+        # 포물선 보간
+        delta = 0.0
+        if 0 < k < len(score) - 1 and np.isfinite(score[k - 1]) and np.isfinite(score[k + 1]):
+            a, b, c = score[k - 1], score[k], score[k + 1]
+            denom = a - 2 * b + c
+            if abs(denom) > 1e-12:
+                delta = float(np.clip(0.5 * (a - c) / denom, -0.5, 0.5))
+
+        return float(tau[k] + delta / rate), float(score[k])
+
+    def auto_sync_time(self, yolo_speed, fps, tel_speed, tel_time,
+                       max_lag_sec=None, coarse_rate=None, fine_rate=None):
+        """
+        영상/텔레 속도를 공통 시간축으로 resample 한 뒤 offset 과 clock drift 를 추정.
+
+        1) coarse_rate Hz 로 전체 허용 lag 범위(max_lag_sec)에서 FFT 상관 → tau0
+        2) fine_rate Hz 로 tau0 주변만 다시 상관 → 정밀 offset
+        3) 영상을 구간(window)으로 나눠 구간별 offset 을 구하고
+           piecewise linear time warp 로 맞춤 (장시간 stint 의 drift 보정)
+
+        반환 dict:
+            offset_sec   : 전체 offset (영상 t 초 ↔ 텔레 time t + offset)
+            knots_t      : warp 기준 영상 시각 (초)
+            knots_offset : 각 knot 의 offset (초)
+            score        : 상관 점수 (0~1 근처)
+        """
+        max_lag_sec = config.SYNC_MAX_LAG_SEC if max_lag_sec is None else max_lag_sec
+        coarse_rate = coarse_rate or config.SYNC_COARSE_RATE
+        fine_rate = fine_rate or config.SYNC_FINE_RATE
+
+        yolo_speed = np.asarray(yolo_speed, dtype=np.float64)
+        tel_speed = np.nan_to_num(np.asarray(tel_speed, dtype=np.float64))
+        tel_time = monotonic_time(tel_time)
+
+        result = {"offset_sec": 0.0, "knots_t": [], "knots_offset": [], "score": 0.0}
+        if len(yolo_speed) < 2 or len(tel_speed) < 2 or not fps:
+            print("[SYNC] 빈 속도 시퀀스 → offset=0 사용")
+            return result
+        if not np.isfinite(tel_time).all():
+            print("[SYNC] 텔레 time 값이 없음 → offset=0 사용")
+            return result
+
+        video_t = np.arange(len(yolo_speed)) / fps
+        duration = video_t[-1]
+
+        # 허용 lag 범위: 기본은 영상이 텔레 구간 안에 들어가는 모든 위치 ± 여유
+        tau_lo = tel_time[0] - duration
+        tau_hi = tel_time[-1]
+        if max_lag_sec:
+            tau_lo = max(tau_lo, tel_time[0] - max_lag_sec)
+            tau_hi = min(tau_hi, tel_time[0] + max_lag_sec)
+
+        # --------------------------
+        # 1) coarse
+        # --------------------------
+        v_c, _ = self._resample(yolo_speed, video_t, coarse_rate)
+        s_c, s_t0 = self._resample(tel_speed, tel_time, coarse_rate)
+        tau0, score = self._best_lag(v_c, 0.0, s_c, s_t0, coarse_rate, tau_lo, tau_hi)
+        if tau0 is None:
+            print("[SYNC] 겹치는 구간 없음 → offset=0 사용")
+            return result
+
+        # --------------------------
+        # 2) fine (tau0 ± coarse 2샘플)
+        # --------------------------
+        v_f, _ = self._resample(yolo_speed, video_t, fine_rate)
+        s_f, s_t0 = self._resample(tel_speed, tel_time, fine_rate)
+        margin = 2.0 / coarse_rate
+        tau1, score1 = self._best_lag(v_f, 0.0, s_f, s_t0, fine_rate, tau0 - margin, tau0 + margin)
+        if tau1 is not None:
+            tau0, score = tau1, score1
+
+        result.update(offset_sec=tau0, score=score)
+
+        # --------------------------
+        # 3) 구간별 offset → piecewise time warp
+        # --------------------------
+        win = config.SYNC_DRIFT_WINDOW_SEC
+        max_drift = config.SYNC_MAX_DRIFT_SEC
+        knots_t, knots_off = [], []
+        if duration >= 2 * win:
+            n_win = int(round(win * fine_rate))
+            hop = max(1, n_win // 2)
+            for i0 in range(0, len(v_f) - n_win + 1, hop):
+                tau_w, score_w = self._best_lag(
+                    v_f[i0:i0 + n_win], i0 / fine_rate, s_f, s_t0, fine_rate,
+                    tau0 - max_drift, tau0 + max_drift, min_overlap=0.9
+                )
+                if tau_w is not None and score_w >= config.SYNC_MIN_WINDOW_SCORE:
+                    knots_t.append((i0 + n_win / 2) / fine_rate)
+                    knots_off.append(tau_w)
+
+        if len(knots_t) >= 2:
+            # 튀는 구간 하나에 끌려가지 않도록 3-point median
+            off = np.asarray(knots_off)
+            if len(off) >= 3:
+                off = np.concatenate([[off[0]], np.median(np.stack([off[:-2], off[1:-1], off[2:]]), axis=0), [off[-1]]])
+            result["knots_t"] = [float(t) for t in knots_t]
+            result["knots_offset"] = [float(o) for o in off]
+            drift = off[-1] - off[0]
+            print(f"[SYNC] offset = {tau0:.3f}s, drift = {drift:+.3f}s ({len(knots_t)} 구간)")
+        else:
+            print(f"[SYNC] offset = {tau0:.3f}s")
+
+        return result
+
+    def frame_offsets(self, n_video, fps, sync):
+        """프레임별 offset(초). warp knot 이 없으면 상수 offset."""
+        t = np.arange(n_video) / fps
+        if len(sync.get("knots_t", [])) >= 2:
+            return t, np.interp(t, sync["knots_t"], sync["knots_offset"])
+        return t, np.full(n_video, sync.get("offset_sec", 0.0))
+
+    def generate_frame_map(self, n_video, n_tel, offset=0, fps=None, tel_time=None, sync=None):
+        """
+        frame i  -> telemetry index (또는 None), FrameTrack (N, 1) float64
+
+        sync(auto_sync_time 결과) + fps + tel_time 이 있으면 시간 기준으로
+        소수점 텔레 인덱스(두 샘플 사이 보간 위치)를 돌려준다.
+        없으면 기존처럼 정수 offset 으로 매핑.
+        """
+        if sync is not None and fps and tel_time is not None:
+            tel_time = monotonic_time(tel_time)
+            if len(tel_time) == 0 or not np.isfinite(tel_time).all():
+                return FrameTrack(np.zeros(n_video), np.zeros(n_video, dtype=bool))
+            t, off = self.frame_offsets(n_video, fps, sync)
+            t_tel = t + off
+            frac = np.interp(t_tel, tel_time, np.arange(len(tel_time), dtype=np.float64))
+            valid = (t_tel >= tel_time[0]) & (t_tel <= tel_time[-1])
+            return FrameTrack(frac, valid)
+
+        idx = np.arange(n_video, dtype=np.float64) + offset
+        return FrameTrack(idx, (idx >= 0) & (idx < n_tel))
@@ -1,9 +1,261 @@
+import csv
+import numpy as np
 import pandas as pd
 from io import StringIO
 
+import config
+from modules.artifact_cache import ArtifactCache, file_sha256
+from modules.event_detector import EVENT_COLUMNS
+from modules.lap_segmenter import LAP_COLUMNS
+
+try:
+    import pyarrow  # noqa: F401
+    _FAST_ENGINE = "pyarrow"
+except ImportError:
+    _FAST_ENGINE = "c"
+
+
+# 파싱 결과 형식이 바뀌면 올려서 기존 텔레메트리 캐시를 무효화
+PARSER_VERSION = 2
+
+# 분석 파이프라인이 실제로 쓰는 컬럼 (parse_file(columns=...) projection 용)
+# 랩 / 이벤트 컬럼은 파일에 있는 것만 읽힌다 (없으면 distance 로 랩 분할, 해당 이벤트 생략)
+PIPELINE_COLUMNS = ("time", "speed", "roty", "distance", "throttle", "brake") + LAP_COLUMNS + EVENT_COLUMNS
+
+# 헤더를 찾기 위해 앞에서부터 읽어보는 최대 줄 수
+HEAD_SCAN_LINES = 200
+
+# 누적값이라 float32 로는 정밀도가 부족한 컬럼 (24h 세션이면 time ulp ≈ 8ms)
+_FLOAT64_COLUMNS = ("time", "distance")
+
+
+def _channel_dtypes(columns):
+    """컬럼별 dtype: time / distance 는 float64, 나머지 채널은 float32 (fast / 기존 경로 공통)."""
+    return {n: (np.float64 if n in _FLOAT64_COLUMNS else np.float32) for n in columns}
+
+
+def _normalize_name(name):
+    return name.replace('"', "").strip().lower()
+
+
+def _mmap_frame(arrays, columns):
+    """
+    캐시 memmap 컬럼들 → DataFrame (복사 없이).
+
+    값은 읽기 전용 캐시 파일을 그대로 가리킨다. 호출자는 반환된 DataFrame 을 in-place 로
+    고치지 않는다 (pandas Copy-on-Write 면 고친 컬럼만 복사되고, CoW 가 꺼진 pandas 에서는
+    ValueError). 고쳐야 하면 df.copy() 후 수정한다.
+    pandas 가 block 을 합치면서 복사했으면 (zero-copy 보장 안 됨) 로그로 알린다.
+    """
+    df = pd.DataFrame({c: arrays[c] for c in columns}, copy=False)
+    copied = [c for c in columns if not np.shares_memory(df[c].to_numpy(), arrays[c])]
+    if copied:
+        print("[TelemetryParser] 캐시 컬럼이 복사되었습니다 (zero-copy 아님):", copied)
+    return df
+
+
+def _is_unit_row(cells):
+    """첫 데이터 행이 숫자로 이루어져 있지 않으면 → unit row."""
+    non_numeric = pd.to_numeric(pd.Series(cells), errors="coerce").isna().sum()
+    return non_numeric > 3
+
+
+def flatten_columns(df):
+    """
+    같은 이름 컬럼이 여러 개면 (df[col] 이 2D) 첫 번째만 남긴다.
+    컬럼마다 새 DataFrame 에 다시 넣는 대신 중복 mask 한 번으로 처리.
+    """
+    dup = df.columns.duplicated()
+    if dup.any():
+        print(f"[TelemetryParser] 경고: 2D 컬럼 → flatten: {sorted(set(df.columns[dup]))}")
+        df = df.loc[:, ~dup]
+    return df
+
+
+# export 에서 값이 빠진 셀로 나오는 토큰들 (→ NaN)
+_BLANK_CELLS = ("", " ", "-", "--", "NA", "N/A", "n/a", "nan", "NaN")
+
+
+def to_numeric_frame(df):
+    """
+    전체 프레임을 한 번에 float 로 변환.
+    빈 칸 / '-' 같은 값이 섞여 있으면 해당 셀만 NaN 으로 바꾼 뒤 다시 한 번에 변환하고,
+    그래도 안 되는 값이 있으면 모든 셀을 1차원으로 펴서 pd.to_numeric 한 번으로 coerce 한다.
+    (컬럼마다 따로 coerce 하지 않는다)
+    """
+    try:
+        values = df.to_numpy(dtype=np.float64)
+    except (ValueError, TypeError):
+        cells = df.to_numpy(dtype=object)
+        blank = pd.DataFrame(cells).isin(_BLANK_CELLS).to_numpy()
+        try:
+            values = np.where(blank, np.nan, cells).astype(np.float64)
+        except (ValueError, TypeError):
+            values = pd.to_numeric(pd.Series(cells.ravel()), errors="coerce")
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan).reshape(cells.shape)
+    return pd.DataFrame(values, columns=df.columns, index=df.index)
+
+
+def outlap_start(dist, min_step=0.5):
+    """distance 가 처음으로 min_step 보다 크게 증가하는 행 (없으면 None)."""
+    dist = np.asarray(dist, dtype=np.float64)
+    if len(dist) < 2:
+        return None
+    moving = np.diff(dist) > min_step
+    if not moving.any():
+        return None
+    return int(np.argmax(moving)) + 1
+
+
 class TelemetryParser:
 
-    def parse_file(self, file_path):
+    def __init__(self, cache_dir=None):
+        if cache_dir is None and config.TELEMETRY_CACHE_ENABLED:
+            cache_dir = config.CACHE_DIR
+        self.cache = ArtifactCache(cache_dir) if cache_dir else None
+
+    def parse_file(self, file_path, columns=None, fast=True, file_hash=None):
+        """
+        columns   : 선택, 이 컬럼들만 읽음 (소문자 이름, 예: PIPELINE_COLUMNS)
+        fast      : 헤더만 스캔한 뒤 파일 offset 부터 C/pyarrow 엔진으로 바로 읽는 경로.
+                    형식이 예상과 다르면 기존 경로로 fallback.
+        file_hash : 선택, 업로드 시 이미 계산한 CSV sha256 (없으면 여기서 계산)
+
+        정리된 DataFrame 은 CSV 내용 해시 + PARSER_VERSION 으로 컬럼별 .npy 로 캐시되고,
+        다음 호출부터는 memory-map 으로 복사 없이 읽는다 (읽기 전용, _mmap_frame 참고).
+        캐시 키는 df.attrs["cache_key"].
+        """
+        cache_key = None
+        if self.cache is not None:
+            if file_hash is None:
+                file_hash = file_sha256(file_path)
+            cache_key = ArtifactCache.make_key(
+                "telemetry", PARSER_VERSION, file_hash,
+                sorted(columns) if columns is not None else None,
+            )
+            hit = self.cache.load("telemetry", cache_key, mmap=True)
+            if hit is not None:
+                arrays, meta = hit
+                df = _mmap_frame(arrays, meta["columns"])
+                df.attrs["cache_key"] = cache_key
+                print("[TelemetryParser] 캐시 사용, shape =", df.shape)
+                return df
+
+        df = self._parse(file_path, columns, fast)
+
+        if cache_key is not None:
+            try:
+                self.cache.save(
+                    "telemetry", cache_key,
+                    {c: df[c].to_numpy() for c in df.columns},
+                    {"columns": list(df.columns), "rows": len(df)},
+                )
+            except OSError as e:
+                print("[TelemetryParser] 캐시 저장 실패:", repr(e))
+            df.attrs["cache_key"] = cache_key
+
+        return df
+
+    def _parse(self, file_path, columns, fast):
+        if fast:
+            try:
+                df = self._parse_fast(file_path, columns)
+            except (ValueError, TypeError, UnicodeDecodeError, csv.Error) as e:
+                print("[TelemetryParser] fast path 실패 → 기존 파서 사용:", repr(e))
+            else:
+                df = self._trim_outlap(df)
+                print("[TelemetryParser] 최종 shape =", df.shape)
+                return df
+
+        df = self._parse_legacy(file_path)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        df = df.astype(_channel_dtypes(df.columns))
+        df = self._trim_outlap(df)
+        print("[TelemetryParser] 최종 shape =", df.shape)
+        return df
+
+    # ==========================================================
+    # Fast path
+    # ==========================================================
+    def _scan_head(self, file_path):
+        """
+        파일 앞부분만 읽어서 "Time" 헤더 / unit row 위치를 찾는다.
+        반환: (컬럼 이름 list, 데이터 시작 byte offset)
+        """
+        with open(file_path, "rb") as f:
+            offset = 0
+            header = None
+            for i in range(HEAD_SCAN_LINES):
+                raw = f.readline()
+                if not raw:
+                    break
+                offset += len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+
+                if header is None:
+                    if line.startswith('"Time"') or line.startswith("Time"):
+                        header = next(csv.reader([line]))
+                        print("[TelemetryParser] 진짜 헤더 라인 =", i)
+                        data_offset = offset
+                    continue
+
+                if not line:
+                    data_offset = offset
+                    continue
+
+                # 헤더 다음 첫 비어있지 않은 행: unit row 면 건너뜀
+                if _is_unit_row(next(csv.reader([line]))):
+                    print("[TelemetryParser] unit row 제거 완료")
+                    data_offset = offset
+                break
+
+        if header is None:
+            raise ValueError("Telemetry header not found")
+
+        return header, data_offset
+
+    def _parse_fast(self, file_path, columns=None):
+        header, data_offset = self._scan_head(file_path)
+
+        # 컬럼명 정리 + 이름 없는 컬럼 제외 + 중복은 첫 번째만 사용
+        names, seen = [], set()
+        for i, name in enumerate(header):
+            n = _normalize_name(name)
+            if not n or n in seen:
+                n = f"unnamed_{i}"
+            seen.add(n)
+            names.append(n)
+
+        wanted = [n for n in names if not n.startswith("unnamed_")]
+        if columns is not None:
+            wanted = [n for n in wanted if n in columns]
+
+        dtype = _channel_dtypes(wanted)
+
+        with open(file_path, "rb") as f:
+            f.seek(data_offset)
+            try:
+                df = pd.read_csv(
+                    f,
+                    header=None,
+                    names=names,
+                    usecols=wanted,
+                    dtype=dtype,
+                    engine=_FAST_ENGINE,
+                )
+            except ValueError:
+                # 숫자가 아닌 셀 ('-', 공백 등) 이 섞인 파일: dtype 없이 다시 읽고 한 번에 coerce
+                f.seek(data_offset)
+                df = pd.read_csv(f, header=None, names=names, usecols=wanted, engine=_FAST_ENGINE)
+                df = to_numeric_frame(df[wanted]).astype(dtype)
+
+        return df[wanted]
+
+    # ==========================================================
+    # 기존 경로 (형식이 특이한 파일용)
+    # ==========================================================
+    def _parse_legacy(self, file_path):
 
         # ================================
         # 1) Raw 읽기
@@ -64,38 +316,24 @@ class TelemetryParser:
         # ================================
         # 7) 2D 컬럼 flatten (핵심)
         # ================================
-        fixed = pd.DataFrame()
-        for col in df.columns:
-            s = df[col]
-            if isinstance(s, pd.DataFrame):
-                print(f"[TelemetryParser] 경고: 2D 컬럼 → flatten: {col}")
-                s = s.iloc[:, 0]
-
-            fixed[col] = s
-
-        df = fixed
+        df = flatten_columns(df)
 
         # ================================
         # 8) 모든 컬럼 숫자 변환
         # ================================
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df = to_numeric_frame(df)
+
+        return df
 
+    def _trim_outlap(self, df):
         # ================================
         # 9) Outlap 제거 (distance 증가 시작점)
         # ================================
         if "distance" in df.columns:
-            dist = df["distance"].fillna(0).values
-
-            start_idx = None
-            for i in range(1, len(dist)):
-                if dist[i] > dist[i - 1] + 0.5:
-                    start_idx = i
-                    break
+            start_idx = outlap_start(df["distance"].fillna(0).to_numpy())
 
             if start_idx:
                 print(f"[TelemetryParser] outlap 제거 → {start_idx} 행부터 시작")
                 df = df.iloc[start_idx:].reset_index(drop=True)
 
-        print("[TelemetryParser] 최종 shape =", df.shape)
         return df
@@ -0,0 +1,211 @@
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# 트랙 이름은 파일 경로(<track>_ideal.csv)에 그대로 들어가므로 영문/숫자/_/- 만 허용
+_TRACK_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def valid_track_name(track):
+    return isinstance(track, str) and _TRACK_NAME.match(track) is not None
+
+
+class IdealLine:
+    """
+    서킷 하나의 ideal line (polyline) + 공간 인덱스.
+
+    점들은 ideal line CSV 의 좌표계(트랙 맵 픽셀)에 있고,
+    트랙 길이(length_m)를 알면 거리 단위 결과는 미터로 환산된다.
+    """
+
+    def __init__(self, track, x, y, closed=True, length_m=None, world_to_map=None,
+                 distance_norm=None):
+        self.track = track
+        self.closed = closed
+        self._distance_norm = None if distance_norm is None else np.asarray(distance_norm, dtype=np.float64)
+
+        pts = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+        self.n_input = len(pts)
+        if closed and not np.allclose(pts[0], pts[-1]):
+            pts = np.vstack([pts, pts[:1]])
+        self.points = pts
+
+        seg = np.diff(pts, axis=0)
+        self.seg_start = pts[:-1]
+        self.seg_vec = seg
+        self.seg_len = np.hypot(seg[:, 0], seg[:, 1])
+        self.cum_len = np.concatenate([[0.0], np.cumsum(self.seg_len)])
+        self.total_len = float(self.cum_len[-1])
+
+        # 맵 단위 → 미터
+        self.scale = (length_m / self.total_len) if (length_m and self.total_len > 0) else 1.0
+
+        # 선택: trajectory 좌표 → 맵 좌표 2x3 affine
+        self.world_to_map = None if world_to_map is None else np.asarray(world_to_map, dtype=np.float64)
+
+        # scipy.spatial 은 import 가 ~0.13초라 서버 기동 시간에서 빼려고 여기서 import
+        from scipy.spatial import cKDTree
+        self.tree = cKDTree(self.seg_start)
+
+    # distance_norm 기반 매핑용 (TrajectoryAnalyzer.attach_ideal_line)
+    @property
+    def arrays(self):
+        n = self.n_input
+        return {
+            "pixel_x": self.points[:n, 0],
+            "pixel_y": self.points[:n, 1],
+            "distance_norm": (self._distance_norm if self._distance_norm is not None
+                              else self.cum_len[:n] / (self.cum_len[n - 1] + 1e-12)),
+        }
+
+    def project(self, px, py, k=4):
+        """
+        점들을 가장 가까운 ideal line segment 위로 한 번에 투영.
+        KD-tree 로 가까운 vertex k 개를 찾고, 그 vertex 에서 시작하는 segment 와
+        바로 앞 segment 만 검사하므로 점 하나당 O(log M).
+
+        반환 dict (모두 길이 N 배열):
+            lateral  : 부호 있는 수직 거리 (+ = 진행 방향 왼쪽), 미터 환산
+            progress : 시작점부터 투영점까지 트랙을 따라간 거리, 미터 환산
+            progress_norm : progress / 한 바퀴 길이 (0~1)
+            segment  : 투영된 segment 인덱스
+            proj_x, proj_y : 투영점 (맵 좌표)
+        """
+        p = np.column_stack([np.asarray(px, dtype=np.float64), np.asarray(py, dtype=np.float64)])
+        if self.world_to_map is not None:
+            p = p @ self.world_to_map[:, :2].T + self.world_to_map[:, 2]
+
+        n_seg = len(self.seg_len)
+        k = min(k, n_seg)
+        _, idx = self.tree.query(p, k=k)
+        idx = idx.reshape(len(p), k)
+
+        # 후보 segment: 가까운 vertex 에서 시작/끝나는 것
+        prev = idx - 1
+        if self.closed:
+            prev = prev % n_seg
+        else:
+            prev = np.clip(prev, 0, n_seg - 1)
+        cand = np.concatenate([idx, prev], axis=1)                        # (N, 2k)
+
+        a = self.seg_start[cand]                                          # (N, 2k, 2)
+        v = self.seg_vec[cand]
+        L2 = np.maximum(self.seg_len[cand] ** 2, 1e-12)
+        d = p[:, None, :] - a
+        t = np.clip((d[..., 0] * v[..., 0] + d[..., 1] * v[..., 1]) / L2, 0.0, 1.0)
+        proj = a + t[..., None] * v
+        dist2 = ((p[:, None, :] - proj) ** 2).sum(axis=2)
+
+        best = np.argmin(dist2, axis=1)
+        rows = np.arange(len(p))
+        seg = cand[rows, best]
+        tb = t[rows, best]
+        pr = proj[rows, best]
+        db = d[rows, best]
+        vb = v[rows, best]
+
+        cross = vb[:, 0] * db[:, 1] - vb[:, 1] * db[:, 0]
+        lateral = np.sign(cross) * np.sqrt(dist2[rows, best])
+        progress = self.cum_len[seg] + tb * self.seg_len[seg]
+
+        return {
+            "lateral": lateral * self.scale,
+            "progress": progress * self.scale,
+            "progress_norm": progress / (self.total_len + 1e-12),
+            "segment": seg,
+            "proj_x": pr[:, 0],
+            "proj_y": pr[:, 1],
+        }
+
+
+class TrackRegistry:
+    """
+    서킷별 ideal line 을 필요할 때 한 번만 읽어서 보관.
+
+    config.TRACKS 에 등록된 트랙 + ideal_dir 에 있는 <track>_ideal.csv 를 찾는다.
+    """
+
+    def __init__(self, tracks=None, ideal_dir=None):
+        self.tracks = dict(config.TRACKS if tracks is None else tracks)
+        self.ideal_dir = ideal_dir or config.IDEAL_LINE_DIR
+        self._lines = {}
+        self._lock = threading.Lock()
+
+    def _track_config(self, track):
+        if not valid_track_name(track):
+            raise KeyError(f"잘못된 트랙 이름입니다: {track!r}")
+        cfg = dict(self.tracks.get(track, {}))
+        cfg.setdefault("ideal_line", os.path.join(self.ideal_dir, f"{track}_ideal.csv"))
+        return cfg
+
+    def available(self):
+        names = set(self.tracks)
+        if os.path.isdir(self.ideal_dir):
+            for f in os.listdir(self.ideal_dir):
+                if f.endswith("_ideal.csv"):
+                    names.add(f[: -len("_ideal.csv")])
+        return sorted(n for n in names if self.has(n))
+
+    def has(self, track):
+        return valid_track_name(track) and os.path.isfile(self._track_config(track)["ideal_line"])
+
+    def config(self, track):
+        return self._track_config(track)
+
+    def cameras(self, track):
+        return sorted(self._track_config(track).get("cameras", {}))
+
+    def homography(self, track, camera=None, n_frames=None):
+        """
+        트랙/카메라의 맵 좌표 → 영상 좌표 homography.
+        반환: (3, 3) 또는 프레임별 (N, 3, 3) 배열, 카메라 설정이 없으면 config.HOMOGRAPHY_MATRIX.
+        n_frames : 선택, 영상 프레임 수. 프레임별 시퀀스가 이보다 짧으면 ValueError
+                   (트래킹 전에 확인하려고)
+        """
+        cfg = self._track_config(track)
+        cams = cfg.get("cameras", {})
+        if camera is None:
+            camera = cfg.get("default_camera")
+        if camera is not None and camera not in cams:
+            raise KeyError(f"트랙 '{track}' 에 카메라 '{camera}' 가 없습니다 (사용 가능: {sorted(cams)})")
+
+        H = cams.get(camera, config.HOMOGRAPHY_MATRIX)
+        if isinstance(H, str):
+            # 움직이는 카메라: 프레임별 homography 시퀀스 (.npy)
+            H = np.load(H, mmap_mode="r")
+        H = np.asarray(H, dtype=np.float64)
+        if H.shape[-2:] != (3, 3) or H.ndim not in (2, 3):
+            raise ValueError(f"homography 형식이 잘못되었습니다: {H.shape}")
+        if H.ndim == 3 and n_frames is not None and len(H) < n_frames:
+            raise ValueError(f"카메라 '{camera}' 의 프레임별 homography 가 부족합니다: {len(H)} < {n_frames} 프레임")
+        return H
+
+    def get(self, track):
+        with self._lock:
+            line = self._lines.get(track)
+            if line is not None:
+                return line
+
+            cfg = self._track_config(track)
+            path = cfg["ideal_line"]
+            if not os.path.isfile(path):
+                raise KeyError(f"트랙 '{track}' 의 ideal line 이 없습니다: {path}")
+
+            df = pd.read_csv(path)
+            line = IdealLine(
+                track,
+                df["pixel_x"].to_numpy(),
+                df["pixel_y"].to_numpy(),
+                closed=cfg.get("closed", True),
+                length_m=cfg.get("length_m"),
+                world_to_map=cfg.get("world_to_map"),
+                distance_norm=df["distance_norm"].to_numpy() if "distance_norm" in df else None,
+            )
+            print(f"[TrackRegistry] {track} ideal line 로딩: {len(line.points)} 점")
+            self._lines[track] = line
+            return line
@@ -1,10 +1,20 @@
+import os
+
 import numpy as np
 import pandas as pd
 
 
 class TrajectoryAnalyzer:
 
-    def create_trajectory(self, telemetry):
+    def __init__(self):
+        # ideal_path -> (mtime, {pixel_x, pixel_y, distance_norm})
+        self._ideal_cache = {}
+
+    def create_trajectory(self, telemetry, laps=None):
+        """
+        laps : 선택, LapSegmenter.split 결과. 주면 행별 랩 번호 / 랩 안 거리도 붙인다
+               (여러 랩이면 attach_ideal_line 이 세션 전체 대신 랩 거리로 매핑).
+        """
         time = telemetry["time"].to_numpy()
         yaw_rate_deg = telemetry["roty"].to_numpy()
         speed_kmh = telemetry["speed"].to_numpy()
@@ -28,24 +38,83 @@ class TrajectoryAnalyzer:
             "speed": speed_kmh.tolist(),
             "distance": dist_raw.tolist(),
         }
+        if laps is not None:
+            traj["lap"] = laps.lap_index
+            traj["lap_distance"] = laps.lap_dist
+            traj["lap_length"] = laps.length
+            traj["n_laps"] = len(laps)
         return traj
 
-    def attach_ideal_line(self, trajectory, ideal_path):
+    def load_ideal_line(self, ideal_path):
         """
-        ideal_line/spa_ideal.csv :
-        pixel_x, pixel_y, distance_raw, distance_norm ...
+        ideal line CSV 를 한 번만 읽어서 numpy 배열로 메모리에 보관.
+        파일이 바뀌면(mtime) 다시 읽는다.
         """
+        key = os.path.abspath(ideal_path)
+        mtime = os.path.getmtime(ideal_path)
+        cached = self._ideal_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
         ideal = pd.read_csv(ideal_path)
+        line = {
+            "pixel_x": ideal["pixel_x"].to_numpy(dtype=np.float64),
+            "pixel_y": ideal["pixel_y"].to_numpy(dtype=np.float64),
+            "distance_norm": ideal["distance_norm"].to_numpy(dtype=np.float64),
+        }
+        self._ideal_cache[key] = (mtime, line)
+        return line
 
-        tel_d = np.array(trajectory["distance"])
-        tel_norm = (tel_d - tel_d.min()) / (tel_d.max() - tel_d.min() + 1e-9)
+    def attach_ideal_line(self, trajectory, ideal_path, interpolate=False):
+        """
+        ideal_path : ideal_line/<track>_ideal.csv 경로 또는 TrackRegistry 의 IdealLine
+        pixel_x, pixel_y, distance_raw, distance_norm ...
 
-        ideal_norm = ideal["distance_norm"].values
+        distance_norm 이 단조 증가이므로 searchsorted 로 O(N log M) 매핑.
+        interpolate=True 면 가장 가까운 점에 붙이는 대신 이웃 두 점 사이를 선형 보간.
+        """
+        if hasattr(ideal_path, "arrays"):
+            ideal = ideal_path.arrays  # TrackRegistry 의 IdealLine
+        else:
+            ideal = self.load_ideal_line(ideal_path)
+
+        if trajectory.get("n_laps", 1) > 1 and trajectory.get("lap_length"):
+            # 여러 랩: 랩마다 ideal line 처음부터 다시
+            tel_norm = np.clip(trajectory["lap_distance"] / trajectory["lap_length"], 0.0, 1.0)
+        else:
+            tel_d = np.asarray(trajectory["distance"], dtype=np.float64)
+            tel_norm = (tel_d - tel_d.min()) / (tel_d.max() - tel_d.min() + 1e-9)
+
+        ideal_norm = ideal["distance_norm"]
+
+        if interpolate:
+            trajectory["ideal_x"] = np.interp(tel_norm, ideal_norm, ideal["pixel_x"])
+            trajectory["ideal_y"] = np.interp(tel_norm, ideal_norm, ideal["pixel_y"])
+            return trajectory
 
         # 각 텔레 포인트마다 가장 가까운 ideal distance_norm 인덱스 찾기
-        mapping = [int(np.argmin(np.abs(ideal_norm - d))) for d in tel_norm]
+        right = np.clip(np.searchsorted(ideal_norm, tel_norm), 1, len(ideal_norm) - 1)
+        left = right - 1
+        use_right = np.abs(ideal_norm[right] - tel_norm) < np.abs(tel_norm - ideal_norm[left])
+        mapping = np.where(use_right, right, left)
 
-        trajectory["ideal_x"] = ideal["pixel_x"].values[mapping]
-        trajectory["ideal_y"] = ideal["pixel_y"].values[mapping]
+        trajectory["ideal_x"] = ideal["pixel_x"][mapping]
+        trajectory["ideal_y"] = ideal["pixel_y"][mapping]
 
         return trajectory
+
+    def attach_lateral_offset(self, trajectory, ideal_line, keys=("x", "y")):
+        """
+        trajectory 점들을 ideal line 에 공간 투영해서
+        lateral_offset(+ = 왼쪽) / track_progress 를 붙인다.
+        점 좌표를 맵 좌표로 옮기는 world_to_map (트랙 설정) 이 없으면 거리 단위가 맞지 않으므로
+        붙이지 않는다 (결과의 lateral offset 은 null).
+        """
+        if ideal_line.world_to_map is None:
+            print("[TrajectoryAnalyzer] world_to_map 없음 → lateral offset 생략")
+            return trajectory
+        proj = ideal_line.project(trajectory[keys[0]], trajectory[keys[1]])
+        trajectory["lateral_offset"] = proj["lateral"]
+        trajectory["track_progress"] = proj["progress"]
+        trajectory["track_progress_norm"] = proj["progress_norm"]
+        return trajectory
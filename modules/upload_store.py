@@ -0,0 +1,289 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+
+import config
+from modules.artifact_cache import remember_sha256
+
+
+# 업로드 종류 → 저장 확장자 ({upload_id}_{kind}{ext})
+KINDS = {
+    "video": ".mp4",
+    "telemetry": ".csv",
+}
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_READ_CHUNK = 1024 * 1024
+# 파일별 Lock 을 업로드마다 만들면 계속 쌓이므로 (upload_id, kind) 해시로 고정 개수 중 하나를 씀
+_LOCK_STRIPES = 64
+
+
+class UploadError(ValueError):
+    """잘못된 업로드 요청 (HTTP 400)."""
+
+
+class UploadOffsetError(UploadError):
+    """청크 시작 위치가 서버가 받은 크기와 다름 (HTTP 409, received 부터 다시 보내야 함)."""
+
+    def __init__(self, message, received):
+        super().__init__(message)
+        self.received = received
+
+
+def parse_content_range(header):
+    """'bytes start-end/total' → start (헤더가 없으면 0)."""
+    if not header:
+        return 0
+    try:
+        unit, rng = header.strip().split(" ", 1)
+        start = int(rng.split("-", 1)[0])
+    except ValueError:
+        raise UploadError(f"잘못된 Content-Range: {header}")
+    if unit != "bytes" or start < 0:
+        raise UploadError(f"잘못된 Content-Range: {header}")
+    return start
+
+
+class _Hasher:
+    """파일 하나의 진행 중 sha256 상태 (offset 까지 반영됨)."""
+
+    def __init__(self):
+        self.sha = hashlib.sha256()
+        self.offset = 0
+
+
+class UploadStore:
+    """
+    청크 단위 스트리밍 업로드 (resumable).
+
+    업로드 하나 = {upload_id}.upload.json (파일명/크기, 생성 후 바뀌지 않음) + 종류별 파일
+        {upload_id}_{kind}{ext}.part     받는 중
+        {upload_id}_{kind}{ext}          완료
+        {upload_id}_{kind}{ext}.sha256   완료된 파일의 sha256
+
+    - 청크는 메모리에 모으지 않고 바로 .part 파일 끝에 이어 쓴다.
+    - 이어 올리기: 클라이언트는 status() 의 received 부터 다시 보내면 된다.
+    - sha256 은 받으면서 계산 (프로세스가 재시작돼서 상태가 없으면 받은 부분만 한 번 다시 읽음).
+      완료되면 artifact_cache 해시 메모에 등록해서 캐시 키 계산 시 파일을 다시 읽지 않는다.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or config.UPLOAD_DIR
+        self.max_bytes = config.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self._file_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._hashers = {}        # (upload_id, kind) → _Hasher
+
+    # --------------------------
+    # 경로 / 상태 파일
+    # --------------------------
+    @staticmethod
+    def valid_id(upload_id):
+        return bool(upload_id) and bool(_ID_RE.match(upload_id))
+
+    def _check(self, upload_id, kind=None):
+        if not self.valid_id(upload_id):
+            raise UploadError(f"잘못된 upload_id: {upload_id}")
+        if kind is not None and kind not in KINDS:
+            raise UploadError(f"지원하지 않는 파일 종류: {kind} (사용 가능: {sorted(KINDS)})")
+
+    def file_path(self, upload_id, kind):
+        return os.path.join(self.root, f"{upload_id}_{kind}{KINDS[kind]}")
+
+    def _state_path(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.upload.json")
+
+    def _read_state(self, upload_id):
+        try:
+            with open(self._state_path(upload_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_state(self, upload_id, state):
+        tmp = self._state_path(upload_id) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, self._state_path(upload_id))
+
+    def _file_lock(self, upload_id, kind):
+        return self._file_locks[hash((upload_id, kind)) % len(self._file_locks)]
+
+    # --------------------------
+    # API
+    # --------------------------
+    def create(self, files):
+        """
+        files : {kind: {"name": 원본 파일명, "size": 바이트}}
+        반환: upload_id
+        """
+        if not files:
+            raise UploadError("업로드할 파일 정보가 없습니다.")
+        if not isinstance(files, dict):
+            raise UploadError("files 는 {종류: {name, size}} 형식이어야 합니다.")
+        state = {"files": {}}
+        for kind, info in files.items():
+            if kind not in KINDS:
+                raise UploadError(f"지원하지 않는 파일 종류: {kind} (사용 가능: {sorted(KINDS)})")
+            if not isinstance(info, dict):
+                raise UploadError(f"{kind} 파일 정보는 {{name, size}} 형식이어야 합니다.")
+            try:
+                size = int(info.get("size", -1))
+            except (TypeError, ValueError):
+                raise UploadError(f"{kind} 파일 크기가 잘못되었습니다: {info.get('size')!r}")
+            if size <= 0 or size > self.max_bytes:
+                raise UploadError(f"{kind} 파일 크기가 잘못되었습니다: {size}")
+            state["files"][kind] = {
+                "name": os.path.basename(str(info.get("name", ""))),
+                "size": size,
+            }
+
+        upload_id = uuid.uuid4().hex
+        self._write_state(upload_id, state)
+        return upload_id
+
+    def status(self, upload_id):
+        """{kind: {name, size, received, complete, sha256}} (없는 업로드면 None)."""
+        self._check(upload_id)
+        state = self._read_state(upload_id)
+        if state is None:
+            return None
+        out = {}
+        for kind, info in state["files"].items():
+            final = self.file_path(upload_id, kind)
+            sha = self._read_sha(final)
+            complete = sha is not None and os.path.isfile(final)
+            received = info["size"] if complete else self._received(final + ".part")
+            out[kind] = dict(info, sha256=sha if complete else None,
+                             received=received, complete=complete)
+        return out
+
+    @staticmethod
+    def _read_sha(final):
+        try:
+            with open(final + ".sha256", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def complete(self, upload_id):
+        st = self.status(upload_id)
+        return st is not None and all(f["complete"] for f in st.values())
+
+    @staticmethod
+    def _received(part_path):
+        try:
+            return os.path.getsize(part_path)
+        except FileNotFoundError:
+            return 0
+
+    def _hasher(self, upload_id, kind, part_path, received):
+        """received 까지 반영된 hasher. 메모리에 없거나 어긋나 있으면 받은 부분을 다시 읽는다."""
+        key = (upload_id, kind)
+        h = self._hashers.get(key)
+        if h is not None and h.offset == received:
+            return h
+        h = _Hasher()
+        if received:
+            with open(part_path, "rb") as f:
+                while h.offset < received:
+                    chunk = f.read(min(_READ_CHUNK, received - h.offset))
+                    if not chunk:
+                        break
+                    h.sha.update(chunk)
+                    h.offset += len(chunk)
+        self._hashers[key] = h
+        return h
+
+    def write_chunk(self, upload_id, kind, stream, start, length=None):
+        """
+        stream 에서 읽은 바이트를 start 위치부터 이어 쓴다 (start 는 지금까지 받은 크기여야 함).
+        length 가 주어지면 그만큼만 읽는다.
+        반환: status()[kind]
+        """
+        self._check(upload_id, kind)
+        with self._file_lock(upload_id, kind):
+            state = self._read_state(upload_id)
+            if state is None or kind not in state["files"]:
+                raise UploadError(f"업로드 {upload_id} 에 {kind} 파일이 없습니다.")
+            final = self.file_path(upload_id, kind)
+            part = final + ".part"
+
+            if os.path.isfile(final):
+                # 이미 완료된 파일 (재시도 응답이 유실된 경우)
+                return self.status(upload_id)[kind]
+
+            with open(part, "ab") as f:
+                # 다른 gunicorn 워커가 같은 파일을 쓰고 있으면 409 → 클라이언트가 status 확인 후 재시도
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadOffsetError(f"{kind} 파일을 다른 요청이 쓰고 있습니다.", self._received(part))
+
+                # lock 을 잡는 사이 다른 워커가 완료했을 수 있다
+                if os.path.isfile(final):
+                    os.remove(part)
+                    return self.status(upload_id)[kind]
+
+                size = state["files"][kind]["size"]
+                received = f.seek(0, os.SEEK_END)
+                if start != received:
+                    raise UploadOffsetError(
+                        f"청크 시작 위치 {start} 가 받은 크기 {received} 와 다릅니다.", received
+                    )
+
+                remaining = size - received if length is None else min(length, size - received)
+                h = self._hasher(upload_id, kind, part, received)
+                while remaining > 0:
+                    chunk = stream.read(min(_READ_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    h.sha.update(chunk)
+                    h.offset += len(chunk)
+                    remaining -= len(chunk)
+                f.flush()
+
+                if h.offset == size:
+                    digest = h.sha.hexdigest()
+                    with open(final + ".sha256", "w", encoding="utf-8") as hf:
+                        hf.write(digest)
+                    os.replace(part, final)
+                    remember_sha256(final, digest)
+                    self._hashers.pop((upload_id, kind), None)
+                    print(f"[UploadStore] {upload_id} {kind} 완료 ({size} bytes)")
+
+            return self.status(upload_id)[kind]
+
+    def paths(self, upload_id):
+        """완료된 업로드의 {kind: 경로} (없거나 미완료면 None)."""
+        if not self.valid_id(upload_id) or not self.complete(upload_id):
+            return None
+        state = self._read_state(upload_id)
+        return {kind: self.file_path(upload_id, kind) for kind in state["files"]}
+
+    def hashes(self, upload_id):
+        st = self.status(upload_id) if self.valid_id(upload_id) else None
+        if st is None:
+            return {}
+        return {kind: info["sha256"] for kind, info in st.items()}
+
+    def delete(self, upload_id):
+        """업로드 파일 (완료/받는 중/sha256) 과 상태 파일 삭제."""
+        self._check(upload_id)
+        for kind in KINDS:
+            final = self.file_path(upload_id, kind)
+            for p in (final, final + ".part", final + ".sha256"):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            self._hashers.pop((upload_id, kind), None)
+        try:
+            os.remove(self._state_path(upload_id))
+        except FileNotFoundError:
+            pass
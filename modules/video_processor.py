@@ -1,144 +1,545 @@
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import cv2
 import numpy as np
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    YOLO = None
-    print("[VideoProcessor] ultralytics가 설치되어 있지 않습니다. YOLO 트래킹을 사용할 수 없습니다.")
+import config
+from modules.artifact_cache import ArtifactCache, file_sha256
+from modules.detectors import create_detector
+from modules.frame_source import FrameSource, read_video_meta
+from modules.frame_track import FrameTrack, FrameTrackBuilder
+from modules.motion_tracker import KeyframeTracker
+from modules.overlay import OverlayCompositor, draw_car_marker, draw_delta
 
 
-class VideoProcessor:
+def _report(progress, done, total, every=30):
+    """progress 콜백을 every 프레임마다 한 번씩만 호출."""
+    if progress is None or total <= 0 or done % every:
+        return
+    progress(min(done / total, 1.0))
+
+
+# 캐시 포맷/검출 로직이 바뀌면 올려서 기존 트래킹 캐시를 무효화
+TRACK_CACHE_VERSION = 1
+
+
+def _predict(state):
+    """마지막 검출 위치 + 프레임당 속도 × 지난 프레임 수 (keyframe 모드면 검출 간격이 여러 프레임)."""
+    lx, ly = state["last"]
+    vx, vy = state["velocity"]
+    gap = state["frame"] - state["last_frame"]
+    return lx + vx * gap, ly + vy * gap
+
 
-    def __init__(self, model_path="models/yolov8x-worldv2.pt", device="cuda"):
-        self.model_path = model_path
-        self.device = device
-        self.model = None
+def _nearest(boxes, px, py):
+    """box 중심이 (px, py) 에 가장 가까운 인덱스."""
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2.0
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2.0
+    return int(np.argmin(np.hypot(cx - px, cy - py)))
 
-        if YOLO is not None:
-            try:
-                self.model = YOLO(self.model_path)
-                print(f"[VideoProcessor] YOLO 모델 로딩: {self.model_path}")
-            except Exception as e:
-                print("[VideoProcessor] YOLO 모델 로딩 실패:", repr(e))
-                self.model = None
 
-    def process(self, video_path):
+class VideoProcessor:
+
+    def __init__(self, model_path=None, device=None,
+                 conf=0.4, tracker="botsort.yaml", cache_dir=None, keyframe=None, roi=None,
+                 backend=None, detector=None):
         """
-        영상 메타데이터 + YOLO 기반 car_pos 시퀀스 생성.
-        car_pos[i] = (cx, cy) or None
-        """
-        cap = cv2.VideoCapture(video_path)
-        W = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        H = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        cap.release()
-
-        meta = {"width": W, "height": H, "fps": fps}
-
-        # YOLO가 없으면 car_pos를 전부 None으로 채워서라도 길이는 맞춰줌
-        if self.model is None:
-            print("[VideoProcessor] YOLO 미사용 → car_pos를 None으로 채웁니다.")
-            cap = cv2.VideoCapture(video_path)
-            car_pos = []
-            while True:
-                ret, _ = cap.read()
-                if not ret:
-                    break
-                car_pos.append(None)
-            cap.release()
-            return meta, {"car_pos": car_pos}
-
-        # ultralytics YOLO tracking
-        car_pos = []
-        print("[VideoProcessor] YOLO tracking 시작...")
-        results = self.model.track(
-            source=video_path,
-            stream=True,
-            device=self.device,
-            verbose=False,
-            persist=True,
-            conf=0.4
+        검출은 detector backend (modules.detectors) 를 통해서만 한다.
+        backend  : "ultralytics" | "onnx" (None 이면 config.DETECTOR_BACKEND)
+        detector : 선택, 이미 만든 detector 인스턴스 (backend/model_path/device 무시)
+        모델은 여기서 읽지 않고 첫 검출 때 로딩한다.
+        """
+        self.conf = conf
+        if detector is None:
+            detector = create_detector(backend, conf=conf, model_path=model_path,
+                                       device=device, tracker=tracker)
+        self.detector = detector
+        self._detector_ok = None
+
+        # keyframe 검출 설정 (None 이면 config 기본값, False 면 매 프레임 검출)
+        if keyframe is None:
+            keyframe = dict(config.KEYFRAME_DETECTION) if config.KEYFRAME_DETECTION_ENABLED else False
+        self.keyframe = keyframe
+
+        # 차를 잡은 뒤 ROI crop 추론 설정 (None 이면 config 기본값, False 면 항상 full-frame)
+        if roi is None:
+            roi = dict(config.ROI_DETECTION) if config.ROI_DETECTION_ENABLED else False
+        self.roi = roi
+
+        if cache_dir is None and config.TRACK_CACHE_ENABLED:
+            cache_dir = config.CACHE_DIR
+        self.cache = ArtifactCache(cache_dir) if cache_dir else None
+
+    def _detector_ready(self):
+        """detector 로딩 (처음 한 번). 실패하면 False → car_pos 없이 진행."""
+        if self._detector_ok is None:
+            self._detector_ok = False
+            if not self.detector.available():
+                print(f"[VideoProcessor] {self.detector.name} detector 를 사용할 수 없습니다. YOLO 트래킹 없이 진행합니다.")
+            else:
+                try:
+                    self.detector.load()
+                    self._detector_ok = True
+                except Exception as e:
+                    print("[VideoProcessor] detector 로딩 실패:", repr(e))
+        return self._detector_ok
+
+    def _track_cache_key(self, video_path, video_hash=None):
+        if video_hash is None:
+            video_hash = file_sha256(video_path)
+        return ArtifactCache.make_key(
+            "track", TRACK_CACHE_VERSION, video_hash,
+            self.detector.cache_id, float(self.conf),
+            self.keyframe or None, self.roi or None,
         )
 
-        for r in results:
-            # r.orig_shape, r.boxes 등 사용 가능
-            if r.boxes is None or len(r.boxes) == 0:
-                car_pos.append(None)
-                continue
+    def _load_cached_track(self, video_path, video_hash=None):
+        """(cache_key, hit) — hit 은 (meta, car_pos) 또는 None."""
+        if self.cache is None or not (self._detector_ok or self.detector.available()):
+            return None, None
+        cache_key = self._track_cache_key(video_path, video_hash)
+        hit = self.cache.load("track", cache_key)
+        if hit is None:
+            return cache_key, None
+        arrays, meta = hit
+        car_pos = FrameTrack.from_nan_array(arrays["car_pos"])
+        print(f"[VideoProcessor] 트래킹 캐시 사용 ({len(car_pos)} 프레임)")
+        return cache_key, (meta, car_pos)
+
+    def _save_cached_track(self, cache_key, meta, car_pos):
+        if cache_key is None:
+            return
+        try:
+            self.cache.save("track", cache_key, {"car_pos": car_pos.to_nan_array()}, meta)
+        except OSError as e:
+            print("[VideoProcessor] 트래킹 캐시 저장 실패:", repr(e))
+
+    def _detect_roi(self, frame, state):
+        """
+        직전 위치 + 속도로 예측한 지점 주변 crop 에서만 검출.
+        ((cx, cy), conf, box_wh) 또는 None (→ full-frame 으로 fallback).
+        """
+        H, W = frame.shape[:2]
+        px, py = _predict(state)
+
+        bw, bh = state["size"]
+        half = max(max(bw, bh) * self.roi["scale"], self.roi["min_size"]) / 2.0
+        x0 = int(max(0, px - half))
+        y0 = int(max(0, py - half))
+        x1 = int(min(W, px + half))
+        y1 = int(min(H, py + half))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+
+        crop = frame[y0:y1, x0:x1]
+        imgsz = min(self.roi["max_imgsz"], int(np.ceil(max(crop.shape[:2]) / 32.0)) * 32)
+        det = self.detector.predict(crop, imgsz=imgsz)
+        if len(det) == 0:
+            return None
+
+        # crop 안에서는 예측 지점에 가장 가까운 box 가 "내 차"
+        det = det.shift(x0, y0)
+        return self._pick(det, _nearest(det.boxes, px, py))
+
+    @staticmethod
+    def _pick(det, k):
+        x1, y1, x2, y2 = det.boxes[k].tolist()
+        center = ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
+        return center, float(det.conf[k]), (x2 - x1, y2 - y1)
 
+    def _detect_full(self, frame, state):
+        """
+        전체 프레임 검출. tracker ID 를 잡으면 그 ID 로 고정.
+        ID 가 없는 backend (onnx) 는 직전 위치에 가장 가까운 box 로 고정한다.
+        """
+        det = self.detector.track(frame)
+        if len(det) == 0:
+            return None
+
+        ids = det.ids
+        idx = None
+
+        # 이미 잠근 tracker ID 가 있으면 면적 비교 없이 그 box 사용
+        if ids is not None and state["locked_id"] is not None:
+            hit = np.flatnonzero(ids == state["locked_id"])
+            if len(hit):
+                idx = int(hit[0])
+
+        if idx is None and not self.detector.provides_ids and state["last"] is not None:
+            idx = _nearest(det.boxes, *_predict(state))
+
+        if idx is None:
             # 가장 큰 bbox를 "내 차"라고 가정
-            boxes = r.boxes.xyxy
+            boxes = det.boxes
             areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
-            idx_max = int(areas.argmax().item())
-            x1, y1, x2, y2 = boxes[idx_max].tolist()
-            cx = (x1 + x2) / 2.0
-            cy = (y1 + y2) / 2.0
-            car_pos.append((cx, cy))
+            idx = int(areas.argmax())
+            if ids is not None:
+                state["locked_id"] = int(ids[idx])
+
+        return self._pick(det, idx)
+
+    def _detect_car(self, frame, state):
+        """
+        프레임 한 장에서 "내 차" ((cx, cy), conf) 또는 None.
+        차를 잡은 뒤에는 ROI crop 만 추론하고, 놓치면 full-frame 으로 돌아간다.
+        """
+        det = None
+        if self.roi and state["last"] is not None:
+            det = self._detect_roi(frame, state)
+        if det is None:
+            det = self._detect_full(frame, state)
+
+        if det is None:
+            state["last"] = None
+            state["velocity"] = (0.0, 0.0)
+            return None
+
+        (cx, cy), conf, size = det
+        if state["last"] is not None:
+            # 프레임당 속도 (keyframe 모드에서는 직전 검출과 여러 프레임 떨어져 있음)
+            gap = max(1, state["frame"] - state["last_frame"])
+            state["velocity"] = ((cx - state["last"][0]) / gap, (cy - state["last"][1]) / gap)
+        state["last"] = (cx, cy)
+        state["last_frame"] = state["frame"]
+        state["size"] = size
+        return (cx, cy), conf
+
+    def _new_locator(self):
+        """
+        영상 하나 동안 상태를 유지하는 step(frame) -> (cx, cy) | None.
+        keyframe 모드면 N 프레임마다만 검출하고 사이는 Kalman 예측으로 채운다.
+        """
+        state = {"last": None, "velocity": (0.0, 0.0), "size": (0.0, 0.0), "locked_id": None,
+                 "frame": -1, "last_frame": -1}
+        self.detector.reset()
+
+        def detect(frame):
+            return self._detect_car(frame, state)
+
+        if self.keyframe:
+            tracker = KeyframeTracker(detect, **self.keyframe)
+
+            def step(frame):
+                state["frame"] += 1
+                return tracker.step(frame)
+
+            return step
+
+        def step(frame):
+            state["frame"] += 1
+            det = detect(frame)
+            return None if det is None else det[0]
+
+        return step
+
+    def process(self, video_path, progress=None, video_hash=None):
+        """
+        영상 메타데이터 + YOLO 기반 car_pos 시퀀스 생성.
+        car_pos : FrameTrack (N, 2) float32, car_pos[i] = (cx, cy) or None
+        cache_key : 트래킹 캐시 키 (캐시를 안 쓰면 None)
+        progress   : 선택, progress(frac) 콜백 (0~1)
+        video_hash : 선택, 업로드 시 이미 계산한 영상 sha256 (없으면 여기서 계산)
+
+        같은 영상 + 같은 모델/conf/tracker 설정이면 디스크 캐시에서 바로 읽고
+        검출은 건너뛴다.
+        """
+        cache_key, hit = self._load_cached_track(video_path, video_hash)
+        if hit is not None:
+            if progress is not None:
+                progress(1.0)
+            meta, car_pos = hit
+            return meta, {"car_pos": car_pos, "cache_key": cache_key}
+
+        meta, n_total = read_video_meta(video_path)
 
+        if not self._detector_ready():
+            return meta, {"car_pos": self._untracked(video_path, n_total)}
+
+        # ultralytics YOLO tracking (디코딩은 FrameSource 스레드가 담당)
+        builder = FrameTrackBuilder(dim=2, capacity=n_total)
+        locate = self._new_locator()
+        print("[VideoProcessor] YOLO tracking 시작...")
+        for idx, frame in FrameSource(video_path, config.FRAME_BUFFER_SIZE):
+            builder.append(locate(frame))
+            _report(progress, len(builder), n_total)
+
+        car_pos = builder.build()
         print(f"[VideoProcessor] YOLO tracking 완료. 프레임 수: {len(car_pos)}")
 
-        return meta, {"car_pos": car_pos}
+        self._save_cached_track(cache_key, meta, car_pos)
+        return meta, {"car_pos": car_pos, "cache_key": cache_key}
+
+    @staticmethod
+    def _untracked(video_path, n_total):
+        """YOLO가 없으면 car_pos를 전부 None으로 채워서라도 길이는 맞춰줌."""
+        print("[VideoProcessor] YOLO 미사용 → car_pos를 None으로 채웁니다.")
+        if n_total <= 0:
+            # 컨테이너에 프레임 수가 없을 때만 직접 센다
+            n_total = sum(1 for _ in FrameSource(video_path, config.FRAME_BUFFER_SIZE))
+        return FrameTrack.empty(n_total, 2)
 
-    def render_overlay(self, video_path, warped_real, warped_ideal, yolo_traj, outpath):
+    def process_and_render(self, video_path, outpath, plan_overlay, progress=None,
+                           video_hash=None, sync_window_sec=None):
+        """
+        Fused 모드: 한 번의 디코딩으로 검출 + 오버레이 렌더링을 같이 한다.
+
+        오버레이 좌표(sync/warp)는 car_pos 가 있어야 계산되므로
+        1) 앞쪽 sync_window_sec 구간만 먼저 디코딩/검출하고
+        2) plan_overlay(meta, car_pos_prefix, n_frames) -> (warped_real, warped_ideal[, frame_delta])
+           로 전체 프레임의 오버레이 좌표 (+ 선택, 프레임별 delta-time) 를 만든 뒤
+        3) 영상 전체를 한 번 더 디코딩하면서 같은 프레임 버퍼에서
+           검출(앞 구간은 재사용)과 그리기/인코딩을 함께 처리한다.
+        총 디코딩량은 2N 에서 N + window 로 줄어든다.
+        트래킹 캐시가 있으면 검출 없이 렌더링만 한다.
+
+        주의: 캐시가 없으면 sync offset / drift 는 앞 sync_window_sec 구간의 car_pos 만으로
+        추정된다 (일반 경로는 영상 전체). drift knot 이 창 안에만 있으므로 창 뒤쪽은
+        상수 offset (drift 보정 없음) 이 되고, 이때 경고를 남긴다.
+        긴 영상은 ACC_FUSED_SYNC_WINDOW_SEC 를 늘리거나 일반 경로를 쓴다.
+
+        반환: (meta, {"car_pos": car_pos, "cache_key": ...}, warped_real, warped_ideal)
+        """
+        if sync_window_sec is None:
+            sync_window_sec = config.FUSED_SYNC_WINDOW_SEC
+
+        cache_key, hit = self._load_cached_track(video_path, video_hash)
+        meta, n_total = read_video_meta(video_path)
+
+        if hit is not None or not self._detector_ready():
+            # 검출이 필요 없으면 일반 경로와 동일 (이미 읽은 캐시를 그대로 사용)
+            if hit is not None:
+                meta, car_pos = hit
+                yolo_traj = {"car_pos": car_pos, "cache_key": cache_key}
+            else:
+                yolo_traj = {"car_pos": self._untracked(video_path, n_total)}
+            planned = plan_overlay(meta, yolo_traj["car_pos"], len(yolo_traj["car_pos"]))
+            warped_real, warped_ideal = planned[:2]
+            self.render_overlay(video_path, warped_real, warped_ideal, yolo_traj,
+                                outpath, progress=progress,
+                                frame_delta=planned[2] if len(planned) > 2 else None)
+            return meta, yolo_traj, warped_real, warped_ideal
+
+        # --------------------------
+        # 1) sync 용 앞 구간 검출
+        # --------------------------
+        window = max(1, int(round(sync_window_sec * (meta["fps"] or 30.0))))
+        if n_total > 0:
+            window = min(window, n_total)
+
+        car_pos = FrameTrackBuilder(dim=2, capacity=max(n_total, window))
+        locate = self._new_locator()
+        print(f"[VideoProcessor] fused: sync 구간 {window} 프레임 검출 (sync 는 이 구간만으로 추정)...")
+        if window < n_total:
+            print(f"[VideoProcessor] 경고: fused 모드는 앞 {window / (meta['fps'] or 30.0):.0f}s 로만 sync 하므로 "
+                  f"그 뒤 {(n_total - window) / (meta['fps'] or 30.0):.0f}s 는 drift 보정 없이 "
+                  "마지막 offset 을 씁니다 (ACC_FUSED_SYNC_WINDOW_SEC 또는 일반 경로).")
+        for idx, frame in FrameSource(video_path, config.FRAME_BUFFER_SIZE, end=window):
+            car_pos.append(locate(frame))
+
+        # --------------------------
+        # 2) 전체 오버레이 좌표 계산
+        # --------------------------
+        n_frames = max(n_total, len(car_pos))
+        planned = plan_overlay(meta, car_pos.build(), n_frames)
+        warped_real, warped_ideal = planned[:2]
+        frame_delta = _coerce_delta(planned[2] if len(planned) > 2 else None)
+
+        # --------------------------
+        # 3) 단일 디코딩으로 검출 + 렌더링
+        # --------------------------
+        W, H, fps = meta["width"], meta["height"], meta["fps"]
+        out = cv2.VideoWriter(outpath, cv2.VideoWriter_fourcc(*"mp4v"), fps, (W, H))
+        compositor = self._new_overlay_state(meta, warped_ideal)
+
+        print("[VideoProcessor] fused: 검출 + 렌더링 시작...")
+        for idx, frame in FrameSource(video_path, config.FRAME_BUFFER_SIZE):
+            if idx >= len(car_pos):
+                car_pos.append(locate(frame))
+            _draw_overlay(frame, idx, compositor, warped_real, car_pos, frame_delta=frame_delta)
+            out.write(frame)
+            _report(progress, idx + 1, n_total)
+
+        out.release()
+        car_pos = car_pos.build()
+        print(f"[VideoProcessor] fused 완료. 프레임 수: {len(car_pos)}, 저장: {outpath}")
+
+        self._save_cached_track(cache_key, meta, car_pos)
+        return meta, {"car_pos": car_pos, "cache_key": cache_key}, warped_real, warped_ideal
+
+    def _new_overlay_state(self, meta, warped_ideal):
+        return OverlayCompositor(meta["width"], meta["height"], warped_ideal)
+
+    def render_overlay(self, video_path, warped_real, warped_ideal, yolo_traj, outpath,
+                       progress=None, workers=None, frame_delta=None):
         """
         - warped_real: 각 프레임별 real line 위치 (u, v) 또는 None
         - warped_ideal: 각 프레임별 ideal line 위치 (u, v) 또는 None
         - yolo_traj["car_pos"]: YOLO가 잡은 차량 위치
+        - progress: 선택, progress(frac) 콜백 (0~1)
+        - workers: 병렬 렌더링 프로세스 수 (None 이면 config.RENDER_WORKERS)
+        - frame_delta: 선택, 프레임별 기준 랩 대비 delta-time (DeltaTimeEngine.frame_delta)
         """
-        cap = cv2.VideoCapture(video_path)
-        W = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        H = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(outpath, fourcc, fps, (W, H))
-
-        car_pos = yolo_traj.get("car_pos", [])
-
-        # ideal line은 전체 궤적을 하나의 polyline으로 항상 보여줌
-        ideal_points = [p for p in warped_ideal if p is not None]
-        ideal_poly = None
-        if len(ideal_points) >= 2:
-            ideal_poly = np.array(ideal_points, dtype=np.int32).reshape(-1, 1, 2)
-
-        real_trail = []  # 지금까지 지나온 real 궤적
-
-        idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # index 범위 체크
-            if idx < len(warped_real):
-                if warped_real[idx] is not None:
-                    real_trail.append(warped_real[idx])
-
-            # -------------------------
-            # ideal line 전체 (녹색)
-            # -------------------------
-            if ideal_poly is not None:
-                cv2.polylines(frame, [ideal_poly], False, (0, 255, 0), 2)
-
-            # -------------------------
-            # 지금까지의 real line (파란색, 차량 뒤로 길게 남음)
-            # -------------------------
-            if len(real_trail) >= 2:
-                rt = np.array(real_trail, dtype=np.int32).reshape(-1, 1, 2)
-                cv2.polylines(frame, [rt], False, (255, 0, 0), 2)
-
-            # -------------------------
-            # YOLO car marker (빨강 점)
-            # -------------------------
-            if idx < len(car_pos):
-                pos = car_pos[idx]
-                if pos is not None:
-                    cv2.circle(frame, (int(pos[0]), int(pos[1])), 6, (0, 0, 255), -1)
+        if workers is None:
+            workers = config.RENDER_WORKERS
+        car_pos = FrameTrack.coerce(yolo_traj.get("car_pos", []))
+        warped_real = FrameTrack.coerce(warped_real, dtype=np.int32)
+        warped_ideal = FrameTrack.coerce(warped_ideal, dtype=np.int32)
+        frame_delta = _coerce_delta(frame_delta)
 
-            out.write(frame)
-            idx += 1
+        # 구간 경계는 실제 디코딩된 프레임 수 (트래킹 결과 길이) 기준.
+        # CAP_PROP_FRAME_COUNT 는 컨테이너 추정값이라 틀릴 수 있다.
+        _, n_total = read_video_meta(video_path)
+        if len(car_pos):
+            n_total = len(car_pos)
+        n_segments = min(workers, n_total // max(1, config.RENDER_MIN_SEGMENT_FRAMES))
 
-        out.release()
-        cap.release()
+        if n_segments > 1:
+            if shutil.which("ffmpeg") is None:
+                print("[VideoProcessor] ffmpeg 가 없어 병렬 렌더링 대신 단일 프로세스로 렌더링합니다.")
+            else:
+                self._render_parallel(video_path, warped_real, warped_ideal, car_pos, outpath,
+                                      n_total, n_segments, progress, frame_delta)
+                print(f"[VideoProcessor] overlay 영상 저장 완료: {outpath}")
+                return
+
+        _render_segment(video_path, outpath, warped_real, warped_ideal, car_pos,
+                        progress=progress, frame_delta=frame_delta)
         print(f"[VideoProcessor] overlay 영상 저장 완료: {outpath}")
+
+    def _render_parallel(self, video_path, warped_real, warped_ideal, car_pos, outpath,
+                         n_total, n_segments, progress=None, frame_delta=None):
+        """
+        프레임 구간을 n_segments 개로 나눠 프로세스마다 따로 렌더링하고
+        ffmpeg concat demuxer 로 재인코딩 없이 이어 붙인다.
+        각 구간은 시작 시점까지의 trail 을 미리 그린 상태에서 시작한다.
+
+        worker 에는 자기 구간의 프레임별 값 + 앞 구간 trail 의 점 (연속 중복 제거) 만 보낸다.
+        마지막 구간은 영상 끝까지 렌더링하고 (n_total 보다 프레임이 많아도 잘리지 않게),
+        구간별 프레임 수가 예상과 다르면 RuntimeError.
+        """
+        bounds = np.linspace(0, n_total, n_segments + 1).astype(int)
+        trail, trail_idx = _trail_points(warped_real[:int(bounds[-2])])
+        tmp_dir = tempfile.mkdtemp(prefix="overlay-", dir=os.path.dirname(os.path.abspath(outpath)))
+        seg_paths = [os.path.join(tmp_dir, f"seg_{i:03d}.mp4") for i in range(n_segments)]
+
+        print(f"[VideoProcessor] 병렬 렌더링: {n_segments} 구간")
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=n_segments, mp_context=ctx) as pool:
+                futures = []
+                for i in range(n_segments):
+                    start = int(bounds[i])
+                    last = i == n_segments - 1
+                    end = None if last else int(bounds[i + 1])
+                    futures.append(pool.submit(
+                        _render_segment, video_path, seg_paths[i],
+                        warped_real[start:end], warped_ideal, car_pos[start:end],
+                        start, end, None,
+                        None if frame_delta is None else frame_delta[start:end],
+                        trail[:int(np.searchsorted(trail_idx, start))] if len(trail_idx) else None,
+                    ))
+                counts = [None] * n_segments
+                for k, fut in enumerate(as_completed(futures)):
+                    counts[futures.index(fut)] = fut.result()
+                    if progress is not None:
+                        progress((k + 1) / n_segments)
+
+            expected = np.diff(bounds)
+            short = [i for i in range(n_segments - 1) if counts[i] != expected[i]]
+            if short or counts[-1] < expected[-1]:
+                raise RuntimeError(f"병렬 렌더링 구간 프레임 수가 맞지 않습니다: {counts} (예상 {expected.tolist()})")
+
+            list_path = os.path.join(tmp_dir, "segments.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for p in seg_paths:
+                    f.write(f"file '{p}'\n")
+
+            subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", outpath],
+                check=True,
+            )
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _trail_points(warped_real):
+    """
+    trail 을 그리는 데 필요한 점만: 유효한 점 중 직전 점과 같은 픽셀은 뺀다.
+    반환: (points (M, 2) int32, 각 점의 프레임 index (M,))
+    """
+    track = FrameTrack.coerce(warped_real, dtype=np.int32)
+    idx = np.flatnonzero(track.valid)
+    pts = track.values[idx].astype(np.int32)
+    if len(pts) > 1:
+        keep = np.concatenate([[True], np.any(pts[1:] != pts[:-1], axis=1)])
+        pts, idx = pts[keep], idx[keep]
+    return pts, idx
+
+
+def _coerce_delta(frame_delta):
+    if frame_delta is None:
+        return None
+    return FrameTrack.coerce(frame_delta, dim=1, dtype=np.float32)
+
+
+def _draw_overlay(frame, idx, compositor, warped_real, car_pos, offset=0, frame_delta=None):
+    """offset : warped_real / car_pos / frame_delta 의 0번이 가리키는 프레임 (구간 렌더링)."""
+    k = idx - offset
+
+    # -------------------------
+    # ideal line (녹색) + 지금까지의 real line (파란색, 차량 뒤로 길게 남음)
+    # -------------------------
+    if 0 <= k < len(warped_real):
+        compositor.add_real_point(warped_real[k])
+    compositor.apply(frame)
+
+    # -------------------------
+    # YOLO car marker (빨강 점)
+    # -------------------------
+    if 0 <= k < len(car_pos):
+        draw_car_marker(frame, car_pos[k])
+
+    # -------------------------
+    # 기준 랩 대비 delta-time
+    # -------------------------
+    if frame_delta is not None and 0 <= k < len(frame_delta):
+        draw_delta(frame, frame_delta[k])
+
+
+def _render_segment(video_path, outpath, warped_real, warped_ideal, car_pos,
+                    start=0, end=None, progress=None, frame_delta=None, trail=None):
+    """
+    [start, end) 프레임을 오버레이해서 outpath 에 저장 (end=None 이면 영상 끝까지).
+    병렬 렌더링 시 자식 프로세스에서 실행되므로 모듈 최상위 함수로 둔다.
+    warped_real / car_pos / frame_delta 는 start 프레임부터의 구간 (x[0] == start 프레임),
+    trail 은 start 이전 real trail 의 점들 (_trail_points).
+    반환: 렌더링한 프레임 수
+    """
+    source = FrameSource(video_path, config.FRAME_BUFFER_SIZE, start=start, end=end)
+    W, H, fps = source.meta["width"], source.meta["height"], source.meta["fps"]
+    n_total = (end if end is not None else source.n_frames) - start
+
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    out = cv2.VideoWriter(outpath, fourcc, fps, (W, H))
+
+    compositor = OverlayCompositor(W, H, warped_ideal)
+    # 구간 시작 시점까지의 trail 상태를 한 번에 복원
+    if trail is not None and len(trail):
+        compositor.add_real_points(FrameTrack(trail, np.ones(len(trail), dtype=bool)))
+
+    n = 0
+    for idx, frame in source:
+        _draw_overlay(frame, idx, compositor, warped_real, car_pos, offset=start,
+                      frame_delta=frame_delta)
+        out.write(frame)
+        n += 1
+        _report(progress, n, n_total)
+
+    out.release()
+    return n
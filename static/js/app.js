@@ -1,3 +1,74 @@
+// ---------- 청크 업로드 (끊겨도 이어 올리기) ----------
+const UPLOAD_RETRIES = 5;
+
+function uploadKey(videoFile, csvFile) {
+    return "acc_upload:" + [videoFile, csvFile]
+        .map(f => `${f.name}:${f.size}:${f.lastModified}`).join("|");
+}
+
+async function createUpload(videoFile, csvFile) {
+    // 같은 파일을 다시 고르면 (새로고침 후 등) 이전 업로드를 이어서 올린다
+    const key = uploadKey(videoFile, csvFile);
+    const saved = localStorage.getItem(key);
+    if (saved) {
+        const res = await fetch(`/api/upload/${saved}`);
+        if (res.ok) {
+            const data = await res.json();
+            if (data.success) return data;
+        }
+        localStorage.removeItem(key);
+    }
+
+    const res = await fetch("/api/upload", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({
+            files: {
+                video:     { name: videoFile.name, size: videoFile.size },
+                telemetry: { name: csvFile.name,   size: csvFile.size },
+            }
+        })
+    });
+    const data = await res.json();
+    if (data.success) localStorage.setItem(key, data.upload_id);
+    return data;
+}
+
+async function uploadFile(upload, kind, file, onProgress) {
+    let offset = upload.files[kind].received;
+    let retries = 0;
+
+    while (offset < file.size) {
+        const end = Math.min(offset + upload.chunk_size, file.size);
+        try {
+            const res = await fetch(upload.upload_urls[kind], {
+                method: "PUT",
+                headers: {"Content-Range": `bytes ${offset}-${end - 1}/${file.size}`},
+                body: file.slice(offset, end)
+            });
+            const data = await res.json();
+            if (res.status === 409) {
+                // 서버가 받은 위치부터 다시
+                if (++retries > UPLOAD_RETRIES) throw new Error(data.error);
+                offset = data.received;
+                continue;
+            }
+            if (!data.success) throw new Error(data.error);
+            offset = data.received;
+            retries = 0;
+        } catch (err) {
+            if (++retries > UPLOAD_RETRIES) throw err;
+            await new Promise(r => setTimeout(r, 1000 * retries));
+            // 연결이 끊겼으면 서버가 실제로 받은 크기를 확인
+            const res = await fetch(`/api/upload/${upload.upload_id}`);
+            const data = await res.json();
+            if (!data.success) throw new Error(data.error);
+            offset = data.files[kind].received;
+        }
+        onProgress(offset);
+    }
+}
+
 document.getElementById("uploadBtn").addEventListener("click", async () => {
 
     const videoFile = document.getElementById("videoFile").files[0];
@@ -11,27 +82,38 @@ document.getElementById("uploadBtn").addEventListener("click", async () => {
     const statusBox = document.getElementById("statusBox");
     statusBox.textContent = "파일 업로드 중...";
 
-    let formData = new FormData();
-    formData.append("video", videoFile);
-    formData.append("telemetry", csvFile);
-
     // ---------- 1) 업로드 ----------
-    const uploadResponse = await fetch("/api/upload", {
-        method: "POST",
-        body: formData
-    });
+    const upload = await createUpload(videoFile, csvFile);
+    console.log(upload);
 
-    const uploadData = await uploadResponse.json();
-    console.log(uploadData);
+    if (!upload.success) {
+        statusBox.textContent = "업로드 실패: " + upload.error;
+        return;
+    }
 
-    if (!uploadData.success) {
-        statusBox.textContent = "업로드 실패: " + uploadData.error;
+    const total = videoFile.size + csvFile.size;
+    const done = { video: upload.files.video.received, telemetry: upload.files.telemetry.received };
+    const showProgress = () => {
+        const sent = done.video + done.telemetry;
+        statusBox.textContent = `파일 업로드 중... ${Math.floor(sent / Math.max(total, 1) * 100)}%`;
+    };
+
+    try {
+        for (const [kind, file] of [["video", videoFile], ["telemetry", csvFile]]) {
+            await uploadFile(upload, kind, file, received => {
+                done[kind] = received;
+                showProgress();
+            });
+        }
+    } catch (err) {
+        statusBox.textContent = "업로드 실패: " + err.message + " (다시 누르면 이어서 올립니다)";
         return;
     }
+    localStorage.removeItem(uploadKey(videoFile, csvFile));
 
-    const upload_id = uploadData.upload_id;
+    const upload_id = upload.upload_id;
 
-    statusBox.textContent = "분석 중... (20~40초 소요)";
+    statusBox.textContent = "분석 요청 중...";
 
     // ---------- 2) 분석 ----------
     const analyzeResponse = await fetch("/api/analyze", {
@@ -40,14 +122,39 @@ document.getElementById("uploadBtn").addEventListener("click", async () => {
         body: JSON.stringify({ upload_id: upload_id })
     });
 
-    const result = await analyzeResponse.json();
-    console.log(result);
+    const queued = await analyzeResponse.json();
+    console.log(queued);
 
-    if (!result.success) {
-        statusBox.textContent = "분석 실패: " + result.error;
+    if (!queued.success) {
+        statusBox.textContent = "분석 실패: " + queued.error;
         return;
     }
 
+    // ---------- 3) 작업 상태 폴링 ----------
+    let job;
+    while (true) {
+        await new Promise(r => setTimeout(r, 1000));
+
+        const jobResponse = await fetch(queued.status_url);
+        job = await jobResponse.json();
+
+        if (!job.success || job.status === "failed") {
+            statusBox.textContent = "분석 실패: " + job.error;
+            return;
+        }
+        if (job.status === "done") {
+            break;
+        }
+
+        const stage = job.stages.find(s => s.name === job.current_stage);
+        statusBox.textContent = job.status === "queued"
+            ? "분석 대기 중..."
+            : `분석 중... [${job.current_stage}] ${Math.round((stage ? stage.progress : 0) * 100)}%`;
+    }
+
+    const result = job.result;
+    console.log(result);
+
     statusBox.textContent = "완료!";
 
     document.getElementById("resultBox").innerHTML = `
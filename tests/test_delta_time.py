@@ -0,0 +1,21 @@
+import numpy as np
+
+from modules.delta_time import DeltaTimeEngine, ReferenceLap
+from modules.lap_segmenter import Laps
+
+
+def test_row_delta_hides_incomplete_laps():
+    # 랩 3개: outlap 남은 부분 (300 m) + 완주 랩 (1000 m) + 마지막 미완료 랩 (500 m)
+    dist = np.concatenate([np.linspace(700, 1000, 31), np.linspace(0, 1000, 101), np.linspace(0, 500, 51)])
+    time = np.arange(len(dist)) * 0.5
+    laps = Laps([0, 31, 132], len(dist), time, dist, length=1000.0)
+    ref = ReferenceLap(np.linspace(0, 1000, 101), np.linspace(0, 48, 101), 48.0)
+
+    delta = DeltaTimeEngine().row_delta(laps, ref)
+
+    assert list(laps.complete) == [False, True, False]
+    assert np.isnan(delta[:31]).all() and np.isnan(delta[132:]).all()
+    assert np.isfinite(delta[31:132]).all()
+
+    frames = DeltaTimeEngine.frame_delta(delta, np.arange(len(dist), dtype=np.float64))
+    np.testing.assert_array_equal(frames.valid, laps.complete[laps.lap_index])
@@ -0,0 +1,49 @@
+import numpy as np
+
+from modules.ai_feedback import AIFeedbackEngine
+from modules.event_detector import EVENT_TYPES, EventDetector
+from modules.lap_segmenter import Laps
+
+ROWS = 400          # 랩당 행 (0.05 s 간격, 20 s 랩)
+LAP_M = 1000.0
+CORNER = {"name": "T1", "start": 340.0, "apex": 420.0, "end": 500.0}
+
+
+def _session(n_laps=3):
+    """직선 끝에서 1 s lift-and-coast (행 120~140) → 제동 (140~170) → 코너 T1."""
+    n = n_laps * ROWS
+    rows = np.arange(n) % ROWS
+    throttle = np.full(n, 100.0)
+    brake = np.zeros(n)
+    throttle[(rows >= 120) & (rows < 170)] = 0.0
+    brake[(rows >= 140) & (rows < 170)] = 80.0
+    tel = {
+        "time": np.arange(n) * 0.05,
+        "speed": np.full(n, 150.0),
+        "throttle": throttle,
+        "brake": brake,
+    }
+    dist = rows * (LAP_M / ROWS) + np.arange(n) // ROWS * LAP_M
+    laps = Laps(np.arange(n_laps) * ROWS, n, tel["time"], dist, length=LAP_M - LAP_M / ROWS)
+    return tel, laps
+
+
+def test_lift_coast_is_assigned_to_the_corner_it_leads_into():
+    tel, laps = _session()
+
+    events = EventDetector().detect(tel, laps, [CORNER])
+
+    coast = events.type == EVENT_TYPES.index("lift_coast")
+    assert coast.sum() == 3
+    # 시작 거리 (300 m) 는 코너 시작 (340 m) 앞이지만 이어지는 제동 구간의 코너로
+    assert (events.start_dist[coast] < CORNER["start"]).all()
+    assert (events.corner[coast] == 0).all()
+
+    table = {
+        "corners": [CORNER],
+        "complete": laps.complete,
+        "lap_times": laps.lap_times,
+        "corner": {"time": np.full((len(laps), 1), 6.0)},
+    }
+    feedback = AIFeedbackEngine().corner_feedback(events, table)
+    assert any(f["type"] == "lift_coast" and f["corner"] == "T1" for f in feedback)
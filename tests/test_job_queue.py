@@ -0,0 +1,63 @@
+import threading
+import time
+
+from modules.job_queue import JobQueue
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.finished_at is None and time.time() < deadline:
+        time.sleep(0.005)
+    return job.to_dict()
+
+
+def test_job_runs_through_stages_to_done():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    seen = {}
+
+    def work(job, x):
+        seen["status"] = job.to_dict()["status"]
+        job.start_stage("a")
+        release.wait(5)
+        job.start_stage("b")
+        return {"value": x * 2}
+
+    job = queue.submit(work, 21, stages=("a", "b"))
+    while job.to_dict()["current_stage"] != "a":
+        time.sleep(0.005)
+    assert job.to_dict()["status"] == "running"
+    release.set()
+
+    state = _wait(job)
+    assert seen["status"] == "running"
+    assert state["status"] == "done"
+    assert state["result"]["value"] == 42
+    assert [s["status"] for s in state["stages"]] == ["done", "done"]
+    assert set(state["timings"]) == {"a", "b"}
+    assert state["started_at"] is not None and state["finished_at"] >= state["started_at"]
+
+
+def test_failing_job_marks_stage_failed():
+    queue = JobQueue(max_workers=1)
+
+    def work(job):
+        job.start_stage("a")
+        raise ValueError("boom")
+
+    state = _wait(queue.submit(work, stages=("a", "b")))
+    assert state["status"] == "failed"
+    assert state["error"] == "boom"
+    assert [s["status"] for s in state["stages"]] == ["failed", "pending"]
+
+
+def test_finished_jobs_are_pruned_after_ttl():
+    queue = JobQueue(max_workers=1, ttl=0)
+    first = queue.submit(lambda job: None)
+    _wait(first)
+    time.sleep(0.01)
+
+    second = queue.submit(lambda job: None)
+
+    assert queue.get(first.id) is None
+    assert queue.get(second.id) is second
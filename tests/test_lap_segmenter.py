@@ -0,0 +1,49 @@
+import numpy as np
+
+from modules.lap_segmenter import LapSegmenter
+
+RATE = 10.0
+LAP_M = 1000.0
+LAP_ROWS = 200
+
+
+def _session(n_laps, counter_lead=0):
+    """랩 거리 채널 (LAP_M 마다 0 으로) + 랩 카운터. counter_lead 샘플만큼 카운터가 먼저 바뀐다."""
+    n = n_laps * LAP_ROWS
+    rows = np.arange(n)
+    dist = (rows % LAP_ROWS) * (LAP_M / LAP_ROWS)
+    lap = (rows + counter_lead) // LAP_ROWS
+    return {"time": rows / RATE, "distance": dist, "lap": np.minimum(lap, n_laps - 1)}
+
+
+def test_counter_one_sample_before_distance_wrap():
+    laps = LapSegmenter().split(_session(4, counter_lead=1), lap_length=LAP_M)
+
+    assert len(laps) == 4
+    np.testing.assert_array_equal(laps.starts[1:], np.arange(1, 4) * LAP_ROWS - 1)
+    # 가운데 랩들은 카운터가 한 샘플 먼저 바뀌어도 랩 거리를 다 갖고 완주로 잡혀야 한다
+    assert laps.complete[1:3].all()
+    np.testing.assert_allclose(laps.distances[1:3], LAP_M, atol=2 * LAP_M / LAP_ROWS)
+    assert laps.lap_dist[laps.starts[2]] == 0.0
+
+
+def test_counter_reset_is_not_read_as_beacon():
+    counter = np.repeat([3, 4, 5, 0, 1, 2], LAP_ROWS)
+    tel = _session(6)
+    tel["lap"] = counter
+
+    laps = LapSegmenter().split(tel, lap_length=LAP_M)
+
+    np.testing.assert_array_equal(laps.starts, np.arange(6) * LAP_ROWS)
+
+
+def test_beacon_pulses_start_laps_on_rising_edge():
+    tel = _session(3)
+    beacon = np.zeros(3 * LAP_ROWS)
+    beacon[[LAP_ROWS, LAP_ROWS + 1, 2 * LAP_ROWS]] = 1
+    tel["lap"] = beacon
+
+    laps = LapSegmenter().split(tel, lap_length=LAP_M)
+
+    np.testing.assert_array_equal(laps.starts, [0, LAP_ROWS, 2 * LAP_ROWS])
+    assert laps.complete[:2].all()
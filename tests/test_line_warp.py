@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+from modules.line_warp import LineWarpEngine
+
+META = {"width": 1920, "height": 1080}
+
+
+def _homographies(n, seed=0):
+    rng = np.random.default_rng(seed)
+    H = np.tile(np.array([[1.2, 0.1, 300.0], [0.05, 0.9, 200.0], [1e-4, 2e-4, 1.0]]), (n, 1, 1))
+    H[:, :2, 2] += rng.normal(scale=20.0, size=(n, 2))
+    H[:, 2, :2] += rng.normal(scale=5e-5, size=(n, 2))
+    return H
+
+
+def test_per_frame_project_matches_cv2_perspective_transform():
+    n = 12
+    H = _homographies(n)
+    rng = np.random.default_rng(1)
+    pts = rng.uniform(0, 800, size=(n, 5, 2))
+
+    uv, ok = LineWarpEngine("homography").project(pts, H, META)
+
+    assert uv.shape == (n, 5, 2) and ok.all()
+    for i in range(n):
+        expected = cv2.perspectiveTransform(pts[i][None].astype(np.float64), H[i])[0]
+        expected = np.clip(np.trunc(expected), 0, [META["width"] - 1, META["height"] - 1])
+        np.testing.assert_array_equal(uv[i], expected.astype(np.int32))
+
+
+def test_per_frame_project_uses_first_n_homographies():
+    H = _homographies(8)
+    pts = np.full((5, 2), 100.0)
+
+    uv, _ = LineWarpEngine("homography").project(pts, H, META)
+    uv_exact, _ = LineWarpEngine("homography").project(pts, H[:5], META)
+
+    np.testing.assert_array_equal(uv, uv_exact)
+
+
+def test_per_frame_project_rejects_too_few_homographies():
+    H = _homographies(3)
+    pts = np.zeros((5, 2))
+
+    with pytest.raises(ValueError, match="homography 가 부족합니다"):
+        LineWarpEngine("homography").project(pts, H, META)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from modules.performance_analyzer import CORNER_METRICS, PerformanceAnalyzer
+
+
+def _table(corners, times):
+    """corner_metrics 결과 형식: 완주 랩 2개, 코너별 time = times."""
+    n = 2
+    corner = {m: np.full((n, len(corners)), np.nan) for m in CORNER_METRICS}
+    corner["time"] = np.tile(np.asarray(times, dtype=np.float64), (n, 1))
+    return {
+        "corners": [dict(zip(("name", "start", "apex", "end"), c)) for c in corners],
+        "sectors": [],
+        "complete": np.ones(n, dtype=bool),
+        "lap_times": np.full(n, 100.0),
+        "corner": corner,
+        "sector": {},
+    }
+
+
+def test_aggregate_matches_detected_corners_by_apex():
+    # 세션 B 는 앞쪽에 코너를 하나 더 검출해서 T 번호가 한 칸씩 밀림
+    a = _table([("T1", 400, 500, 600), ("T2", 1400, 1500, 1600)], [5.0, 7.0])
+    b = _table([("T1", 90, 100, 150), ("T2", 410, 510, 610), ("T3", 1390, 1490, 1590)], [2.0, 6.0, 8.0])
+
+    out = PerformanceAnalyzer.aggregate_corners([a, b], match_m=60.0)["corners"]
+
+    assert [c["name"] for c in out] == ["T1", "T2", "T3"]
+    assert [c["sessions"] for c in out] == [1, 2, 2]
+    assert out[1]["apex"] == 505.0
+    assert out[1]["time"]["mean"] == 5.5 and out[1]["laps"] == 4
+    assert out[2]["time"]["mean"] == 7.5
+
+
+def test_aggregate_keeps_track_defined_names():
+    corners = [("La Source", 300, 350, 420), ("Eau Rouge", 900, 1000, 1100)]
+    out = PerformanceAnalyzer.aggregate_corners([_table(corners, [6.0, 4.0]), _table(corners, [7.0, 5.0])])
+
+    assert [c["name"] for c in out["corners"]] == ["La Source", "Eau Rouge"]
+    assert [c["time"]["mean"] for c in out["corners"]] == [6.5, 4.5]
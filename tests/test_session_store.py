@@ -0,0 +1,28 @@
+import time
+
+from modules.session_store import SessionStore
+
+FILES = {"video": {"name": "v.mp4", "size": 10}, "telemetry": {"name": "t.csv", "size": 5}}
+
+
+def test_touch_keeps_active_upload_from_stale_eviction(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.create("up", FILES)
+    time.sleep(0.05)
+
+    store.touch("up")
+
+    assert store.evict(stale_sec=0.04, quota_bytes=0) == []
+    assert store.get("up") is not None
+
+
+def test_reset_interrupted_marks_analyzing_as_failed(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.create("run", FILES, status="uploaded")
+    store.create("done", FILES, status="uploaded")
+    store.update("run", status="analyzing")
+    store.update("done", status="analyzed")
+
+    assert store.reset_interrupted() == 1
+    assert store.get("run")["status"] == "failed"
+    assert store.get("done")["status"] == "analyzed"
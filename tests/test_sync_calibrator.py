@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from modules.sync_calibrator import SyncCalibrator, fft_correlate
+
+
+@pytest.mark.parametrize("n_a, n_v", [(1, 1), (7, 3), (500, 120), (1000, 1000), (64, 257)])
+def test_fft_correlate_matches_scipy_signal(n_a, n_v):
+    rng = np.random.default_rng(n_a * 1000 + n_v)
+    a = rng.normal(size=n_a)
+    v = rng.normal(size=n_v)
+
+    expected = signal.correlate(a, v, mode="full", method="fft")
+
+    got = fft_correlate(a, v)
+    assert got.shape == expected.shape
+    np.testing.assert_allclose(got, expected, atol=1e-9 * max(n_a, n_v))
+    assert np.argmax(got) == np.argmax(expected)
+
+
+def test_blank_time_cell_does_not_break_time_sync():
+    rng = np.random.default_rng(0)
+    tel_time = np.arange(0.0, 180.0, 0.05)
+    tel_speed = np.convolve(rng.normal(size=len(tel_time)), np.ones(40) / 40, mode="same")
+    fps, true_offset = 10.0, 30.0
+    video_t = np.arange(0.0, 90.0, 1.0 / fps)
+    yolo_speed = np.interp(video_t + true_offset, tel_time, tel_speed)
+
+    # CSV 의 빈 time 칸 (맨 앞 포함)
+    tel_time[[0, 500]] = np.nan
+
+    sc = SyncCalibrator()
+    sync = sc.auto_sync_time(yolo_speed, fps, tel_speed, tel_time)
+    assert sync["offset_sec"] == pytest.approx(true_offset, abs=0.1)
+
+    fmap = sc.generate_frame_map(len(video_t), len(tel_time), fps=fps, tel_time=tel_time, sync=sync)
+    assert fmap.valid.all()
+    assert np.isfinite(fmap.values).all()
+    np.testing.assert_allclose(fmap.values[-1, 0], (video_t[-1] + true_offset) / 0.05, atol=3)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_telemetry_csv
+from modules.telemetry_parser import PIPELINE_COLUMNS, TelemetryParser
+
+
+@pytest.fixture
+def cached_parser(tmp_path):
+    csv_path = tmp_path / "session.csv"
+    make_telemetry_csv(str(csv_path), duration_sec=30.0, rate=20.0)
+    parser = TelemetryParser(cache_dir=str(tmp_path / "cache"))
+    first = parser.parse_file(str(csv_path), columns=PIPELINE_COLUMNS)
+    return parser, str(csv_path), first
+
+
+def _capture_loads(parser):
+    loaded = []
+    load = parser.cache.load
+
+    def spy(*args, **kwargs):
+        hit = load(*args, **kwargs)
+        loaded.append(hit)
+        return hit
+
+    parser.cache.load = spy
+    return loaded
+
+
+def test_cache_hit_shares_memory_with_memmap(cached_parser):
+    parser, csv_path, first = cached_parser
+    loaded = _capture_loads(parser)
+
+    df = parser.parse_file(csv_path, columns=PIPELINE_COLUMNS)
+
+    arrays, _ = loaded[-1]
+    assert list(df.columns) == list(first.columns)
+    for c in df.columns:
+        assert isinstance(arrays[c], np.memmap)
+        assert np.shares_memory(df[c].to_numpy(), arrays[c])
+        np.testing.assert_array_equal(df[c].to_numpy(), first[c].to_numpy())
+
+
+def test_cache_hit_is_read_only(cached_parser):
+    parser, csv_path, _ = cached_parser
+    df = parser.parse_file(csv_path, columns=PIPELINE_COLUMNS)
+    before = float(df["speed"].iloc[0])
+
+    # CoW pandas 는 컬럼을 복사하고, 아니면 읽기 전용 memmap 이라 ValueError
+    try:
+        df.loc[df.index[0], "speed"] = before + 123.0
+    except ValueError:
+        pass
+
+    again = parser.parse_file(csv_path, columns=PIPELINE_COLUMNS)
+    assert float(again["speed"].iloc[0]) == before
+
+
+def test_fast_path_coerces_blank_cells(tmp_path):
+    csv_path = str(tmp_path / "dirty.csv")
+    make_telemetry_csv(csv_path, duration_sec=30.0, rate=20.0, blank_frac=0.05)
+    parser = TelemetryParser()
+    parser.cache = None
+
+    legacy = parser.parse_file(csv_path, fast=False)
+    fast = parser.parse_file(csv_path, fast=True)
+
+    assert list(fast.columns) == list(legacy.columns)
+    assert fast.dtypes.to_dict() == legacy.dtypes.to_dict()
+    assert fast["speed"].isna().any()
+    np.testing.assert_allclose(fast.to_numpy(dtype=float), legacy.to_numpy(dtype=float), atol=1e-3)
+
+
+def test_pyarrow_engine_matches_c_engine(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import modules.telemetry_parser as telemetry_parser
+
+    csv_path = str(tmp_path / "dirty.csv")
+    make_telemetry_csv(csv_path, duration_sec=30.0, rate=20.0, blank_frac=0.05)
+    parser = TelemetryParser()
+    parser.cache = None
+
+    monkeypatch.setattr(telemetry_parser, "_FAST_ENGINE", "c")
+    c_df = parser.parse_file(csv_path, fast=True)
+    monkeypatch.setattr(telemetry_parser, "_FAST_ENGINE", "pyarrow")
+    arrow_df = parser.parse_file(csv_path, fast=True)
+
+    assert list(arrow_df.columns) == list(c_df.columns)
+    assert arrow_df.dtypes.to_dict() == c_df.dtypes.to_dict()
+    np.testing.assert_allclose(arrow_df.to_numpy(dtype=float), c_df.to_numpy(dtype=float), equal_nan=True)
@@ -0,0 +1,30 @@
+import pytest
+
+from modules.track_registry import TrackRegistry
+
+
+def _write_ideal(path):
+    path.write_text("pixel_x,pixel_y\n0,0\n10,0\n10,10\n0,10\n")
+
+
+def test_get_loads_ideal_line_from_dir(tmp_path):
+    _write_ideal(tmp_path / "monza_ideal.csv")
+    registry = TrackRegistry(tracks={}, ideal_dir=str(tmp_path))
+
+    assert registry.available() == ["monza"]
+    line = registry.get("monza")
+    out = line.project([5.0], [1.0])
+    assert out["segment"][0] == 0
+    assert out["lateral"][0] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("name", ["../monza", "sub/monza", "", "monza.csv", 3])
+def test_rejects_track_names_outside_ideal_dir(tmp_path, name):
+    (tmp_path / "ideal").mkdir()
+    _write_ideal(tmp_path / "monza_ideal.csv")
+    _write_ideal(tmp_path / "ideal" / "spa_ideal.csv")
+    registry = TrackRegistry(tracks={}, ideal_dir=str(tmp_path / "ideal"))
+
+    assert not registry.has(name)
+    with pytest.raises(KeyError):
+        registry.get(name)
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from modules.upload_store import UploadError, UploadOffsetError, UploadStore, parse_content_range
+
+
+def _payload(n, seed=0):
+    return bytes((i * 31 + seed) % 251 for i in range(n))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadStore(root=str(tmp_path / "uploads"), max_bytes=10_000_000)
+
+
+@pytest.mark.parametrize("header, start", [(None, 0), ("", 0), ("bytes 0-99/1000", 0),
+                                           ("bytes 4096-8191/10000", 4096), (" bytes 7-7/8 ", 7)])
+def test_parse_content_range(header, start):
+    assert parse_content_range(header) == start
+
+
+@pytest.mark.parametrize("header", ["bytes", "bytes abc-1/2", "items 0-1/2", "bytes -5-1/2"])
+def test_parse_content_range_rejects_malformed(header):
+    with pytest.raises(UploadError):
+        parse_content_range(header)
+
+
+@pytest.mark.parametrize("files", [
+    {"video": {"size": "abc"}},
+    {"video": {"size": None}},
+    {"video": "x"},
+    [{"video": {"size": 10}}],
+    {"video": {"size": 0}},
+    {"audio": {"size": 10}},
+])
+def test_create_rejects_malformed_files(store, files):
+    with pytest.raises(UploadError):
+        store.create(files)
+
+
+def test_chunk_at_wrong_offset_raises_offset_error(store):
+    data = _payload(1000)
+    uid = store.create({"telemetry": {"name": "t.csv", "size": len(data)}})
+    store.write_chunk(uid, "telemetry", io.BytesIO(data[:300]), 0, length=300)
+
+    with pytest.raises(UploadOffsetError) as err:
+        store.write_chunk(uid, "telemetry", io.BytesIO(data[500:]), 500)
+    assert err.value.received == 300
+    assert store.status(uid)["telemetry"]["received"] == 300
+
+
+def test_resume_after_partial_chunk(store):
+    data = _payload(5000)
+    uid = store.create({"video": {"name": "v.mp4", "size": len(data)}})
+
+    # 600 바이트 청크를 보내다 연결이 끊겨 400 바이트만 도착
+    info = store.write_chunk(uid, "video", io.BytesIO(data[:400]), 0, length=600)
+    assert info["received"] == 400 and not info["complete"]
+
+    # 재시작한 프로세스처럼 메모리 hasher 없이 status 의 received 부터 이어 보냄
+    store = UploadStore(root=store.root, max_bytes=store.max_bytes)
+    received = store.status(uid)["video"]["received"]
+    info = store.write_chunk(uid, "video", io.BytesIO(data[received:]), received)
+
+    assert info["complete"]
+    with open(store.file_path(uid, "video"), "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(store.file_path(uid, "video") + ".part")
+
+
+def test_streaming_sha256_matches_whole_file(store):
+    data = _payload(3 * 1024 * 1024 + 17, seed=3)
+    uid = store.create({"video": {"name": "v.mp4", "size": len(data)}})
+
+    chunk = 700_001
+    for start in range(0, len(data), chunk):
+        info = store.write_chunk(uid, "video", io.BytesIO(data[start:start + chunk]), start)
+
+    assert info["complete"]
+    assert info["sha256"] == hashlib.sha256(data).hexdigest()
+    assert store.hashes(uid)["video"] == hashlib.sha256(data).hexdigest()